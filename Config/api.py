@@ -1,4 +1,5 @@
 """Config/api.py."""
+
 from ninja import NinjaAPI
 from ninja.security import SessionAuth
 
@@ -6,6 +7,8 @@ from src.users.api import router as users_router
 from src.building.api import router as building_router
 from src.finance.api import router as finance_router
 from src.cabinet.api import router as cabinet_router
+from src.core.api import router as core_router
+from src.core.api import search_router
 
 api = NinjaAPI(version="1.0.0", auth=SessionAuth())
 
@@ -13,3 +16,5 @@ api.add_router("/users", users_router)
 api.add_router("/buildings", building_router)
 api.add_router("/finance", finance_router)
 api.add_router("/cabinet", cabinet_router)
+api.add_router("/exports", core_router)
+api.add_router("/search", search_router)
@@ -53,6 +53,8 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    "src.core.middleware.QueryProfilingMiddleware",
+    "src.core.middleware.ResponseCompressionMiddleware",
     "django.middleware.security.SecurityMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
@@ -62,6 +64,9 @@ MIDDLEWARE = [
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
 ]
 
+# Per-request SQL profiling, see src.core.middleware.QueryProfilingMiddleware.
+SQL_PROFILING = env.bool("SQL_PROFILING", default=False)
+
 AUTHENTICATION_BACKENDS = [
     "src.users.backends.CustomBackend",
     "django.contrib.auth.backends.ModelBackend",
@@ -164,4 +169,36 @@ EMAIL_HOST_PASSWORD = env('EMAIL_HOST_PASSWORD')
 
 CELERY_BROKER_URL = env('CELERY_BROKER_URL')
 
+# Processes per web worker that render PDFs with WeasyPrint (0 renders in
+# the request thread) and how long a request waits for a render, seconds.
+PDF_RENDER_WORKERS = env.int("PDF_RENDER_WORKERS", default=2)
+PDF_RENDER_TIMEOUT = env.int("PDF_RENDER_TIMEOUT", default=20)
+
+# Bulk jobs run on their own queue and worker, so receipts pre-rendered on
+# posting are not queued behind a mailing or a backfill.
+CELERY_TASK_DEFAULT_QUEUE = "celery"
+CELERY_BULK_QUEUE = "bulk"
+CELERY_TASK_ROUTES = {
+    "src.finance.tasks.send_receipt_batch_task": {"queue": CELERY_BULK_QUEUE},
+}
+
+CELERY_BEAT_SCHEDULE = {
+    "delete-expired-exports": {
+        "task": "src.core.tasks.delete_expired_exports",
+        "schedule": 60 * 60,
+    },
+}
+
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.redis.RedisCache",
+        "LOCATION": env("CACHE_URL", default=CELERY_BROKER_URL),
+        "KEY_PREFIX": "myhouse",
+        "OPTIONS": {
+            "socket_connect_timeout": 1,
+            "socket_timeout": 1,
+        },
+    }
+}
+
 SITE_URL = env("SITE_URL")
@@ -8,3 +8,7 @@ class BuildingConfig(AppConfig):
 
     default_auto_field = "django.db.models.BigAutoField"
     name = "src.building"
+
+    def ready(self):
+        """Connect the handler that remembers apartments before a save."""
+        from . import signals  # noqa: F401
@@ -4,17 +4,23 @@ from contextlib import suppress
 
 from ajax_datatable.views import AjaxDatatableView
 from django.db.models import Q
-from django.urls import reverse
+
+from src.core.datatables import ColumnarResponseMixin
+from src.core.datatables import RowUrlsMixin
 
 from .models import Apartment
 from .models import House
 from .models import PersonalAccount
 
 
-class HouseAjaxDatatableView(AjaxDatatableView):
+class HouseAjaxDatatableView(ColumnarResponseMixin, RowUrlsMixin, AjaxDatatableView):
     """Provides server-side processing for the House list DataTable."""
 
     model = House
+    row_urls = {
+        "detail": "building:house_detail",
+        "edit": "building:house_edit",
+    }
     title = "Дома"
     show_column_filters = False
 
@@ -28,13 +34,6 @@ class HouseAjaxDatatableView(AjaxDatatableView):
         },
         {"name": "title", "title": "Название", "orderable": True, "searchable": False},
         {"name": "address", "title": "Адрес", "orderable": False, "searchable": False},
-        {
-            "name": "actions",
-            "title": "",
-            "orderable": False,
-            "searchable": False,
-            "width": "120px",
-        },
     ]
 
     def get_initial_queryset(self, request=None):
@@ -64,30 +63,25 @@ class HouseAjaxDatatableView(AjaxDatatableView):
 
     def customize_row(self, row, obj):
         """Customize each row of the DataTable."""
-        row["DT_RowAttr"] = {
-            "data-detail-url": reverse("building:house_detail", args=[obj.pk])
-        }
-
-        edit_url = reverse("building:house_edit", args=[obj.pk])
-        row["actions"] = f"""
-            <div class="text-end" style="white-space: nowrap;">
-                <a href="{edit_url}" class="btn btn-sm
-                 btn-primary edit-house-link" title="Редактировать">
-                    <i class="bi bi-pencil"></i>
-                </a>
-                <button type="button" class="btn btn-sm btn-danger delete-house-btn"
-                        data-id="{obj.pk}" data-name="{obj.title}" title="Удалить">
-                    <i class="bi bi-trash"></i>
-                </button>
-            </div>
-        """
+        row["id"] = obj.pk
         return row
 
 
-class ApartmentAjaxDatatableView(AjaxDatatableView):
+class ApartmentAjaxDatatableView(
+    ColumnarResponseMixin, RowUrlsMixin, AjaxDatatableView
+):
     """Provide server-side processing for the Apartment list DataTable."""
 
     model = Apartment
+    row_urls = {
+        "detail": "building:apartment_detail",
+        "edit": "building:apartment_edit",
+    }
+    # Queries for a page of rows.
+    query_budget = 3
+    # only() on the listed columns would defer the related rows customize_row
+    # reads, one query per row and relation.
+    disable_queryset_optimization_only = True
     title = "Квартиры"
     show_column_filters = False
 
@@ -98,29 +92,40 @@ class ApartmentAjaxDatatableView(AjaxDatatableView):
             "searchable": False,
             "orderable": False,
         },
-        {"name": "house", "title": "Дом", "searchable": False, "orderable": False},
-        {"name": "section", "title": "Секция", "searchable": False, "orderable": False},
-        {"name": "floor", "title": "Этаж", "searchable": False, "orderable": False},
-        {"name": "owner", "title": "Владелец", "searchable": False, "orderable": False},
         {
-            "name": "balance",
-            "title": "Остаток (грн)",
+            "name": "house",
+            "title": "Дом",
+            "foreign_field": "house__title",
+            "searchable": False,
+            "orderable": False,
+        },
+        {
+            "name": "section",
+            "title": "Секция",
+            "foreign_field": "section__name",
             "searchable": False,
             "orderable": False,
         },
         {
-            "name": "actions",
-            "title": "",
+            "name": "floor",
+            "title": "Этаж",
+            "foreign_field": "floor__name",
+            "searchable": False,
+            "orderable": False,
+        },
+        {"name": "owner", "title": "Владелец", "searchable": False, "orderable": False},
+        {
+            "name": "balance",
+            "title": "Остаток (грн)",
             "searchable": False,
             "orderable": False,
-            "width": "12_px",
         },
     ]
 
     def get_initial_queryset(self, request=None):
         """Build the initial queryset and applies filters."""
         queryset = Apartment.objects.select_related(
-            "house", "section", "floor", "owner"
+            "house", "section", "floor", "owner", "personal_account"
         ).order_by("id")
 
         if not request:
@@ -159,47 +164,32 @@ class ApartmentAjaxDatatableView(AjaxDatatableView):
 
     def customize_row(self, row, obj):
         """Customize each row of the DataTable."""
+        row["id"] = obj.pk
         row["number"] = obj.number or "—"
         row["house"] = obj.house.title if obj.house else "—"
         row["section"] = obj.section.name if obj.section else "—"
         row["floor"] = obj.floor.name if obj.floor else "—"
         row["owner"] = obj.owner.get_full_name() if obj.owner else "—"
-
-        balance_value = obj.personal_account.balance if obj.personal_account else 0.0
-
-        balance_class = ""
-        if balance_value < 0:
-            balance_class = "text-danger"
-        elif balance_value > 0:
-            balance_class = "text-success"
-
-        row["balance"] = (
-            f'<span class="{balance_class} fw-bold">{balance_value:.2f}</span>'
-        )
-
-        edit_url = reverse("building:apartment_edit", args=[obj.pk])
-        row["DT_RowAttr"] = {
-            "data-detail-url": reverse("building:apartment_detail", args=[obj.pk])
-        }
-        row["actions"] = f"""
-            <div class="text-end" style="white-space: nowrap;">
-                <a href="{edit_url}" class="btn btn-sm btn-primary"
-                    title="Редактировать" onclick="event.stopPropagation();">
-                    <i class="bi bi-pencil"></i>
-                </a>
-                <button type="button" class="btn btn-sm btn-danger delete-apartment-btn"
-                        data-id="{obj.pk}" data-name="№{obj.number}" title="Удалить">
-                    <i class="bi bi-trash"></i>
-                </button>
-            </div>
-        """
+        balance = obj.personal_account.balance if obj.personal_account else 0
+        row["balance"] = f"{balance:.2f}"
         return row
 
 
-class PersonalAccountAjaxDatatableView(AjaxDatatableView):
+class PersonalAccountAjaxDatatableView(
+    ColumnarResponseMixin, RowUrlsMixin, AjaxDatatableView
+):
     """Provide server-side processing for the Personal Account list DataTable."""
 
     model = PersonalAccount
+    row_urls = {
+        "detail": "building:personal_account_detail",
+        "edit": "building:personal_account_edit",
+    }
+    # Queries for a page of rows.
+    query_budget = 3
+    # only() on the listed columns would defer the related rows customize_row
+    # reads, one query per row and relation.
+    disable_queryset_optimization_only = True
     title = "Лицевые счета"
     initial_order = [["pk", "asc"]]
     show_column_filters = False
@@ -218,18 +208,13 @@ class PersonalAccountAjaxDatatableView(AjaxDatatableView):
         {"name": "section", "title": "Секция", "searchable": False, "orderable": False},
         {"name": "owner", "title": "Владелец", "searchable": False, "orderable": False},
         {"name": "balance", "title": "Остаток (грн)", "orderable": True},
-        {
-            "name": "actions",
-            "title": "",
-            "searchable": False,
-            "orderable": False,
-            "width": "80px",
-        },
     ]
 
     def get_initial_queryset(self, request=None):
         """Build the initial queryset and applies filters."""
-        queryset = PersonalAccount.objects.all().order_by("pk")
+        queryset = PersonalAccount.objects.select_related(
+            "apartment__house", "apartment__section", "apartment__owner"
+        ).order_by("pk")
 
         if not request:
             return queryset
@@ -269,10 +254,9 @@ class PersonalAccountAjaxDatatableView(AjaxDatatableView):
         return queryset.filter(query_conditions)
 
     def customize_row(self, row, obj):
-        """Customize each row to add HTML and data from related models."""
-        badge_class = "bg-success" if obj.status == "active" else "bg-danger"
-        status_text = "Активен" if obj.status == "active" else "Неактивен"
-        row["status"] = f'<span class="badge {badge_class}">{status_text}</span>'
+        """Customize each row with data from related models."""
+        row["id"] = obj.pk
+        row["status"] = obj.status
 
         apt = None
         with suppress(self.model.apartment.RelatedObjectDoesNotExist):
@@ -283,29 +267,5 @@ class PersonalAccountAjaxDatatableView(AjaxDatatableView):
         row["section"] = apt.section.name if apt and apt.section else "(не задано)"
         row["owner"] = apt.owner.get_full_name() if apt and apt.owner else "(не задано)"
 
-        balance_value = obj.balance
-        balance_class = ""
-        if balance_value < 0:
-            balance_class = "text-danger"
-        elif balance_value > 0:
-            balance_class = "text-success"
-        row["balance"] = (
-            f'<span class="{balance_class} fw-bold">{balance_value:.2f}</span>'
-        )
-
-        edit_url = reverse("building:personal_account_edit", args=[obj.pk])
-        detail_url = reverse("building:personal_account_detail", args=[obj.pk])
-        row["DT_RowAttr"] = {"data-detail-url": detail_url}
-        row["actions"] = f"""
-            <div class="text-end" style="white-space: nowrap;">
-                <a href="{edit_url}" class="btn btn-sm btn-primary"
-                    title="Редактировать" onclick="event.stopPropagation();">
-                    <i class="bi bi-pencil"></i>
-                </a>
-                <button type="button" class="btn btn-sm btn-danger delete-account-btn"
-                        data-id="{obj.pk}" data-name="{obj.number}" title="Удалить">
-                    <i class="bi bi-trash"></i>
-                </button>
-            </div>
-        """
+        row["balance"] = f"{obj.balance:.2f}"
         return row
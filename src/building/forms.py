@@ -224,7 +224,7 @@ class ApartmentForm(forms.ModelForm):
 
         if old_personal_account and old_personal_account != new_personal_account:
             old_personal_account.status = "inactive"
-            old_personal_account.save()
+            old_personal_account.save(update_fields=["status"])
 
         return apartment
 
@@ -1,6 +1,9 @@
 """src/building/models.py."""
 
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.indexes import OpClass
 from django.db import models
+from django.db.models.functions import Upper
 
 
 class House(models.Model):
@@ -114,6 +117,13 @@ class PersonalAccount(models.Model):
 
         verbose_name = "Personal account"
         verbose_name_plural = "Personals accounts"
+        indexes = [
+            # number__icontains, run by PostgreSQL as UPPER(number) LIKE '%...%'.
+            GinIndex(
+                OpClass(Upper("number"), name="gin_trgm_ops"),
+                name="building_account_number_trgm",
+            ),
+        ]
 
     def __str__(self):
         """__str__."""
@@ -166,6 +176,13 @@ class Apartment(models.Model):
             "house",
             "number",
         )
+        indexes = [
+            # number__icontains, run by PostgreSQL as UPPER(number) LIKE '%...%'.
+            GinIndex(
+                OpClass(Upper("number"), name="gin_trgm_ops"),
+                name="building_apartment_number_trgm",
+            ),
+        ]
 
     def __str__(self):
         """__str__."""
@@ -0,0 +1,59 @@
+"""src/building/signals.py."""
+
+from django.db.models.signals import pre_save
+from django.dispatch import receiver
+
+from .models import Apartment
+
+PREVIOUS_STATE_ATTR = "_apartment_previous_state"
+
+# Apartment columns the derived tables depend on: the search index, the
+# owner listings and the monthly rollup.
+APARTMENT_TRACKED_FIELDS = ("number", "house_id", "owner_id", "personal_account_id")
+
+
+@receiver(pre_save, sender=Apartment)
+def apartment_pre_save(sender, instance, update_fields=None, **kwargs):
+    """Remember the tracked columns of an apartment before the save.
+
+    The row is read once per save for all handlers, see
+    ``previous_apartment_state``. Nothing is queried for new apartments or
+    when ``update_fields`` does not touch a tracked column.
+    """
+    previous = None
+    if instance.pk is not None:
+        tracked = {
+            name
+            for field in APARTMENT_TRACKED_FIELDS
+            for name in (field, field.removesuffix("_id"))
+        }
+        if update_fields is not None and not tracked & set(update_fields):
+            previous = {
+                field: getattr(instance, field) for field in APARTMENT_TRACKED_FIELDS
+            }
+        else:
+            previous = (
+                Apartment.objects.filter(pk=instance.pk)
+                .values(*APARTMENT_TRACKED_FIELDS)
+                .first()
+            )
+    setattr(instance, PREVIOUS_STATE_ATTR, previous)
+
+
+def previous_apartment_state(instance):
+    """Return the tracked columns of an apartment as they were before the save.
+
+    ``None`` for an apartment that did not exist yet.
+    """
+    return getattr(instance, PREVIOUS_STATE_ATTR, None)
+
+
+def apartment_changed(instance, fields):
+    """Return whether the last save changed any of ``fields``.
+
+    Always true for a new apartment.
+    """
+    previous = previous_apartment_state(instance)
+    return previous is None or any(
+        previous[field] != getattr(instance, field) for field in fields
+    )
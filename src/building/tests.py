@@ -1 +1,138 @@
 """src/building/tests.py."""
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from src.building.models import Apartment
+from src.building.models import House
+from src.building.models import PersonalAccount
+from src.building.models import Section
+from src.core.testing import assert_query_budget
+from src.users.models import User
+
+
+def _add_accounts(house, section, owner, count):
+    start = PersonalAccount.objects.count()
+    for n in range(start, start + count):
+        account = PersonalAccount.objects.create(number=f"{n:010d}")
+        Apartment.objects.create(
+            number=str(n),
+            house=house,
+            section=section,
+            owner=owner,
+            personal_account=account,
+        )
+    # An account without an apartment is exported with placeholders.
+    PersonalAccount.objects.create(number=f"{start + count:010d}")
+
+
+def _datatable_data(columns, length=10):
+    data = {"draw": 1, "start": 0, "length": length}
+    for index, name in enumerate(columns):
+        data[f"columns[{index}][data]"] = name
+        data[f"columns[{index}][name]"] = ""
+    return data
+
+
+def _export_queries(client, file_format):
+    url = reverse("building:personal_account_export_excel")
+    with CaptureQueriesContext(connection) as queries:
+        response = client.get(url, {"format": file_format})
+        content = b"".join(response.streaming_content)
+    assert response.status_code == 200  # noqa: PLR2004
+    return len(queries), content
+
+
+@pytest.mark.django_db()
+@pytest.mark.parametrize("file_format", ["csv", "xlsx"])
+def test_personal_account_export_runs_a_constant_number_of_queries(client, file_format):
+    """The export does not query the related rows of every account."""
+    admin = User.objects.create_superuser("admin", "admin@example.com", "admin")
+    owner = User.objects.create_user(
+        "owner", "owner@example.com", first_name="Иван", last_name="Петров"
+    )
+    house = House.objects.create(title="Дом 1", address="ул. Тестовая, 1")
+    section = Section.objects.create(name="Секция 1", house=house)
+    client.force_login(admin)
+
+    _add_accounts(house, section, owner, 2)
+    few_queries, _content = _export_queries(client, file_format)
+
+    _add_accounts(house, section, owner, 20)
+    many_queries, content = _export_queries(client, file_format)
+
+    assert many_queries == few_queries
+    if file_format == "csv":
+        lines = content.decode("utf-8-sig").splitlines()
+        assert len(lines) == 1 + PersonalAccount.objects.count()
+        assert "Петров Иван" in lines[1]
+
+
+@pytest.mark.django_db()
+def test_apartment_table_sends_url_templates_and_compact_rows(client):
+    """Row links come once per draw as templates, rows come column by column."""
+    admin = User.objects.create_superuser("admin", "admin@example.com", "admin")
+    owner = User.objects.create_user("owner", first_name="Иван", last_name="Петров")
+    house = House.objects.create(title="Дом 1", address="ул. Тестовая, 1")
+    section = Section.objects.create(name="Секция 1", house=house)
+    _add_accounts(house, section, owner, 2)
+    client.force_login(admin)
+
+    data = _datatable_data(
+        ["number", "house", "section", "floor", "owner", "balance", ""]
+    )
+    response = client.post(reverse("building:ajax_datatable_apartments"), data)
+
+    payload = response.json()
+    assert payload["urls"] == {
+        "detail": reverse("building:apartment_detail", args=[0]).replace("0", "{id}"),
+        "edit": reverse("building:apartment_edit", args=[0]).replace("0", "{id}"),
+    }
+    columns = payload["columns"]
+    assert columns["id"] == list(
+        Apartment.objects.order_by("pk").values_list("pk", flat=True)
+    )
+    assert columns["owner"][0] == "Петров Иван"
+    assert columns["balance"][0] == "0.00"
+    assert not any("<" in str(values) for values in columns.values())
+
+
+@pytest.mark.django_db()
+@pytest.mark.parametrize(
+    ("url_name", "columns"),
+    [
+        (
+            "building:ajax_datatable_apartments",
+            ["number", "house", "section", "floor", "owner", "balance"],
+        ),
+        (
+            "building:ajax_datatable_personal_accounts",
+            [
+                "pk",
+                "number",
+                "status",
+                "apartment_number",
+                "house",
+                "section",
+                "owner",
+                "balance",
+            ],
+        ),
+    ],
+)
+def test_building_tables_stay_within_their_query_budget(client, url_name, columns):
+    """A page of rows costs the same queries whatever the related rows."""
+    admin = User.objects.create_superuser("admin", "admin@example.com", "admin")
+    owner = User.objects.create_user("owner", first_name="Иван", last_name="Петров")
+    house = House.objects.create(title="Дом 1", address="ул. Тестовая, 1")
+    section = Section.objects.create(name="Секция 1", house=house)
+    _add_accounts(house, section, owner, 10)
+    client.force_login(admin)
+
+    response = assert_query_budget(
+        client, reverse(url_name), method="post", data=_datatable_data(columns)
+    )
+
+    assert len(response.json()["columns"]["id"]) == 10  # noqa: PLR2004
@@ -1,21 +1,19 @@
 """src/building/views.py."""
 
-import openpyxl
 from django.contrib.auth.mixins import LoginRequiredMixin
 from django.core.exceptions import ValidationError
 from django.db import DatabaseError
 from django.db import transaction
-from django.db.models import Sum
-from django.http import HttpResponse
 from django.urls import reverse_lazy
-from django.views import View
 from django.views.generic import CreateView
 from django.views.generic import DetailView
 from django.views.generic import ListView
 from django.views.generic import UpdateView
-from openpyxl.styles import Font
 
-from src.finance.models import CashBox
+from src.core.exports import EXPORT_CHUNK_SIZE
+from src.core.models import ExportJob
+from src.core.views import ExportView
+from src.finance.summary import get_finance_totals
 from src.users.models import User
 from src.users.models import logger
 from src.users.permissions import RoleRequiredMixin
@@ -246,30 +244,10 @@ class PersonalAccountListView(LoginRequiredMixin, RoleRequiredMixin, ListView):
             "last_name", "first_name"
         )
 
-        income = (
-            CashBox.objects.filter(is_posted=True, article__type="income").aggregate(
-                s=Sum("amount")
-            )["s"]
-            or 0
-        )
-        expense = (
-            CashBox.objects.filter(is_posted=True, article__type="expense").aggregate(
-                s=Sum("amount")
-            )["s"]
-            or 0
-        )
-        context["total_cash"] = income - expense
-
-        context["total_balance_accounts"] = (
-            Apartment.objects.aggregate(total=Sum("personal_account__balance"))["total"]
-            or 0
-        )
-        context["total_debt"] = (
-            Apartment.objects.filter(personal_account__balance__lt=0).aggregate(
-                total=Sum("personal_account__balance")
-            )["total"]
-            or 0
-        )
+        totals = get_finance_totals()
+        context["total_cash"] = totals["total_cash"]
+        context["total_balance_accounts"] = totals["total_balance"]
+        context["total_debt"] = totals["total_debt"]
 
         return context
 
@@ -353,12 +331,28 @@ class PersonalAccountUpdateView(LoginRequiredMixin, RoleRequiredMixin, UpdateVie
             return super().form_valid(form)
 
 
-class ExportPersonalAccountsExcelView(LoginRequiredMixin, RoleRequiredMixin, View):
+class ExportPersonalAccountsExcelView(
+    LoginRequiredMixin, RoleRequiredMixin, ExportView
+):
     """Handle the export of personal accounts to an Excel file."""
 
     permission_required = "has_personal_account"
 
-    def filter_queryset(self, request):
+    export_kind = ExportJob.Kind.PERSONAL_ACCOUNTS
+    export_filename = "personal_accounts"
+    sheet_title = "Лицевые счета"
+    headers = (
+        "№",
+        "Статус",
+        "Квартира",
+        "Дом",
+        "Секция",
+        "Владелец",
+        "Остаток (грн)",
+    )
+    column_widths = (20, 15, 15, 25, 20, 35, 20)
+
+    def filter_queryset(self, params):
         """Apply filters from request parameters to the queryset."""
         queryset = PersonalAccount.objects.all().order_by("pk")
 
@@ -372,11 +366,11 @@ class ExportPersonalAccountsExcelView(LoginRequiredMixin, RoleRequiredMixin, Vie
         }
 
         for param, (field, cast) in filters_map.items():
-            value = request.GET.get(param, "").strip()
+            value = params.get(param, "").strip()
             if value:
                 queryset = queryset.filter(**{field: cast(value)})
 
-        balance = request.GET.get("balance", "").strip()
+        balance = params.get("balance", "").strip()
         if balance:
             if balance == "debt":
                 queryset = queryset.filter(balance__lt=0)
@@ -387,56 +381,41 @@ class ExportPersonalAccountsExcelView(LoginRequiredMixin, RoleRequiredMixin, Vie
 
         return queryset
 
-    def get(self, request, *args, **kwargs):
-        """Generate and return an Excel file with filtered personal account data."""
-        queryset = self.filter_queryset(request)
-
-        workbook = openpyxl.Workbook()
-        sheet = workbook.active
-        sheet.title = "Лицевые счета"
-
-        headers = [
-            "№",
-            "Статус",
-            "Квартира",
-            "Дом",
-            "Секция",
-            "Владелец",
-            "Остаток (грн)",
-        ]
-        sheet.append(headers)
-
-        for cell in sheet[1]:
-            cell.font = Font(bold=True)
-
-        for account in queryset:
-            apt = getattr(account, "apartment", None)
-
-            row_data = [
-                account.number,
-                "Активен" if account.status == "active" else "Неактивен",
-                getattr(apt, "number", "(не задано)") if apt else "(не задано)",
-                getattr(apt.house, "title", "(не задано)")
-                if apt and apt.house
-                else "(не задано)",
-                getattr(apt.section, "name", "(не задано)")
-                if apt and apt.section
-                else "(не задано)",
-                apt.owner.get_full_name() if apt and apt.owner else "(не задано)",
-                account.balance,
-            ]
-            sheet.append(row_data)
-
-        column_widths = [20, 15, 15, 25, 20, 35, 20]
-        for i, width in enumerate(column_widths, 1):
-            sheet.column_dimensions[openpyxl.utils.get_column_letter(i)].width = width
-
-        response = HttpResponse(
-            content_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
-        )
-        response["Content-Disposition"] = (
-            'attachment; filename="personal_accounts.xlsx"'
+    # Everything the rows need, fetched in the same query as the accounts.
+    export_fields = (
+        "number",
+        "status",
+        "balance",
+        "apartment__number",
+        "apartment__house__title",
+        "apartment__section__name",
+        "apartment__owner_id",
+        "apartment__owner__last_name",
+        "apartment__owner__first_name",
+        "apartment__owner__middle_name",
+    )
+
+    def rows(self, queryset):
+        """Yield the export rows, fetching the accounts in chunks."""
+        not_set = "(не задано)"
+        accounts = queryset.values(*self.export_fields).iterator(
+            chunk_size=EXPORT_CHUNK_SIZE
         )
-
-        workbook.save(response)
-        return response
+        for account in accounts:
+            owner = not_set
+            if account["apartment__owner_id"]:
+                owner = (
+                    f"{account['apartment__owner__last_name']} "
+                    f"{account['apartment__owner__first_name']} "
+                    f"{account['apartment__owner__middle_name']}"
+                ).strip()
+
+            yield [
+                account["number"],
+                "Активен" if account["status"] == "active" else "Неактивен",
+                account["apartment__number"] or not_set,
+                account["apartment__house__title"] or not_set,
+                account["apartment__section__name"] or not_set,
+                owner,
+                account["balance"],
+            ]
@@ -1,18 +1,19 @@
 """src/cabinet/views.py."""
 
 import datetime
-import io
 import logging
+from collections import defaultdict
 
+from django.conf import settings
 from django.contrib import messages
 from django.contrib.auth.mixins import LoginRequiredMixin
 from django.core.exceptions import ValidationError
+from django.core.files.storage import default_storage
 from django.db import DatabaseError
 from django.db import transaction
 from django.db.models import Avg
 from django.db.models import Max
-from django.db.models import Sum
-from django.db.models.functions import TruncMonth
+from django.http import FileResponse
 from django.http import HttpResponse
 from django.shortcuts import get_object_or_404
 from django.shortcuts import redirect
@@ -24,19 +25,22 @@ from django.views.generic import DetailView
 from django.views.generic import FormView
 from django.views.generic import ListView
 from django.views.generic import UpdateView
-from weasyprint import HTML
-from xlsx2html import xlsx2html
 
 from src.building.models import Apartment
 from src.cabinet.forms import CabinetTicketForm
 from src.cabinet.forms import PaymentCardForm
-from src.core.utils import ReceiptExcelGenerator
+from src.core.pdf import RenderStillRunningError
 from src.finance.models import Article
 from src.finance.models import CashBox
-from src.finance.models import PrintTemplate
+from src.finance.models import MonthlyRollup
 from src.finance.models import Receipt
-from src.finance.models import ReceiptItem
 from src.finance.models import TariffService
+from src.finance.receipts import get_print_template
+from src.finance.receipts import get_receipt_html
+from src.finance.receipts import get_receipt_pdf
+from src.finance.receipts import read_receipt_file
+from src.finance.receipts import receipts_for_rendering
+from src.finance.tasks import prerender_receipt_task
 from src.users.forms import OwnerProfileForm
 from src.users.models import Message
 from src.users.models import MessageRecipient
@@ -305,104 +309,76 @@ class CabinetTicketCreateView(LoginRequiredMixin, CreateView):
         return redirect(self.get_success_url())
 
 
+def _get_owner_receipt(request, pk):
+    return get_object_or_404(
+        receipts_for_rendering(), pk=pk, apartment__owner=request.user
+    )
+
+
 class ReceiptPdfView(LoginRequiredMixin, View):
     """Receiption pdf view."""
 
     def get(self, request, pk):
-        """Get."""
-        receipt = get_object_or_404(Receipt, pk=pk, apartment__owner=request.user)
+        """Get.
 
-        template = PrintTemplate.objects.filter(is_default=True).first()
-        if not template:
-            template = PrintTemplate.objects.first()
+        The PDF is rendered once per version of the receipt data and then
+        served from storage, see ``src.finance.receipts.get_receipt_pdf``.
+        """
+        receipt = _get_owner_receipt(request, pk)
 
+        template = get_print_template()
         if not template:
             return HttpResponse("Шаблон квитанции не найден.", status=404)
 
         # FIXED: TRY300 - Move success return to else block
         try:
-            generator = ReceiptExcelGenerator(receipt, template.template_file.path)
-            workbook = generator.generate_workbook()
-
-            excel_buffer = io.BytesIO()
-            workbook.save(excel_buffer)
-            excel_buffer.seek(0)
-
-            html_buffer = io.StringIO()
-            xlsx2html(excel_buffer, html_buffer)
-            raw_html = html_buffer.getvalue()
-
-            custom_css = """
-            <style>
-                @page {
-                    size: 250mm 300mm;
-
-                    margin: 0;
-                }
-
-                body {
-                    margin: 10mm;
-                    padding: 0;
-
-                    overflow: hidden;
-
-                    background-color: white;
-                }
-
-                table {
-                    border-collapse: collapse;
-                    border-spacing: 0;
-                }
-
-                tr[height="0"], tr[style*="height:0"], tr[style*="height: 0"] {
-                    display: none !important;
-                }
-            </style>
-            """
-
-            final_html_content = custom_css + raw_html
-
-            pdf_file = HTML(
-                string=final_html_content, base_url=request.build_absolute_uri()
-            ).write_pdf()
-
+            pdf_name = get_receipt_pdf(
+                receipt, template, timeout=settings.PDF_RENDER_TIMEOUT
+            )
+            pdf_file = default_storage.open(pdf_name)
+
+        except TimeoutError as error:
+            # A retry reads the file. A render still running in the pool
+            # stores it, one that never started is left to Celery.
+            if not isinstance(error, RenderStillRunningError):
+                prerender_receipt_task.delay(receipt.pk)
+            response = HttpResponse(
+                "Квитанция формируется, повторите попытку через минуту.",
+                status=503,
+            )
+            response["Retry-After"] = "60"
+            return response
         except (OSError, ValueError, RuntimeError) as e:
             logger.exception("Error generating PDF for receipt %s", receipt.number)
             return HttpResponse(f"Ошибка при формировании PDF: {e!s}", status=500)
         else:
             # Success path - only executes if no exception occurred
-            response = HttpResponse(pdf_file, content_type="application/pdf")
-            response["Content-Disposition"] = (
-                f'attachment; filename="receipt_{receipt.number}.pdf"'
+            return FileResponse(
+                pdf_file,
+                as_attachment=True,
+                filename=f"receipt_{receipt.number}.pdf",
+                content_type="application/pdf",
             )
-            return response
 
 
 class ReceiptPrintView(LoginRequiredMixin, View):
     """View to render the receipt as HTML and trigger the browser print dialog."""
 
     def get(self, request, pk):
-        """Get."""
-        receipt = get_object_or_404(Receipt, pk=pk, apartment__owner=request.user)
+        """Get.
 
-        template = PrintTemplate.objects.filter(is_default=True).first()
-        if not template:
-            template = PrintTemplate.objects.first()
+        Posted receipts are usually pre-rendered, the stored HTML is reused.
+        """
+        receipt = _get_owner_receipt(request, pk)
 
+        template = get_print_template()
         if not template:
             return HttpResponse("Шаблон квитанции не найден.", status=404)
 
         try:
-            generator = ReceiptExcelGenerator(receipt, template.template_file.path)
-            workbook = generator.generate_workbook()
-
-            excel_buffer = io.BytesIO()
-            workbook.save(excel_buffer)
-            excel_buffer.seek(0)
-
-            html_buffer = io.StringIO()
-            xlsx2html(excel_buffer, html_buffer)
-            html_content = html_buffer.getvalue()
+            html_content = read_receipt_file(
+                get_receipt_html(receipt, template)
+            ).decode()
 
             custom_html = f"""
             <!DOCTYPE html>
@@ -493,43 +469,28 @@ class CabinetSummaryView(LoginRequiredMixin, DetailView):
 
         context["avg_expense"] = avg_expense
 
-        monthly_expenses = (
-            Receipt.objects.filter(
-                apartment=apartment, date__year=current_year, is_posted=True
-            )
-            .annotate(month=TruncMonth("date"))
-            .values("month")
-            .annotate(total=Sum("total_amount"))
-            .order_by("month")
-        )
+        rollup = MonthlyRollup.objects.filter(
+            kind=MonthlyRollup.Kind.RECEIPT,
+            apartment=apartment,
+            month__year=current_year,
+        ).values_list("month", "service__name", "amount")
 
         chart_data_year = [0.0] * 12
-        chart_labels_year = []
-        for i in range(1, 13):
-            date_obj = datetime.date(current_year, i, 1)
-            chart_labels_year.append(date_obj.strftime("%b %Y"))
-
-            for entry in monthly_expenses:
-                if entry["month"].month == i:
-                    chart_data_year[i - 1] = float(entry["total"])
-                    break
-
-        context["chart_labels_year"] = chart_labels_year
+        service_totals = defaultdict(float)
+        for month, service_name, amount in rollup:
+            chart_data_year[month.month - 1] += float(amount)
+            service_totals[service_name] += float(amount)
+
+        context["chart_labels_year"] = [
+            datetime.date(current_year, i, 1).strftime("%b %Y") for i in range(1, 13)
+        ]
         context["chart_data_year"] = chart_data_year
 
-        category_expenses = (
-            ReceiptItem.objects.filter(
-                receipt__apartment=apartment,
-                receipt__date__year=current_year,
-                receipt__is_posted=True,
-            )
-            .values("service__name")
-            .annotate(total=Sum("amount"))
-            .order_by("-total")
+        category_expenses = sorted(
+            service_totals.items(), key=lambda item: item[1], reverse=True
         )
-
-        chart_labels_pie = [item["service__name"] for item in category_expenses]
-        chart_data_pie = [float(item["total"]) for item in category_expenses]
+        chart_labels_pie = [name for name, _total in category_expenses]
+        chart_data_pie = [total for _name, total in category_expenses]
 
         context["chart_labels_pie"] = chart_labels_pie
         context["chart_data_pie"] = chart_data_pie
@@ -600,7 +561,9 @@ class PaymentProcessView(LoginRequiredMixin, FormView):
                     self.receipt.apartment.personal_account.balance += (
                         self.receipt.total_amount
                     )
-                    self.receipt.apartment.personal_account.save()
+                    self.receipt.apartment.personal_account.save(
+                        update_fields=["balance"]
+                    )
 
             messages.success(
                 self.request, f"Оплата квитанции №{self.receipt.number} прошла успешно!"
@@ -0,0 +1,72 @@
+"""src/core/api.py."""
+
+from django.http import FileResponse
+from django.http import HttpRequest
+from django.shortcuts import get_object_or_404
+from django.urls import reverse
+from ninja import Router
+
+from src.users.models import User
+
+from .models import ExportJob
+from .schemas import ExportJobSchema
+from .schemas import SearchResultSchema
+from .schemas import StatusResponse
+from .search import SEARCH_LIMIT
+from .search import SEARCH_MAX_LIMIT
+from .search import entry_url
+from .search import search
+
+router = Router(tags=["Exports"])
+search_router = Router(tags=["Search"])
+
+
+@router.get("/{job_id}", response=ExportJobSchema, url_name="export_job")
+def get_export_job(request: HttpRequest, job_id: int):
+    """Return the progress of an export job of the current user."""
+    job = get_object_or_404(ExportJob, pk=job_id, user=request.user)
+    job.download_url = (
+        reverse("api-1.0.0:export_job_download", kwargs={"job_id": job.pk})
+        if job.status == ExportJob.Status.DONE
+        else None
+    )
+    return job
+
+
+@router.get("/{job_id}/download", url_name="export_job_download")
+def download_export_job(request: HttpRequest, job_id: int):
+    """Return the file of a finished export job of the current user."""
+    job = get_object_or_404(
+        ExportJob, pk=job_id, user=request.user, status=ExportJob.Status.DONE
+    )
+    return FileResponse(
+        job.file.open("rb"),
+        as_attachment=True,
+        filename=job.file.name.rsplit("/", 1)[-1],
+    )
+
+
+@search_router.get(
+    "/",
+    response={200: list[SearchResultSchema], 403: StatusResponse},
+    url_name="global_search",
+)
+def global_search(request: HttpRequest, q: str = "", limit: int = SEARCH_LIMIT):
+    """Find owners, apartments, personal accounts and receipts.
+
+    Owners are found by name, phone, email and ID, the others by number.
+    """
+    if request.user.user_type != User.UserType.EMPLOYEE:
+        return 403, {"status": "error", "message": "Доступ запрещен."}
+    limit = min(max(limit, 1), SEARCH_MAX_LIMIT)
+    return [
+        {
+            "kind": entry.kind,
+            "kind_display": entry.get_kind_display(),
+            "object_id": entry.object_id,
+            "title": entry.title,
+            "subtitle": entry.subtitle,
+            "url": entry_url(entry),
+        }
+        for entry in search(q, limit)
+    ]
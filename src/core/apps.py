@@ -8,3 +8,7 @@ class CoreConfig(AppConfig):
 
     default_auto_field = "django.db.models.BigAutoField"
     name = "src.core"
+
+    def ready(self):
+        """Connect the handlers that keep the search index up to date."""
+        from . import signals  # noqa: F401
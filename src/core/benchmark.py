@@ -0,0 +1,289 @@
+"""src/core/benchmark.py."""
+
+import inspect
+import re
+import statistics
+import time
+
+from ajax_datatable.views import AjaxDatatableView
+from django.db import connection
+from django.test import Client
+from django.test import RequestFactory
+from django.test.utils import CaptureQueriesContext
+from django.urls import URLResolver
+from django.urls import get_resolver
+from django.views.generic import ListView
+from django.views.generic import TemplateView
+from ninja.operation import PathView
+
+from src.building.models import Apartment
+from src.building.models import House
+from src.building.models import PersonalAccount
+from src.finance.models import Counter
+from src.finance.models import Receipt
+from src.finance.models import Service
+from src.finance.models import Tariff
+from src.users.models import Message
+from src.users.models import Role
+from src.users.models import Ticket
+from src.users.models import User
+
+ROUTE_PARAM_RE = re.compile(r"<(?:\w+:)?(\w+)>")
+
+# URL and query parameters filled with the first matching row of the dataset.
+SAMPLE_QUERYSETS = {
+    "house_id": lambda: House.objects.all(),
+    "apartment_id": lambda: Apartment.objects.all(),
+    "account_id": lambda: PersonalAccount.objects.all(),
+    "personal_account_id": lambda: PersonalAccount.objects.all(),
+    "tariff_id": lambda: Tariff.objects.all(),
+    "service_id": lambda: Service.objects.all(),
+    "counter_id": lambda: Counter.objects.all(),
+    "receipt_id": lambda: Receipt.objects.all(),
+    "owner_id": lambda: User.objects.filter(user_type=User.UserType.OWNER),
+    "user_id": lambda: User.objects.all(),
+    "role_id": lambda: Role.objects.all(),
+    "ticket_id": lambda: Ticket.objects.all(),
+    "message_id": lambda: Message.objects.all(),
+}
+
+DATATABLE_PAGE_LENGTH = 10
+
+
+def iter_url_patterns(patterns=None, prefix=""):
+    """Yield ``(route, pattern)`` for every URL pattern of the project."""
+    if patterns is None:
+        patterns = get_resolver().url_patterns
+    for entry in patterns:
+        if isinstance(entry, URLResolver):
+            yield from iter_url_patterns(
+                entry.url_patterns, prefix + str(entry.pattern)
+            )
+        else:
+            yield prefix + str(entry.pattern), entry
+
+
+class BenchmarkRunner:
+    """Measure latency and SQL query count of views, datatables and API.
+
+    Targets of the owner cabinet are requested as ``owner``, everything else
+    as ``user``.
+    """
+
+    def __init__(self, user, owner=None, repeat=5, name_filter=None):
+        """Log in one client per audience."""
+        self.repeat = repeat
+        self.name_filter = name_filter
+        self.users = {"staff": user, "owner": owner}
+        self.clients = {}
+        for audience, audience_user in self.users.items():
+            if audience_user is not None:
+                client = Client(raise_request_exception=False)
+                client.force_login(audience_user)
+                self.clients[audience] = client
+        self._samples = {}
+
+    def sample_value(self, name, audience="staff"):
+        """Return a primary key usable for the parameter ``name``."""
+        key = (name, audience)
+        if key not in self._samples:
+            queryset = SAMPLE_QUERYSETS.get(name)
+            value = None
+            if queryset is not None:
+                queryset = queryset()
+                if audience == "owner":
+                    queryset = self._owned(queryset)
+                value = queryset.order_by("pk").values_list("pk", flat=True).first()
+            self._samples[key] = value
+        return self._samples[key]
+
+    def _owned(self, queryset):
+        """Restrict a sample queryset to the objects of the cabinet owner."""
+        owner = self.users["owner"]
+        lookups = {
+            Apartment: "owner",
+            Receipt: "apartment__owner",
+            Ticket: "user",
+            Message: "recipients",
+        }
+        lookup = lookups.get(queryset.model)
+        return queryset.filter(**{lookup: owner}) if lookup else queryset
+
+    def build_path(self, target):
+        """Substitute sample values into the route, or return ``None``."""
+        values = {}
+        for name in ROUTE_PARAM_RE.findall(target["route"]):
+            value = self.sample_value(name, target["audience"])
+            if value is None:
+                return None
+            values[name] = value
+        return "/" + ROUTE_PARAM_RE.sub(
+            lambda m: str(values[m.group(1)]), target["route"]
+        )
+
+    def collect_targets(self):
+        """Find every list view, datatable view and ninja endpoint."""
+        targets = []
+        for route, pattern in iter_url_patterns():
+            callback = pattern.callback
+            view_class = getattr(callback, "view_class", None)
+            path_view = getattr(callback, "__self__", None)
+
+            if isinstance(path_view, PathView):
+                targets.extend(
+                    self._api_target(route, operation)
+                    for operation in path_view.operations
+                )
+                continue
+            if view_class is None:
+                continue
+            if issubclass(view_class, AjaxDatatableView):
+                kind = "datatable"
+            elif issubclass(view_class, (ListView, TemplateView)):
+                kind = "view"
+            else:
+                continue
+            targets.append(
+                {
+                    "kind": kind,
+                    "name": view_class.__name__,
+                    "route": route,
+                    "audience": self._audience(view_class.__module__),
+                    "methods": ["GET"],
+                    "query_params": [],
+                    "view_class": view_class,
+                }
+            )
+
+        if self.name_filter:
+            targets = [
+                t
+                for t in targets
+                if self.name_filter in t["name"] or self.name_filter in t["route"]
+            ]
+        return sorted(targets, key=lambda t: (t["kind"], t["route"], t["name"]))
+
+    @staticmethod
+    def _audience(module):
+        return "owner" if module.startswith("src.cabinet.") else "staff"
+
+    def _api_target(self, route, operation):
+        route_params = set(ROUTE_PARAM_RE.findall(route))
+        signature = inspect.signature(operation.view_func)
+        query_params = [
+            name
+            for name, param in list(signature.parameters.items())[1:]
+            if name not in route_params and param.default is inspect.Parameter.empty
+        ]
+        return {
+            "kind": "api",
+            "name": operation.view_func.__name__,
+            "route": route,
+            "audience": self._audience(operation.view_func.__module__),
+            "methods": operation.methods,
+            "query_params": query_params,
+        }
+
+    def run(self):
+        """Run all benchmarks and return the results and skipped targets."""
+        results = []
+        skipped = []
+        for target in self.collect_targets():
+            reason = self._skip_reason(target)
+            if reason:
+                skipped.append({**self._describe(target), "reason": reason})
+            else:
+                results.append(self.measure(target))
+        return results, skipped
+
+    def _describe(self, target):
+        return {
+            "kind": target["kind"],
+            "name": target["name"],
+            "route": target["route"],
+            "audience": target["audience"],
+        }
+
+    def _skip_reason(self, target):
+        if "GET" not in target["methods"]:
+            return "mutating endpoint ({})".format(", ".join(target["methods"]))
+        if target["audience"] not in self.clients:
+            return f"no {target['audience']} user to log in with"
+        if self.build_path(target) is None:
+            return "no sample data for URL parameters"
+        if any(
+            self.sample_value(name, target["audience"]) is None
+            for name in target["query_params"]
+        ):
+            return "no sample data for query parameters"
+        return None
+
+    def _request_data(self, target, path):
+        data = {
+            name: self.sample_value(name, target["audience"])
+            for name in target["query_params"]
+        }
+        if target["kind"] == "datatable":
+            data.update(self._datatable_params(target, path))
+        return data
+
+    def _datatable_params(self, target, path):
+        """Build the request DataTables sends for the first page of a table."""
+        request = RequestFactory().post(path)
+        request.user = self.users[target["audience"]]
+        request.REQUEST = request.POST
+        view = target["view_class"]()
+        view.initialize(request)
+
+        params = {
+            "draw": 1,
+            "start": 0,
+            "length": DATATABLE_PAGE_LENGTH,
+            "search[value]": "",
+            # The custom search box of the message tables.
+            "search_value": "",
+        }
+        order_column = None
+        for index, column in enumerate(view.column_specs):
+            base = f"columns[{index}]"
+            params[f"{base}[data]"] = column["name"]
+            params[f"{base}[name]"] = column["name"]
+            params[f"{base}[searchable]"] = str(column["searchable"]).lower()
+            params[f"{base}[orderable]"] = str(column["orderable"]).lower()
+            params[f"{base}[search][value]"] = ""
+            if order_column is None and column["orderable"]:
+                order_column = index
+        if order_column is not None:
+            params["order[0][column]"] = order_column
+            params["order[0][dir]"] = "asc"
+        return params
+
+    def measure(self, target):
+        """Request a target ``repeat`` times after one warm-up request."""
+        client = self.clients[target["audience"]]
+        path = self.build_path(target)
+        data = self._request_data(target, path)
+        headers = {}
+        if target["kind"] != "view":
+            headers["HTTP_ACCEPT"] = "application/json"
+        # The datatables post their parameters, like the DataTables frontend.
+        send = client.post if target["kind"] == "datatable" else client.get
+
+        send(path, data, **headers)
+        timings = []
+        for _run in range(self.repeat):
+            with CaptureQueriesContext(connection) as queries:
+                started = time.perf_counter()
+                response = send(path, data, **headers)
+                timings.append((time.perf_counter() - started) * 1000)
+
+        return {
+            **self._describe(target),
+            "path": path,
+            "status": response.status_code,
+            "queries": len(queries),
+            "response_bytes": None if response.streaming else len(response.content),
+            "min_ms": round(min(timings), 2),
+            "median_ms": round(statistics.median(timings), 2),
+            "max_ms": round(max(timings), 2),
+        }
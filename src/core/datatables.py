@@ -0,0 +1,293 @@
+"""src/core/datatables.py."""
+
+import hashlib
+import json
+import logging
+
+from django.core.cache import cache
+from django.core.exceptions import ValidationError
+from django.db import connections
+from django.db.models import Q
+from django.urls import reverse
+from redis.exceptions import RedisError
+
+logger = logging.getLogger(__name__)
+
+# Request parameters that change between draws of the same filtered table.
+PAGING_PARAMETERS = ("draw", "start", "length", "keyset")
+
+RECORDS_COUNT_KEY = "datatables:count:{signature}"
+
+# Stand-in pk the row URLs are reversed with, then replaced by ``{id}``.
+ROW_URL_PK = 2147483647
+ROW_URL_ID = "{id}"
+
+
+def _cache_get(key):
+    try:
+        return cache.get(key)
+    except RedisError:
+        logger.warning("Cache is unavailable, datatable state is not reused.")
+        return None
+
+
+def _cache_set(key, value, timeout):
+    try:
+        cache.set(key, value, timeout)
+    except RedisError:
+        logger.warning("Could not store datatable state in the cache.")
+
+
+class RowUrlsMixin:
+    """Row links for ``AjaxDatatableView`` tables, resolved once per draw.
+
+    Rows carry ids, codes and flags instead of markup. ``row_urls`` maps a key
+    to the name of a URL taking a pk; every name is reversed once per response
+    and sent as ``urls``, e.g. ``{"edit": "/adminlte/receipts/{id}/edit/"}``.
+    The page builds links, buttons and badges from the row data with
+    ``datatables-rows.js``.
+    """
+
+    row_urls = {}
+
+    def get_row_urls(self):
+        """Return the URL templates of the rows, ``{id}`` in place of the pk."""
+        return {
+            key: reverse(name, args=[ROW_URL_PK]).replace(str(ROW_URL_PK), ROW_URL_ID)
+            for key, name in self.row_urls.items()
+        }
+
+    def get_response_dict(self, request, paginator, draw_idx, start_pos):
+        """Send the URL templates along with the rows."""
+        response = super().get_response_dict(request, paginator, draw_idx, start_pos)
+        response["urls"] = self.get_row_urls()
+        return response
+
+
+class ColumnarResponseMixin:
+    """Column-oriented rows for ``AjaxDatatableView`` tables.
+
+    With ``columnar_response`` the rows are sent as ``columns``, one list of
+    values per field (``{"id": [1, 2], "status": ["paid", "unpaid"]}``),
+    instead of ``data`` repeating every field name in every row. Repeated
+    values end up next to each other, which also compresses better.
+    ``DataTableRows.dataSrc`` turns them back into rows.
+    """
+
+    columnar_response = True
+
+    def get_response_dict(self, request, paginator, draw_idx, start_pos):
+        """Send the rows of the draw column by column."""
+        response = super().get_response_dict(request, paginator, draw_idx, start_pos)
+        if self.columnar_response:
+            response["columns"] = self.get_columns(response.pop("data"))
+        return response
+
+    def get_columns(self, rows):
+        """Return ``{field: [value per row]}``, ``None`` where a row lacks it."""
+        fields = dict.fromkeys(field for row in rows for field in row)
+        return {field: [row.get(field) for row in rows] for field in fields}
+
+
+class RecordsCountMixin:
+    """Counting strategy for ``AjaxDatatableView`` tables.
+
+    Every draw counts the rows of the filter set, which is a full scan on
+    large tables. On PostgreSQL the planner estimate is used instead once it
+    reaches ``count_estimate_threshold`` rows: ``pg_class.reltuples`` for the
+    unfiltered table, the row estimate of ``EXPLAIN`` for a filtered one.
+    Smaller counts are exact and cached briefly per filter set. The response
+    carries ``recordsApproximate`` so the table can say "примерно N".
+    """
+
+    count_estimate_threshold = 100_000
+    count_cache_timeout = 30
+
+    def get_response_dict(self, request, paginator, draw_idx, start_pos):
+        """Count the rows with the counting strategy before paginating."""
+        if request.REQUEST.get("length") == "-1":
+            return super().get_response_dict(request, paginator, draw_idx, start_pos)
+
+        signature = self.get_filter_signature(request)
+        count, exact = self.get_records_count(paginator.object_list, signature)
+        # Paginator.count is a cached property, set it to skip its COUNT(*).
+        paginator.count = count
+        response = super().get_response_dict(request, paginator, draw_idx, start_pos)
+        response["recordsApproximate"] = not exact
+        return response
+
+    def get_filter_signature(self, request):
+        """Return a key identifying the filter set and ordering of a draw."""
+        parameters = sorted(
+            (key, request.REQUEST.getlist(key))
+            for key in request.REQUEST
+            if key not in PAGING_PARAMETERS
+        )
+        digest = hashlib.sha256(repr((request.path, parameters)).encode())
+        return digest.hexdigest()
+
+    def get_records_count(self, queryset, signature):
+        """Return ``(count, exact)`` for the rows of the queryset.
+
+        An exact count cached for the filter set wins, then a planner estimate
+        at or above the threshold, then a fresh exact count that is cached.
+        """
+        key = RECORDS_COUNT_KEY.format(signature=signature)
+        count = _cache_get(key)
+        if count is not None:
+            return count, True
+
+        estimate = self.get_estimated_count(queryset)
+        if estimate is not None and estimate >= self.count_estimate_threshold:
+            return estimate, False
+
+        count = queryset.count()
+        _cache_set(key, count, self.count_cache_timeout)
+        return count, True
+
+    def get_estimated_count(self, queryset):
+        """Return the planner estimate of the row count, or ``None``."""
+        connection = connections[queryset.db]
+        if connection.vendor != "postgresql":
+            return None
+
+        query = queryset.query
+        if not query.where and not query.distinct and not query.is_sliced:
+            table = connection.ops.quote_name(queryset.model._meta.db_table)  # noqa: SLF001
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    "SELECT reltuples::bigint FROM pg_class "
+                    "WHERE oid = to_regclass(%s)",
+                    [table],
+                )
+                row = cursor.fetchone()
+            # -1 (or 0 on older servers) until the table is vacuumed or analyzed.
+            if row and row[0] > 0:
+                return row[0]
+
+        plan = queryset.order_by().values("pk").explain(format="json")
+        try:
+            return int(json.loads(plan)[0]["Plan"]["Plan Rows"])
+        except (ValueError, LookupError, TypeError):
+            logger.warning("Could not read the row estimate of %s.", queryset.model)
+            return None
+
+
+class KeysetPaginationMixin(RecordsCountMixin):
+    """Keyset (seek) pagination for ``AjaxDatatableView`` tables.
+
+    When the table is ordered by ``keyset_field`` (``id`` breaks ties), the
+    response carries ``keyset``: the filter set, the start and the first and
+    last ``(keyset_field, id)`` of the page. The page sends it back with the
+    next draw (``DataTableRows.keyset``). The next page is then read with
+    ``WHERE (date, id) < (last date, last id)`` and the previous one from
+    the first row backwards, so rows added or removed meanwhile do not shift
+    them. Any other page (a jump, a reload, a new filter) and other orderings
+    use the default offset pagination. Rows are counted by
+    ``RecordsCountMixin``.
+
+    Needs an index on ``(keyset_field, id)`` to be fast.
+    """
+
+    keyset_pagination = True
+    keyset_field = "date"
+
+    def get_response_dict(self, request, paginator, draw_idx, start_pos):
+        """Read the page by keyset when the ordering and the cursor allow it."""
+        queryset = paginator.object_list
+        ordering = self.get_keyset_ordering(queryset)
+        if (
+            not self.keyset_pagination
+            or ordering is None
+            or request.REQUEST.get("length") == "-1"
+        ):
+            return super().get_response_dict(request, paginator, draw_idx, start_pos)
+
+        signature = self.get_filter_signature(request)
+        total, exact = self.get_records_count(queryset, signature)
+        queryset = queryset.order_by(*ordering)
+        start = max(start_pos, 0)
+        length = paginator.per_page
+        rows = self.get_keyset_page(
+            queryset, self.get_keyset_cursor(request, signature), start, length
+        )
+        if rows is None:
+            rows = list(queryset[start : start + length])
+        response = {
+            "draw": draw_idx,
+            "recordsTotal": total,
+            "recordsFiltered": total,
+            "recordsApproximate": not exact,
+            "data": self.prepare_results(request, rows),
+        }
+        if rows:
+            response["keyset"] = {
+                "signature": signature,
+                "start": start,
+                "first": self._keyset_key(rows[0]),
+                "last": self._keyset_key(rows[-1]),
+            }
+        return response
+
+    def get_keyset_ordering(self, queryset):
+        """Return ``(field, id)`` ordering of the queryset, or ``None``.
+
+        Only querysets ordered by ``keyset_field`` alone or followed by ``id``
+        in the same direction can be paginated by keyset.
+        """
+        order_by = tuple(queryset.query.order_by)
+        for prefix in ("-", ""):
+            field = prefix + self.keyset_field
+            if order_by in ((field,), (field, f"{prefix}id"), (field, f"{prefix}pk")):
+                return (field, f"{prefix}id")
+        return None
+
+    def get_keyset_cursor(self, request, signature):
+        """Return the ``keyset`` sent back by the page, or ``None``.
+
+        A cursor of another filter set or ordering is ignored.
+        """
+        try:
+            cursor = json.loads(request.REQUEST.get("keyset") or "null")
+            if cursor["signature"] != signature:
+                return None
+            field = self.model._meta.get_field(self.keyset_field)  # noqa: SLF001
+            return {
+                "start": int(cursor["start"]),
+                "first": (field.to_python(cursor["first"][0]), int(cursor["first"][1])),
+                "last": (field.to_python(cursor["last"][0]), int(cursor["last"][1])),
+            }
+        except (ValueError, LookupError, TypeError, ValidationError):
+            return None
+
+    def get_keyset_page(self, queryset, cursor, start, length):
+        """Return the rows of the page after or before the cursor page.
+
+        ``None`` when the page at ``start`` is neither, it is read by offset.
+        """
+        if cursor is None:
+            return None
+        descending = queryset.query.order_by[0].startswith("-")
+        if start == cursor["start"] + length:
+            after = queryset.filter(self._seek_filter(cursor["last"], descending))
+            return list(after[:length])
+        if start == cursor["start"] - length:
+            before = queryset.reverse().filter(
+                self._seek_filter(cursor["first"], not descending)
+            )
+            return list(before[:length])[::-1]
+        return None
+
+    def _keyset_key(self, obj):
+        return [getattr(obj, self.keyset_field).isoformat(), obj.pk]
+
+    def _seek_filter(self, cursor, descending):
+        value, pk = cursor
+        field = self.keyset_field
+        if descending:
+            return Q(**{f"{field}__lte": value}) & (
+                Q(**{f"{field}__lt": value}) | Q(**{field: value, "pk__lt": pk})
+            )
+        return Q(**{f"{field}__gte": value}) & (
+            Q(**{f"{field}__gt": value}) | Q(**{field: value, "pk__gt": pk})
+        )
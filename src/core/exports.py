@@ -0,0 +1,117 @@
+"""src/core/exports.py."""
+
+import csv
+import datetime
+import tempfile
+
+from django.http import FileResponse
+from django.http import StreamingHttpResponse
+from django.utils.module_loading import import_string
+from openpyxl import Workbook
+from openpyxl.cell import WriteOnlyCell
+from openpyxl.styles import Font
+from openpyxl.utils import get_column_letter
+
+from .models import ExportJob
+
+# Rows fetched from the database per round trip while exporting.
+EXPORT_CHUNK_SIZE = 2000
+
+# How long the files of background exports are kept.
+EXPORT_TTL = datetime.timedelta(days=1)
+
+# Views that know how to filter and render each kind of background export.
+EXPORT_VIEWS = {
+    ExportJob.Kind.CASHBOX: "src.finance.views.ExportCashBoxExcelView",
+    ExportJob.Kind.PERSONAL_ACCOUNTS: (
+        "src.building.views.ExportPersonalAccountsExcelView"
+    ),
+}
+
+XLSX_CONTENT_TYPE = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+
+
+class _Echo:
+    """File-like object that returns what is written, for ``csv.writer``."""
+
+    def write(self, value):
+        """Return the value instead of buffering it."""
+        return value
+
+
+def write_xlsx(file, sheet_title, headers, rows, column_widths=()):
+    """Write a workbook in openpyxl write-only mode.
+
+    Rows are written one by one without keeping the sheet in memory.
+    """
+    workbook = Workbook(write_only=True)
+    sheet = workbook.create_sheet(sheet_title)
+    for i, width in enumerate(column_widths, 1):
+        sheet.column_dimensions[get_column_letter(i)].width = width
+
+    bold = Font(bold=True)
+    header_cells = []
+    for header in headers:
+        cell = WriteOnlyCell(sheet, value=header)
+        cell.font = bold
+        header_cells.append(cell)
+    sheet.append(header_cells)
+
+    for row in rows:
+        sheet.append(row)
+    workbook.save(file)
+
+
+def xlsx_response(filename, sheet_title, headers, rows, column_widths=()):
+    """Return the rows as an ``.xlsx`` attachment.
+
+    The workbook is built in a temporary file and streamed from disk.
+    """
+    file = tempfile.TemporaryFile()
+    write_xlsx(file, sheet_title, headers, rows, column_widths)
+    file.seek(0)
+    return FileResponse(
+        file,
+        as_attachment=True,
+        filename=f"{filename}.xlsx",
+        content_type=XLSX_CONTENT_TYPE,
+    )
+
+
+def iter_csv(headers, rows):
+    """Yield the lines of a CSV file one row at a time."""
+    writer = csv.writer(_Echo())
+    # The BOM lets Excel detect UTF-8 for Cyrillic text.
+    yield "\ufeff"
+    yield writer.writerow(headers)
+    for row in rows:
+        yield writer.writerow(row)
+
+
+def write_csv(file, headers, rows):
+    """Write a UTF-8 CSV file to a binary file object."""
+    for line in iter_csv(headers, rows):
+        file.write(line.encode())
+
+
+def csv_response(filename, headers, rows):
+    """Return the rows as a ``.csv`` attachment streamed row by row."""
+    response = StreamingHttpResponse(
+        iter_csv(headers, rows), content_type="text/csv; charset=utf-8"
+    )
+    response["Content-Disposition"] = f'attachment; filename="{filename}.csv"'
+    return response
+
+
+def export_response(  # noqa: PLR0913
+    request, filename, sheet_title, headers, rows, column_widths=()
+):
+    """Return a CSV export for ``?format=csv`` and an Excel export otherwise."""
+    if request.GET.get("format") == "csv":
+        return csv_response(filename, headers, rows)
+    return xlsx_response(filename, sheet_title, headers, rows, column_widths)
+
+
+def get_exporter(kind):
+    """Return an instance of the export view of a job kind."""
+    return import_string(EXPORT_VIEWS[kind])()
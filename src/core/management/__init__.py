@@ -0,0 +1 @@
+"""src/core/management/__init__.py."""
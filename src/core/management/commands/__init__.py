@@ -0,0 +1 @@
+"""src/core/management/commands/__init__.py."""
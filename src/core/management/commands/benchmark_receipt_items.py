@@ -0,0 +1,77 @@
+"""src/core/management/commands/benchmark_receipt_items.py."""
+
+import statistics
+import time
+from decimal import Decimal
+
+from django.core.management.base import BaseCommand
+from django.core.management.base import CommandError
+
+from src.core.utils import ReceiptExcelGenerator
+from src.finance.models import ReceiptItem
+from src.finance.models import Service
+from src.finance.models import Unit
+from src.finance.receipts import get_print_template
+from src.finance.receipts import receipts_for_rendering
+
+
+def _fake_items(count):
+    """Return unsaved receipt items, enough to fill a receipt of any size."""
+    service = Service(name="Электроэнергия", unit=Unit(name="кВт·ч"))
+    return [
+        ReceiptItem(
+            service=service,
+            consumption=Decimal(i),
+            price_per_unit=Decimal("4.32"),
+            amount=Decimal(i) * Decimal("4.32"),
+        )
+        for i in range(1, count + 1)
+    ]
+
+
+class Command(BaseCommand):
+    """Time the item rows expansion of receipts of growing length."""
+
+    help = (
+        "Fill the print template for one receipt with 5, 50 and 500 generated "
+        "items (see --sizes) and report the workbook generation time."
+    )
+
+    def add_arguments(self, parser):
+        """Add command arguments."""
+        parser.add_argument("--sizes", type=int, nargs="+", default=[5, 50, 500])
+        parser.add_argument("--repeat", type=int, default=5)
+        parser.add_argument(
+            "--template-path", help="Path of an .xlsx template to use instead."
+        )
+
+    def handle(self, *args, **options):
+        """Handle the command."""
+        template_path = options["template_path"]
+        if not template_path:
+            template = get_print_template()
+            if template is None:
+                msg = "No print template found, pass --template-path."
+                raise CommandError(msg)
+            template_path = template.template_file.path
+
+        receipt = receipts_for_rendering().order_by("pk").first()
+        if receipt is None:
+            msg = "There are no receipts to render."
+            raise CommandError(msg)
+
+        # Warm up the compiled template cache.
+        ReceiptExcelGenerator(receipt, template_path).generate_workbook()
+
+        for size in options["sizes"]:
+            receipt.render_items = _fake_items(size)
+            timings = []
+            for _ in range(options["repeat"]):
+                started = time.perf_counter()
+                ReceiptExcelGenerator(receipt, template_path).generate_workbook()
+                timings.append((time.perf_counter() - started) * 1000)
+            median = statistics.median(timings)
+            self.stdout.write(
+                f"{size:>5} items: median {median:8.2f} ms per receipt, "
+                f"{median / size:6.3f} ms per item"
+            )
@@ -0,0 +1,112 @@
+"""src/core/management/commands/benchmark_receipt_render.py."""
+
+import io
+import statistics
+import time
+
+from django.core.management.base import BaseCommand
+from django.core.management.base import CommandError
+from weasyprint import HTML
+from xlsx2html import xlsx2html
+
+from src.core.utils import ReceiptExcelGenerator
+from src.finance.models import PrintTemplate
+from src.finance.models import Receipt
+from src.finance.receipts import receipts_for_rendering
+
+
+def _render_via_xlsx(generator):
+    """Render a receipt the old way: save the workbook and parse it back."""
+    workbook = generator.generate_workbook()
+    excel_buffer = io.BytesIO()
+    workbook.save(excel_buffer)
+    excel_buffer.seek(0)
+    html_buffer = io.StringIO()
+    xlsx2html(excel_buffer, html_buffer)
+    return html_buffer.getvalue()
+
+
+def _render_direct(generator):
+    return generator.generate_html()
+
+
+class Command(BaseCommand):
+    """Compare receipt rendering through xlsx2html with direct rendering."""
+
+    help = (
+        "Render receipts to HTML (and with --pdf to PDF) through the saved "
+        "workbook and xlsx2html, then directly from the populated workbook, "
+        "and report the time per receipt of both paths."
+    )
+
+    def add_arguments(self, parser):
+        """Add command arguments."""
+        parser.add_argument("--receipts", type=int, default=50)
+        parser.add_argument(
+            "--template",
+            type=int,
+            help="PrintTemplate id (defaults to the default template).",
+        )
+        parser.add_argument(
+            "--template-path", help="Path of an .xlsx template to use instead."
+        )
+        parser.add_argument(
+            "--pdf", action="store_true", help="Include the WeasyPrint step."
+        )
+
+    def handle(self, *args, **options):
+        """Handle the command."""
+        template_path = options["template_path"] or self._template_path(
+            options["template"]
+        )
+        receipts = list(
+            receipts_for_rendering(
+                Receipt.objects.filter(receiptitem__isnull=False).distinct()
+            ).order_by("pk")[: options["receipts"]]
+        )
+        if not receipts:
+            msg = "There are no receipts with items to render."
+            raise CommandError(msg)
+
+        # Warm up the compiled template cache so both paths start equal.
+        ReceiptExcelGenerator(receipts[0], template_path).generate_workbook()
+
+        results = {}
+        for name, render in (
+            ("xlsx2html", _render_via_xlsx),
+            ("direct", _render_direct),
+        ):
+            timings = []
+            for receipt in receipts:
+                started = time.perf_counter()
+                html = render(ReceiptExcelGenerator(receipt, template_path))
+                if options["pdf"]:
+                    HTML(string=html).write_pdf()
+                timings.append((time.perf_counter() - started) * 1000)
+            results[name] = timings
+            self.stdout.write(
+                f"{name:>10}: median {statistics.median(timings):8.2f} ms, "
+                f"mean {statistics.mean(timings):8.2f} ms per receipt"
+            )
+
+        before = statistics.median(results["xlsx2html"])
+        after = statistics.median(results["direct"])
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"{len(receipts)} receipts, direct rendering is "
+                f"{before / after:.1f}x faster ({before - after:.2f} ms saved "
+                "per receipt)."
+            )
+        )
+
+    @staticmethod
+    def _template_path(template_id):
+        templates = PrintTemplate.objects.all()
+        if template_id:
+            template = templates.filter(pk=template_id).first()
+        else:
+            template = templates.filter(is_default=True).first() or templates.first()
+        if template is None:
+            msg = "No print template found, pass --template or --template-path."
+            raise CommandError(msg)
+        return template.template_file.path
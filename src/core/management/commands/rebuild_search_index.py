@@ -0,0 +1,28 @@
+"""src/core/management/commands/rebuild_search_index.py."""
+
+from django.core.management.base import BaseCommand
+
+from src.core.search import REBUILD_BATCH_SIZE
+from src.core.search import rebuild_search_index
+
+
+class Command(BaseCommand):
+    """Rebuild the global search rows from the current data."""
+
+    help = (
+        "Rebuild the search rows of all owners, apartments, personal accounts "
+        "and receipts. Needed after bulk imports that bypass model signals."
+    )
+
+    def add_arguments(self, parser):
+        """Add command arguments."""
+        parser.add_argument("--batch-size", type=int, default=REBUILD_BATCH_SIZE)
+
+    def handle(self, *args, **options):
+        """Handle the command."""
+        counts = rebuild_search_index(options["batch_size"])
+        for kind, count in counts.items():
+            self.stdout.write(f"{kind}: {count}")
+        self.stdout.write(
+            self.style.SUCCESS(f"Indexed {sum(counts.values())} search rows.")
+        )
@@ -0,0 +1,122 @@
+"""src/core/management/commands/run_benchmarks.py."""
+
+import json
+import logging
+import sys
+
+from django.core.management.base import BaseCommand
+from django.core.management.base import CommandError
+from django.test.utils import setup_test_environment
+from django.test.utils import teardown_test_environment
+from django.utils import timezone
+
+from src.building.models import Apartment
+from src.core.benchmark import BenchmarkRunner
+from src.finance.models import CashBox
+from src.finance.models import CounterReading
+from src.finance.models import Receipt
+from src.finance.models import ReceiptItem
+from src.users.models import MessageRecipient
+from src.users.models import User
+
+DATASET_MODELS = (
+    Apartment,
+    CounterReading,
+    Receipt,
+    ReceiptItem,
+    CashBox,
+    MessageRecipient,
+)
+
+
+class Command(BaseCommand):
+    """Benchmark list views, datatables and API endpoints."""
+
+    help = (
+        "Request every list view, AjaxDatatableView and GET ninja endpoint "
+        "against the current database and report latency and SQL query count "
+        "as JSON. Mutating endpoints are listed as skipped."
+    )
+
+    def add_arguments(self, parser):
+        """Add command arguments."""
+        parser.add_argument(
+            "--user",
+            help="Username to log in with (defaults to the first superuser).",
+        )
+        parser.add_argument(
+            "--owner",
+            help=(
+                "Username of the owner for cabinet pages (defaults to the first "
+                "active owner with an apartment)."
+            ),
+        )
+        parser.add_argument("--repeat", type=int, default=5)
+        parser.add_argument(
+            "--filter",
+            dest="name_filter",
+            help="Only run targets whose view name or route contains this text.",
+        )
+        parser.add_argument("--output", help="Write the JSON report to this file.")
+
+    def handle(self, *args, **options):
+        """Handle the command."""
+        users = User.objects.all()
+        user = (
+            users.filter(username=options["user"]).first()
+            if options["user"]
+            else users.filter(is_superuser=True).order_by("pk").first()
+        )
+        if user is None:
+            msg = "No user to run the benchmarks with, pass --user."
+            raise CommandError(msg)
+
+        owners = User.objects.filter(
+            user_type=User.UserType.OWNER, status=User.UserStatus.ACTIVE
+        )
+        owner = (
+            owners.filter(username=options["owner"]).first()
+            if options["owner"]
+            else owners.filter(apartments__isnull=False).order_by("pk").first()
+        )
+
+        # Failed requests are part of the report, not of the console output.
+        request_logger = logging.getLogger("django.request")
+        log_level = request_logger.level
+        request_logger.setLevel(logging.CRITICAL)
+        setup_test_environment()
+        try:
+            runner = BenchmarkRunner(
+                user,
+                owner=owner,
+                repeat=options["repeat"],
+                name_filter=options["name_filter"],
+            )
+            results, skipped = runner.run()
+        finally:
+            teardown_test_environment()
+            request_logger.setLevel(log_level)
+
+        report = {
+            "created_at": timezone.now().isoformat(),
+            "repeat": options["repeat"],
+            "dataset": {
+                model._meta.label: model.objects.count()  # noqa: SLF001
+                for model in DATASET_MODELS
+            },
+            "results": results,
+            "skipped": skipped,
+        }
+        output = json.dumps(report, indent=2, ensure_ascii=False)
+
+        if options["output"]:
+            with open(options["output"], "w", encoding="utf-8") as report_file:  # noqa: PTH123
+                report_file.write(output + "\n")
+            self.stdout.write(
+                self.style.SUCCESS(
+                    f"{len(results)} targets measured, {len(skipped)} skipped: "
+                    f"{options['output']}"
+                )
+            )
+        else:
+            sys.stdout.write(output + "\n")
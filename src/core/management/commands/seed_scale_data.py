@@ -0,0 +1,398 @@
+"""src/core/management/commands/seed_scale_data.py."""
+
+import datetime
+import random
+import secrets
+from decimal import Decimal
+from itertools import islice
+
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand
+from django.core.management.base import CommandError
+from django.db import transaction
+from django.utils import timezone
+
+from src.building.models import Apartment
+from src.building.models import Floor
+from src.building.models import House
+from src.building.models import PersonalAccount
+from src.building.models import Section
+from src.core.search import rebuild_search_index
+from src.finance.latest_readings import rebuild_latest_readings
+from src.finance.models import Article
+from src.finance.models import CashBox
+from src.finance.models import Counter
+from src.finance.models import CounterReading
+from src.finance.models import Currency
+from src.finance.models import Receipt
+from src.finance.models import ReceiptItem
+from src.finance.models import Service
+from src.finance.models import Tariff
+from src.finance.models import TariffService
+from src.finance.models import Unit
+from src.finance.rollup import rebuild_rollup
+from src.finance.summary import rebuild_summary
+from src.users.listing import rebuild_owner_listings
+from src.users.models import Message
+from src.users.models import MessageRecipient
+from src.users.models import User
+
+SERVICES = (
+    ("Водоснабжение", "м³", True),
+    ("Электроэнергия", "кВт·ч", True),
+    ("Газ", "м³", True),
+    ("Вывоз мусора", "мес.", False),
+)
+
+
+def _chunks(iterable, size):
+    iterator = iter(iterable)
+    while chunk := list(islice(iterator, size)):
+        yield chunk
+
+
+def _months_ago(today, months):
+    index = today.year * 12 + today.month - 1 - months
+    return datetime.date(index // 12, index % 12 + 1, 1)
+
+
+class Command(BaseCommand):
+    """Generate a synthetic production-size dataset."""
+
+    help = (
+        "Generate houses, apartments, personal accounts, counters and readings, "
+        "receipts, cashbox operations and messages for load testing. Every run "
+        "adds a new dataset whose numbers start with --prefix."
+    )
+
+    def add_arguments(self, parser):
+        """Add command arguments."""
+        parser.add_argument("--houses", type=int, default=5)
+        parser.add_argument("--sections", type=int, default=2, help="Per house.")
+        parser.add_argument("--floors", type=int, default=9, help="Per house.")
+        parser.add_argument(
+            "--apartments-per-floor",
+            type=int,
+            default=4,
+            help="Per floor of every section.",
+        )
+        parser.add_argument("--apartments-per-owner", type=int, default=2)
+        parser.add_argument(
+            "--readings", type=int, default=24, help="Readings per counter."
+        )
+        parser.add_argument(
+            "--receipts", type=int, default=12, help="Receipts per apartment."
+        )
+        parser.add_argument(
+            "--payments", type=int, default=12, help="Payments per personal account."
+        )
+        parser.add_argument(
+            "--expenses", type=int, default=500, help="Expense operations in total."
+        )
+        parser.add_argument("--messages", type=int, default=50)
+        parser.add_argument(
+            "--recipients",
+            type=int,
+            default=0,
+            help="Recipients per message, 0 sends every message to all owners.",
+        )
+        parser.add_argument("--batch-size", type=int, default=5000)
+        parser.add_argument("--seed", type=int, default=None)
+        parser.add_argument(
+            "--prefix",
+            default=None,
+            help="Prefix of generated numbers and usernames (max 6 characters).",
+        )
+
+    def handle(self, *args, **options):
+        """Handle the command."""
+        self.options = options
+        self.random = random.Random(options["seed"])  # noqa: S311
+        self.prefix = options["prefix"] or secrets.token_hex(2)
+        self.batch_size = options["batch_size"]
+        self.today = timezone.localdate()
+        if len(self.prefix) > 6:  # noqa: PLR2004
+            msg = "--prefix must be at most 6 characters long."
+            raise CommandError(msg)
+
+        with transaction.atomic():
+            services, tariff, articles = self._seed_reference_data()
+        owners = self._seed_owners()
+        apartments = self._seed_apartments(owners, tariff)
+        self._seed_counters(apartments, services)
+        self._seed_receipts(apartments, services)
+        self._seed_cashbox(apartments, articles)
+        self._seed_messages(owners)
+
+        # bulk_create skips the model signals, so the derived tables are
+        # rebuilt once at the end.
+        rebuild_summary()
+        rebuild_rollup(batch_size=self.batch_size)
+        rebuild_search_index(batch_size=self.batch_size)
+        rebuild_owner_listings(batch_size=self.batch_size)
+        rebuild_latest_readings(batch_size=self.batch_size)
+
+        self.stdout.write(self.style.SUCCESS(f"Dataset '{self.prefix}' generated."))
+
+    def _bulk_create(self, model, objects):
+        created = []
+        total = 0
+        for chunk in _chunks(objects, self.batch_size):
+            created.extend(model.objects.bulk_create(chunk))
+            total += len(chunk)
+        self.stdout.write(f"{model._meta.verbose_name_plural}: {total}")  # noqa: SLF001
+        return created
+
+    def _bulk_create_stream(self, model, objects):
+        """Insert rows without keeping them in memory."""
+        total = 0
+        for chunk in _chunks(objects, self.batch_size):
+            model.objects.bulk_create(chunk)
+            total += len(chunk)
+        self.stdout.write(f"{model._meta.verbose_name_plural}: {total}")  # noqa: SLF001
+
+    def _seed_reference_data(self):
+        currency, _ = Currency.objects.get_or_create(name="UAH")
+        tariff = Tariff.objects.create(
+            name=f"Тариф {self.prefix}", description="Сгенерирован seed_scale_data"
+        )
+        services = []
+        for name, unit_name, in_counters in SERVICES:
+            unit, _ = Unit.objects.get_or_create(name=unit_name)
+            service = Service.objects.create(
+                name=f"{name} {self.prefix}", unit=unit, show_in_counters=in_counters
+            )
+            TariffService.objects.create(
+                tariff=tariff,
+                service=service,
+                currency=currency,
+                price=Decimal(self.random.randint(5, 60)),
+            )
+            services.append(service)
+        articles = {
+            kind: Article.objects.create(name=f"{label} {self.prefix}", type=kind)
+            for kind, label in Article.ArticleType.choices
+        }
+        return services, tariff, articles
+
+    def _seed_owners(self):
+        apartments_count = (
+            self.options["houses"]
+            * self.options["sections"]
+            * self.options["floors"]
+            * self.options["apartments_per_floor"]
+        )
+        owners_count = max(
+            1, -(-apartments_count // self.options["apartments_per_owner"])
+        )
+        password = make_password(None)
+        return self._bulk_create(
+            User,
+            (
+                User(
+                    username=f"{self.prefix}-owner-{n}",
+                    user_id=f"{self.prefix}{n:08d}",
+                    email=f"{self.prefix}-owner-{n}@example.com",
+                    first_name=f"Владелец {n}",
+                    last_name=self.prefix,
+                    password=password,
+                    user_type=User.UserType.OWNER,
+                    status=User.UserStatus.ACTIVE,
+                )
+                for n in range(owners_count)
+            ),
+        )
+
+    def _seed_apartments(self, owners, tariff):
+        houses = self._bulk_create(
+            House,
+            (
+                House(title=f"Дом {self.prefix}-{n}", address=f"ул. Тестовая, {n}")
+                for n in range(self.options["houses"])
+            ),
+        )
+        sections = self._bulk_create(
+            Section,
+            (
+                Section(name=f"Секция {n + 1}", house=house)
+                for house in houses
+                for n in range(self.options["sections"])
+            ),
+        )
+        floors = self._bulk_create(
+            Floor,
+            (
+                Floor(name=str(n + 1), house=house)
+                for house in houses
+                for n in range(self.options["floors"])
+            ),
+        )
+
+        layout = [
+            (house, section, floor)
+            for house in houses
+            for section in sections
+            if section.house_id == house.pk
+            for floor in floors
+            if floor.house_id == house.pk
+            for _n in range(self.options["apartments_per_floor"])
+        ]
+        accounts = self._bulk_create(
+            PersonalAccount,
+            (
+                PersonalAccount(
+                    number=f"{self.prefix}{n:010d}",
+                    balance=Decimal(self.random.randint(-3000, 3000)),
+                )
+                for n in range(len(layout))
+            ),
+        )
+
+        numbers = {}
+        per_owner = self.options["apartments_per_owner"]
+
+        def apartments():
+            for n, (house, section, floor) in enumerate(layout):
+                numbers[house.pk] = numbers.get(house.pk, 0) + 1
+                yield Apartment(
+                    number=str(numbers[house.pk]),
+                    area=round(self.random.uniform(25, 120), 1),
+                    house=house,
+                    section=section,
+                    floor=floor,
+                    owner=owners[n // per_owner],
+                    tariff=tariff,
+                    personal_account=accounts[n],
+                )
+
+        return self._bulk_create(Apartment, apartments())
+
+    def _seed_counters(self, apartments, services):
+        counter_services = [service for service in services if service.show_in_counters]
+        counters = self._bulk_create(
+            Counter,
+            (
+                Counter(
+                    serial_number=f"{self.prefix}-{apartment.pk}-{service.pk}",
+                    apartment=apartment,
+                    service=service,
+                )
+                for apartment in apartments
+                for service in counter_services
+            ),
+        )
+        readings = self.options["readings"]
+        statuses = list(CounterReading.CounterStatus)
+
+        def counter_readings():
+            n = 0
+            for counter in counters:
+                value = Decimal(self.random.randint(0, 1000))
+                for month in range(readings, 0, -1):
+                    value += Decimal(self.random.randint(0, 300))
+                    n += 1
+                    yield CounterReading(
+                        number=f"{self.prefix}{n:012d}",
+                        counter=counter,
+                        date=_months_ago(self.today, month - 1),
+                        value=value,
+                        status=self.random.choice(statuses),
+                    )
+
+        self._bulk_create_stream(CounterReading, counter_readings())
+
+    def _seed_receipts(self, apartments, services):
+        receipts_per_apartment = self.options["receipts"]
+        statuses = list(Receipt.ReceiptStatus)
+        receipts = self._bulk_create(
+            Receipt,
+            (
+                Receipt(
+                    number=f"{self.prefix}-{apartment.pk}-{month}",
+                    date=_months_ago(self.today, month),
+                    period_start=_months_ago(self.today, month + 1),
+                    period_end=_months_ago(self.today, month) - datetime.timedelta(1),
+                    is_posted=self.random.random() < 0.9,  # noqa: PLR2004
+                    apartment=apartment,
+                    tariff=apartment.tariff,
+                    status=self.random.choice(statuses),
+                )
+                for apartment in apartments
+                for month in range(receipts_per_apartment)
+            ),
+        )
+
+        def receipt_items():
+            for receipt in receipts:
+                total = Decimal(0)
+                for service in services:
+                    consumption = Decimal(self.random.randint(1, 300))
+                    price = Decimal(self.random.randint(5, 60))
+                    total += consumption * price
+                    yield ReceiptItem(
+                        receipt=receipt,
+                        service=service,
+                        consumption=consumption,
+                        price_per_unit=price,
+                        amount=consumption * price,
+                    )
+                receipt.total_amount = total
+
+        self._bulk_create_stream(ReceiptItem, receipt_items())
+        for chunk in _chunks(receipts, self.batch_size):
+            Receipt.objects.bulk_update(chunk, ["total_amount"])
+
+    def _seed_cashbox(self, apartments, articles):
+        income = articles[Article.ArticleType.INCOME]
+        expense = articles[Article.ArticleType.EXPENSE]
+
+        def operations():
+            n = 0
+            for apartment in apartments:
+                for month in range(self.options["payments"]):
+                    n += 1
+                    yield CashBox(
+                        number=f"{self.prefix}-{n}",
+                        date=_months_ago(self.today, month)
+                        + datetime.timedelta(self.random.randint(0, 27)),
+                        amount=Decimal(self.random.randint(100, 5000)),
+                        article=income,
+                        personal_account_id=apartment.personal_account_id,
+                    )
+            for _expense in range(self.options["expenses"]):
+                n += 1
+                yield CashBox(
+                    number=f"{self.prefix}-{n}",
+                    date=self.today
+                    - datetime.timedelta(self.random.randint(0, 365 * 2)),
+                    amount=Decimal(self.random.randint(500, 50000)),
+                    article=expense,
+                )
+
+        self._bulk_create_stream(CashBox, operations())
+
+    def _seed_messages(self, owners):
+        sender = User.objects.filter(is_superuser=True).first()
+        messages = self._bulk_create(
+            Message,
+            (
+                Message(
+                    sender=sender,
+                    title=f"Сообщение {self.prefix}-{n}",
+                    text="Сгенерировано seed_scale_data.",
+                )
+                for n in range(self.options["messages"])
+            ),
+        )
+        limit = self.options["recipients"] or len(owners)
+
+        def recipients():
+            for message in messages:
+                for owner in self.random.sample(owners, min(limit, len(owners))):
+                    yield MessageRecipient(
+                        message=message,
+                        user=owner,
+                        is_read=self.random.random() < 0.5,  # noqa: PLR2004
+                    )
+
+        self._bulk_create_stream(MessageRecipient, recipients())
@@ -0,0 +1,238 @@
+"""src/core/middleware.py."""
+
+import logging
+import re
+import time
+from collections import Counter
+from contextlib import ExitStack
+
+import brotli
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+from django.utils.cache import patch_vary_headers
+from django.utils.text import compress_string
+
+logger = logging.getLogger(__name__)
+
+SLOWEST_QUERIES = 3
+
+# Responses compressed by ResponseCompressionMiddleware.
+COMPRESSED_CONTENT_TYPES = ("application/json",)
+COMPRESSION_MIN_LENGTH = 200
+# Quality 11, the default, takes over 100 ms on a 100-row datatable draw,
+# 5 takes under a millisecond for an ~20% larger body.
+BROTLI_QUALITY = 5
+GZIP_MAX_RANDOM_BYTES = 100
+
+_STRING_RE = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_RE = re.compile(r"\b\d+(?:\.\d+)?\b")
+_IN_LIST_RE = re.compile(r"\bIN \((?:[^()]*)\)", re.IGNORECASE)
+_SPACE_RE = re.compile(r"\s+")
+
+
+def sql_fingerprint(sql):
+    """Return ``sql`` with literals and ``IN`` lists replaced by ``?``.
+
+    Statements that differ only by their parameters, like the queries of an
+    N+1 loop, share the same fingerprint.
+    """
+    sql = _STRING_RE.sub("?", sql)
+    sql = _NUMBER_RE.sub("?", sql)
+    sql = _IN_LIST_RE.sub("IN (?)", sql)
+    return _SPACE_RE.sub(" ", sql).strip()
+
+
+def get_query_budget(view):
+    """Return the query budget declared by a view class or function, if any."""
+    view = getattr(view, "view_class", view)
+    return getattr(view, "query_budget", None)
+
+
+def query_budget(limit):
+    """Declare the query budget of a function-based view."""
+
+    def decorator(view_func):
+        view_func.query_budget = limit
+        return view_func
+
+    return decorator
+
+
+class QueryProfile:
+    """Collect the SQL statements executed during one request."""
+
+    def __init__(self):
+        """Start with an empty profile."""
+        self.queries = []
+
+    def __call__(self, execute, sql, params, many, context):  # noqa: PLR0913
+        """Time a statement, used as a database execute wrapper."""
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.queries.append((sql, time.perf_counter() - started))
+
+    @property
+    def count(self):
+        """Return the number of executed statements."""
+        return len(self.queries)
+
+    @property
+    def duration(self):
+        """Return the total database time in seconds."""
+        return sum(duration for _sql, duration in self.queries)
+
+    def duplicates(self):
+        """Return ``{fingerprint: count}`` of statements executed repeatedly."""
+        counts = Counter(sql_fingerprint(sql) for sql, _duration in self.queries)
+        return {sql: count for sql, count in counts.most_common() if count > 1}
+
+    def slowest(self, limit=SLOWEST_QUERIES):
+        """Return the ``limit`` slowest statements as ``(sql, ms)`` pairs."""
+        ranked = sorted(self.queries, key=lambda query: query[1], reverse=True)
+        return [(sql, round(duration * 1000, 2)) for sql, duration in ranked[:limit]]
+
+
+class QueryProfilingMiddleware:
+    """Profile the SQL of every request and check the view query budgets.
+
+    Enabled with the ``SQL_PROFILING`` setting. The totals are sent in a
+    ``Server-Timing`` header and logged together with the duplicated and the
+    slowest statements. Views declare their budget with a ``query_budget``
+    attribute, a request above it is logged as a warning.
+    """
+
+    def __init__(self, get_response):
+        """Disable the middleware unless ``SQL_PROFILING`` is set."""
+        if not getattr(settings, "SQL_PROFILING", False):
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request):
+        """Run the request with every database connection profiled."""
+        profile = QueryProfile()
+        request.query_budget = None
+        started = time.perf_counter()
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(profile))
+            response = self.get_response(request)
+        total = time.perf_counter() - started
+
+        self._add_server_timing(response, profile, total)
+        self._log(request, response, profile, total)
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        """Remember the query budget of the resolved view."""
+        request.query_budget = get_query_budget(view_func)
+
+    @staticmethod
+    def _add_server_timing(response, profile, total):
+        metrics = [
+            f'db;dur={profile.duration * 1000:.2f};desc="{profile.count} queries"',
+            f"total;dur={total * 1000:.2f}",
+        ]
+        if response.has_header("Server-Timing"):
+            metrics.insert(0, response["Server-Timing"])
+        response["Server-Timing"] = ", ".join(metrics)
+
+    @staticmethod
+    def _log(request, response, profile, total):
+        budget = request.query_budget
+        duplicates = profile.duplicates()
+        data = {
+            "method": request.method,
+            "path": request.path,
+            "status": response.status_code,
+            "queries": profile.count,
+            "db_ms": round(profile.duration * 1000, 2),
+            "total_ms": round(total * 1000, 2),
+            "query_budget": budget,
+            "duplicated_queries": sum(duplicates.values()) - len(duplicates),
+            "duplicates": duplicates,
+            "slowest": profile.slowest(),
+        }
+        logger.info(
+            "%s %s: %s queries in %s ms",
+            request.method,
+            request.path,
+            data["queries"],
+            data["db_ms"],
+            extra={"sql_profile": data},
+        )
+        if budget is not None and profile.count > budget:
+            logger.warning(
+                "%s %s exceeded its query budget: %s queries, budget %s",
+                request.method,
+                request.path,
+                profile.count,
+                budget,
+                extra={"sql_profile": data},
+            )
+
+
+def accepted_encodings(header):
+    """Return the content codings of an ``Accept-Encoding`` header.
+
+    Codings refused with ``q=0`` are left out.
+    """
+    encodings = set()
+    for part in header.split(","):
+        coding, _, parameters = part.partition(";")
+        quality = parameters.strip().replace(" ", "").lower()
+        if quality.startswith("q=") and not quality[2:].strip("0."):
+            continue
+        if coding.strip():
+            encodings.add(coding.strip().lower())
+    return encodings
+
+
+class ResponseCompressionMiddleware:
+    """Compress the JSON responses of the API and the datatables.
+
+    Brotli is used when the client accepts ``br``, gzip otherwise. HTML pages,
+    streamed files and short bodies are sent as they are. Gzip output is
+    padded with random bytes like ``GZipMiddleware`` does against BREACH.
+    """
+
+    def __init__(self, get_response):
+        """Wrap the next handler."""
+        self.get_response = get_response
+
+    def __call__(self, request):
+        """Compress the response if the client and the content allow it."""
+        response = self.get_response(request)
+        if (
+            response.streaming
+            or response.has_header("Content-Encoding")
+            or not response.get("Content-Type", "").startswith(COMPRESSED_CONTENT_TYPES)
+            or len(response.content) < COMPRESSION_MIN_LENGTH
+        ):
+            return response
+
+        patch_vary_headers(response, ("Accept-Encoding",))
+        encodings = accepted_encodings(request.headers.get("Accept-Encoding", ""))
+        if "br" in encodings:
+            encoding = "br"
+            content = brotli.compress(response.content, quality=BROTLI_QUALITY)
+        elif "gzip" in encodings:
+            encoding = "gzip"
+            content = compress_string(
+                response.content, max_random_bytes=GZIP_MAX_RANDOM_BYTES
+            )
+        else:
+            return response
+        if len(content) >= len(response.content):
+            return response
+
+        response.content = content
+        response.headers["Content-Length"] = str(len(content))
+        response.headers["Content-Encoding"] = encoding
+        # A strong ETag would match the uncompressed body too, RFC 9110 8.8.1.
+        etag = response.get("ETag")
+        if etag and etag.startswith('"'):
+            response.headers["ETag"] = "W/" + etag
+        return response
@@ -0,0 +1,31 @@
+# Generated by Django 5.2.7 on 2026-10-18 11:46
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SearchEntry',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('owner', 'Владелец'), ('apartment', 'Квартира'), ('personal_account', 'Лицевой счет'), ('receipt', 'Квитанция')], max_length=20, verbose_name='Тип')),
+                ('object_id', models.PositiveBigIntegerField(verbose_name='ID объекта')),
+                ('key', models.CharField(blank=True, max_length=255, verbose_name='Ключ')),
+                ('document', models.TextField(verbose_name='Текст для поиска')),
+                ('title', models.CharField(max_length=255, verbose_name='Заголовок')),
+                ('subtitle', models.CharField(blank=True, max_length=255, verbose_name='Описание')),
+            ],
+            options={
+                'verbose_name': 'Запись поиска',
+                'verbose_name_plural': 'Записи поиска',
+                'indexes': [models.Index(fields=['key'], name='core_search_key_prefix', opclasses=['varchar_pattern_ops'])],
+                'constraints': [models.UniqueConstraint(fields=('kind', 'object_id'), name='core_search_entry_object')],
+            },
+        ),
+    ]
@@ -0,0 +1,20 @@
+# Generated by Django 5.2.7 on 2026-10-18 11:47
+
+import django.contrib.postgres.indexes
+from django.contrib.postgres.operations import TrigramExtension
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0002_search_entry'),
+    ]
+
+    operations = [
+        TrigramExtension(),
+        migrations.AddIndex(
+            model_name='searchentry',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['document'], name='core_search_document_trgm', opclasses=['gin_trgm_ops']),
+        ),
+    ]
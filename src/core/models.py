@@ -1 +1,142 @@
 """src/core/models.py."""
+
+from django.conf import settings
+from django.contrib.postgres.indexes import GinIndex
+from django.db import models
+
+
+class ExportJob(models.Model):
+    """A background export of a filtered list into a downloadable file.
+
+    The rows are written by ``src.core.tasks.run_export_job`` and the file is
+    removed by ``delete_expired_exports`` once ``expires_at`` has passed.
+    """
+
+    class Kind(models.TextChoices):
+        """Exported list."""
+
+        CASHBOX = "cashbox", "Касса"  # noqa: RUF001
+        PERSONAL_ACCOUNTS = "personal_accounts", "Лицевые счета"
+
+    class Format(models.TextChoices):
+        """File format."""
+
+        XLSX = "xlsx", "Excel"
+        CSV = "csv", "CSV"
+
+    class Status(models.TextChoices):
+        """Job status."""
+
+        PENDING = "pending", "В очереди"  # noqa: RUF001
+        RUNNING = "running", "Выполняется"
+        DONE = "done", "Готово"
+        FAILED = "failed", "Ошибка"
+
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name="export_jobs",
+        verbose_name="Пользователь",
+    )
+    kind = models.CharField(max_length=30, choices=Kind.choices, verbose_name="Список")
+    file_format = models.CharField(
+        max_length=10,
+        choices=Format.choices,
+        default=Format.XLSX,
+        verbose_name="Формат",
+    )
+    params = models.JSONField(default=dict, blank=True, verbose_name="Фильтры")
+    status = models.CharField(
+        max_length=20,
+        choices=Status.choices,
+        default=Status.PENDING,
+        verbose_name="Статус",
+    )
+    total_rows = models.PositiveIntegerField(
+        default=0,
+        verbose_name="Всего строк",  # noqa: RUF001
+    )
+    processed_rows = models.PositiveIntegerField(
+        default=0, verbose_name="Обработано строк"
+    )
+    file = models.FileField(upload_to="exports/", blank=True, verbose_name="Файл")
+    error = models.TextField(blank=True, verbose_name="Ошибка")
+    created_at = models.DateTimeField(auto_now_add=True, verbose_name="Создано")
+    finished_at = models.DateTimeField(null=True, blank=True, verbose_name="Завершено")
+    expires_at = models.DateTimeField(
+        null=True, blank=True, db_index=True, verbose_name="Хранится до"
+    )
+
+    class Meta:
+        """Meta class."""
+
+        verbose_name = "Выгрузка"
+        verbose_name_plural = "Выгрузки"
+        ordering = ["-created_at"]
+
+    def __str__(self):
+        """__str__."""
+        return f"{self.get_kind_display()} ({self.get_status_display()})"
+
+    @property
+    def progress(self):
+        """Return the completed share of rows in percent."""
+        if self.status == self.Status.DONE:
+            return 100
+        if not self.total_rows:
+            return 0
+        return min(99, self.processed_rows * 100 // self.total_rows)
+
+
+class SearchEntry(models.Model):
+    """A row of the global search: an owner, apartment, account or receipt.
+
+    ``key`` is the main identifier of the object and ``document`` all of its
+    searchable text, both normalized by ``src.core.search.normalize``. The
+    rows are kept up to date by ``src.core.signals`` and rebuilt in bulk by
+    the ``rebuild_search_index`` command.
+    """
+
+    class Kind(models.TextChoices):
+        """Kind of the found object."""
+
+        OWNER = "owner", "Владелец"
+        APARTMENT = "apartment", "Квартира"
+        PERSONAL_ACCOUNT = "personal_account", "Лицевой счет"
+        RECEIPT = "receipt", "Квитанция"
+
+    kind = models.CharField(max_length=20, choices=Kind.choices, verbose_name="Тип")
+    object_id = models.PositiveBigIntegerField(verbose_name="ID объекта")
+    key = models.CharField(max_length=255, blank=True, verbose_name="Ключ")
+    document = models.TextField(verbose_name="Текст для поиска")
+    title = models.CharField(max_length=255, verbose_name="Заголовок")
+    subtitle = models.CharField(max_length=255, blank=True, verbose_name="Описание")
+
+    class Meta:
+        """Meta class."""
+
+        verbose_name = "Запись поиска"
+        verbose_name_plural = "Записи поиска"
+        constraints = [
+            models.UniqueConstraint(
+                fields=["kind", "object_id"], name="core_search_entry_object"
+            ),
+        ]
+        indexes = [
+            # Exact and prefix matches of the identifier, LIKE 'q%'.
+            models.Index(
+                fields=["key"],
+                name="core_search_key_prefix",
+                opclasses=["varchar_pattern_ops"],
+            ),
+            # Substring matches, LIKE '%q%'.
+            GinIndex(
+                fields=["document"],
+                name="core_search_document_trgm",
+                opclasses=["gin_trgm_ops"],
+            ),
+        ]
+
+    def __str__(self):
+        """__str__."""
+        return f"{self.get_kind_display()}: {self.title}"
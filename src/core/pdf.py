@@ -0,0 +1,72 @@
+"""src/core/pdf.py."""
+
+import logging
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from functools import lru_cache
+from functools import partial
+
+from django.conf import settings
+from weasyprint import HTML
+
+logger = logging.getLogger(__name__)
+
+
+class RenderStillRunningError(TimeoutError):
+    """The render timed out in the pool but keeps running there.
+
+    Its PDF is passed to the ``on_late_result`` callback of ``render_pdf``.
+    """
+
+
+def write_pdf(html, base_url=None):
+    """Render an HTML string to PDF bytes."""
+    return HTML(string=html, base_url=base_url).write_pdf()
+
+
+@lru_cache(maxsize=1)
+def get_render_pool():
+    """Return the process pool that renders PDFs for this web process.
+
+    The workers are spawned rather than forked, they only import WeasyPrint
+    and never touch the database or the threads of the web server.
+    """
+    return ProcessPoolExecutor(
+        max_workers=settings.PDF_RENDER_WORKERS,
+        mp_context=multiprocessing.get_context("spawn"),
+    )
+
+
+def _deliver_late_result(on_late_result, future):
+    if future.cancelled():
+        return
+    try:
+        on_late_result(future.result())
+    except Exception:
+        logger.exception("Late PDF render failed.")
+
+
+def render_pdf(html, base_url=None, timeout=None, on_late_result=None):
+    """Render an HTML string to PDF bytes in the render pool.
+
+    Waits at most ``timeout`` seconds and raises ``TimeoutError`` after that,
+    the web worker is free again. A job that has not started yet is dropped.
+    A running job cannot be stopped: with ``on_late_result`` its PDF is handed
+    to that callback when done and ``RenderStillRunningError`` is raised.
+    Renders inline when ``PDF_RENDER_WORKERS`` is 0.
+    """
+    if not settings.PDF_RENDER_WORKERS:
+        return write_pdf(html, base_url)
+    future = get_render_pool().submit(write_pdf, html, base_url)
+    try:
+        return future.result(timeout=timeout)
+    except TimeoutError:
+        if future.cancel() or on_late_result is None:
+            raise
+        future.add_done_callback(partial(_deliver_late_result, on_late_result))
+        raise RenderStillRunningError from None
+    except BrokenProcessPool:
+        # A worker died (out of memory, killed), start a new pool next time.
+        get_render_pool.cache_clear()
+        raise
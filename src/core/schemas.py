@@ -0,0 +1,40 @@
+"""src/core/schemas.py."""
+
+from datetime import datetime
+
+from ninja import Schema
+
+
+class ExportJobSchema(Schema):
+    """Progress of a background export."""
+
+    id: int
+    kind: str
+    file_format: str
+    status: str
+    progress: int
+    processed_rows: int
+    total_rows: int
+    error: str
+    created_at: datetime
+    finished_at: datetime | None
+    expires_at: datetime | None
+    download_url: str | None
+
+
+class SearchResultSchema(Schema):
+    """An object found by the global search."""
+
+    kind: str
+    kind_display: str
+    object_id: int
+    title: str
+    subtitle: str
+    url: str
+
+
+class StatusResponse(Schema):
+    """Define a generic status/message response."""
+
+    status: str
+    message: str
@@ -0,0 +1,210 @@
+"""src/core/search.py."""
+
+from django.db import transaction
+from django.db.models import Case
+from django.db.models import IntegerField
+from django.db.models import Value
+from django.db.models import When
+from django.db.models.functions import Length
+from django.urls import reverse
+
+from src.building.models import Apartment
+from src.building.models import PersonalAccount
+from src.finance.models import Receipt
+from src.users.models import User
+
+from .models import SearchEntry
+
+SEARCH_LIMIT = 20
+SEARCH_MAX_LIMIT = 100
+MIN_QUERY_LENGTH = 2
+# Shorter queries have no trigram, they only match identifiers by prefix.
+TRIGRAM_MIN_LENGTH = 3
+REBUILD_BATCH_SIZE = 2000
+
+SEARCH_URLS = {
+    SearchEntry.Kind.OWNER: "users:owner_detail",
+    SearchEntry.Kind.APARTMENT: "building:apartment_detail",
+    SearchEntry.Kind.PERSONAL_ACCOUNT: "building:personal_account_detail",
+    SearchEntry.Kind.RECEIPT: "finance:receipt_detail",
+}
+
+ENTRY_FIELDS = ("key", "document", "title", "subtitle")
+
+
+def normalize(value):
+    """Return ``value`` lowercased, with ``ё`` as ``е`` and single spaces."""  # noqa: RUF002
+    return " ".join(str(value or "").lower().replace("ё", "е").split())  # noqa: RUF001
+
+
+def _digits(value):
+    return "".join(char for char in value or "" if char.isdigit())
+
+
+def _owner_entry(user):
+    full_name = user.get_full_name()
+    return SearchEntry(
+        kind=SearchEntry.Kind.OWNER,
+        object_id=user.pk,
+        key=normalize(user.user_id),
+        document=normalize(
+            f"{user.user_id or ''} {full_name} {user.phone} "
+            f"{_digits(user.phone)} {user.email}"
+        ),
+        title=(full_name or user.email or user.username)[:255],
+        subtitle=", ".join(
+            part
+            for part in (
+                f"ID {user.user_id}" if user.user_id else "",
+                user.phone,
+                user.email,
+            )
+            if part
+        )[:255],
+    )
+
+
+def _apartment_entry(apartment):
+    return SearchEntry(
+        kind=SearchEntry.Kind.APARTMENT,
+        object_id=apartment.pk,
+        key=normalize(apartment.number),
+        document=normalize(f"{apartment.number} {apartment.house.title}"),
+        title=f"кв. {apartment.number}",
+        subtitle=apartment.house.title[:255],
+    )
+
+
+def _personal_account_entry(account):
+    apartment = getattr(account, "apartment", None)
+    return SearchEntry(
+        kind=SearchEntry.Kind.PERSONAL_ACCOUNT,
+        object_id=account.pk,
+        key=normalize(account.number),
+        document=normalize(account.number),
+        title=account.number,
+        subtitle=(
+            f"кв. {apartment.number}, {apartment.house.title}"[:255]
+            if apartment
+            else ""
+        ),
+    )
+
+
+def _receipt_entry(receipt):
+    return SearchEntry(
+        kind=SearchEntry.Kind.RECEIPT,
+        object_id=receipt.pk,
+        key=normalize(receipt.number),
+        document=normalize(receipt.number),
+        title=f"Квитанция №{receipt.number}",
+        subtitle=f"от {receipt.date:%d.%m.%Y}",
+    )
+
+
+# Objects of every kind and how their search rows are built.
+SEARCH_SOURCES = {
+    SearchEntry.Kind.OWNER: (
+        lambda: User.objects.filter(user_type=User.UserType.OWNER),
+        _owner_entry,
+    ),
+    SearchEntry.Kind.APARTMENT: (
+        lambda: Apartment.objects.select_related("house"),
+        _apartment_entry,
+    ),
+    SearchEntry.Kind.PERSONAL_ACCOUNT: (
+        lambda: PersonalAccount.objects.select_related("apartment__house"),
+        _personal_account_entry,
+    ),
+    SearchEntry.Kind.RECEIPT: (
+        lambda: Receipt.objects.only("number", "date"),
+        _receipt_entry,
+    ),
+}
+
+
+def _save_entries(entries):
+    SearchEntry.objects.bulk_create(
+        entries,
+        update_conflicts=True,
+        unique_fields=["kind", "object_id"],
+        update_fields=ENTRY_FIELDS,
+    )
+
+
+def index_objects(kind, pks):
+    """Create or refresh the search rows of the objects of ``kind``.
+
+    Rows of objects that are gone or no longer searchable (e.g. a user who
+    is not an owner anymore) are removed.
+    """
+    pks = {pk for pk in pks if pk is not None}
+    if not pks:
+        return
+    queryset, build = SEARCH_SOURCES[kind]
+    objects = list(queryset().filter(pk__in=pks))
+    _save_entries([build(obj) for obj in objects])
+    remove_objects(kind, pks - {obj.pk for obj in objects})
+
+
+def remove_objects(kind, pks):
+    """Delete the search rows of the objects of ``kind``."""
+    if pks:
+        SearchEntry.objects.filter(kind=kind, object_id__in=pks).delete()
+
+
+def rebuild_search_index(batch_size=REBUILD_BATCH_SIZE):
+    """Rebuild all search rows, return the number of rows per kind.
+
+    The old rows stay visible to other connections until the rebuild
+    commits.
+    """
+    counts = {}
+    with transaction.atomic():
+        SearchEntry.objects.all().delete()
+        for kind, (queryset, build) in SEARCH_SOURCES.items():
+            batch = []
+            counts[kind] = 0
+            for obj in queryset().order_by("pk").iterator(chunk_size=batch_size):
+                batch.append(build(obj))
+                if len(batch) == batch_size:
+                    _save_entries(batch)
+                    counts[kind] += len(batch)
+                    batch = []
+            _save_entries(batch)
+            counts[kind] += len(batch)
+    return counts
+
+
+def search(query, limit=SEARCH_LIMIT):
+    """Return the search rows matching ``query``, best matches first.
+
+    Every word of the query must occur in the searchable text. Matches of the
+    whole identifier rank first, then identifiers and texts starting with
+    the query, then any other occurrence.
+    """
+    query = normalize(query)
+    if len(query) < MIN_QUERY_LENGTH:
+        return []
+
+    entries = SearchEntry.objects.all()
+    if len(query) < TRIGRAM_MIN_LENGTH:
+        entries = entries.filter(key__startswith=query)
+    else:
+        for word in query.split():
+            entries = entries.filter(document__contains=word)
+
+    rank = Case(
+        When(key=query, then=Value(0)),
+        When(key__startswith=query, then=Value(1)),
+        When(document__startswith=query, then=Value(2)),
+        default=Value(3),
+        output_field=IntegerField(),
+    )
+    entries = entries.annotate(rank=rank).order_by("rank", Length("key"), "title")
+    return list(entries[:limit])
+
+
+def entry_url(entry):
+    """Return the admin page of the object found by a search row."""
+    return reverse(SEARCH_URLS[entry.kind], kwargs={"pk": entry.object_id})
@@ -0,0 +1,114 @@
+"""src/core/signals.py."""
+
+from django.db.models.signals import post_delete
+from django.db.models.signals import post_save
+from django.dispatch import receiver
+
+from src.building.models import Apartment
+from src.building.models import House
+from src.building.models import PersonalAccount
+from src.building.signals import apartment_changed
+from src.building.signals import previous_apartment_state
+from src.finance.models import Receipt
+from src.users.models import User
+
+from .models import SearchEntry
+from .search import index_objects
+from .search import remove_objects
+
+# Fields the search rows are built from, saves of other fields are skipped.
+OWNER_SEARCH_FIELDS = {
+    "user_type",
+    "user_id",
+    "first_name",
+    "last_name",
+    "middle_name",
+    "phone",
+    "email",
+    "username",
+}
+PERSONAL_ACCOUNT_SEARCH_FIELDS = {"number"}
+RECEIPT_SEARCH_FIELDS = {"number", "date"}
+APARTMENT_SEARCH_FIELDS = ("number", "house_id", "personal_account_id")
+
+
+def _touches(update_fields, fields):
+    return update_fields is None or bool(set(update_fields) & fields)
+
+
+@receiver(post_save, sender=User)
+def user_search_saved(sender, instance, update_fields=None, **kwargs):
+    """Index owners, drop the row of a user who is no longer an owner."""
+    if _touches(update_fields, OWNER_SEARCH_FIELDS):
+        index_objects(SearchEntry.Kind.OWNER, [instance.pk])
+
+
+@receiver(post_delete, sender=User)
+def user_search_deleted(sender, instance, **kwargs):
+    """Remove the search row of a deleted owner."""
+    remove_objects(SearchEntry.Kind.OWNER, [instance.pk])
+
+
+@receiver(post_save, sender=House)
+def house_search_saved(sender, instance, created, **kwargs):
+    """Refresh apartments and accounts that show the house title."""
+    if created:
+        return
+    apartments = list(
+        Apartment.objects.filter(house=instance).values_list(
+            "pk", "personal_account_id"
+        )
+    )
+    index_objects(SearchEntry.Kind.APARTMENT, [pk for pk, _ in apartments])
+    index_objects(
+        SearchEntry.Kind.PERSONAL_ACCOUNT, [account for _, account in apartments]
+    )
+
+
+@receiver(post_save, sender=Apartment)
+def apartment_search_saved(sender, instance, **kwargs):
+    """Index the apartment and the accounts that show its number."""
+    if not apartment_changed(instance, APARTMENT_SEARCH_FIELDS):
+        return
+    previous = previous_apartment_state(instance) or {}
+    index_objects(SearchEntry.Kind.APARTMENT, [instance.pk])
+    index_objects(
+        SearchEntry.Kind.PERSONAL_ACCOUNT,
+        [instance.personal_account_id, previous.get("personal_account_id")],
+    )
+
+
+@receiver(post_delete, sender=Apartment)
+def apartment_search_deleted(sender, instance, **kwargs):
+    """Remove the apartment, its account no longer shows it."""
+    remove_objects(SearchEntry.Kind.APARTMENT, [instance.pk])
+    index_objects(SearchEntry.Kind.PERSONAL_ACCOUNT, [instance.personal_account_id])
+
+
+@receiver(post_save, sender=PersonalAccount)
+def personal_account_search_saved(sender, instance, update_fields=None, **kwargs):
+    """Index the personal account when its number is saved.
+
+    The apartment it shows is refreshed by the apartment handlers.
+    """
+    if _touches(update_fields, PERSONAL_ACCOUNT_SEARCH_FIELDS):
+        index_objects(SearchEntry.Kind.PERSONAL_ACCOUNT, [instance.pk])
+
+
+@receiver(post_delete, sender=PersonalAccount)
+def personal_account_search_deleted(sender, instance, **kwargs):
+    """Remove the search row of a deleted personal account."""
+    remove_objects(SearchEntry.Kind.PERSONAL_ACCOUNT, [instance.pk])
+
+
+@receiver(post_save, sender=Receipt)
+def receipt_search_saved(sender, instance, update_fields=None, **kwargs):
+    """Index the receipt when its number or date is saved."""
+    if _touches(update_fields, RECEIPT_SEARCH_FIELDS):
+        index_objects(SearchEntry.Kind.RECEIPT, [instance.pk])
+
+
+@receiver(post_delete, sender=Receipt)
+def receipt_search_deleted(sender, instance, **kwargs):
+    """Remove the search row of a deleted receipt."""
+    remove_objects(SearchEntry.Kind.RECEIPT, [instance.pk])
@@ -0,0 +1,9 @@
+// Подпись "примерно N" для таблиц, где сервер вернул оценку числа записей
+// вместо точного подсчета (recordsApproximate в ответе).
+function approximateCountInfo(settings, start, end, max, total, pre) {
+  const json = new $.fn.dataTable.Api(settings).ajax.json();
+  if (json && json.recordsApproximate) {
+    return pre.replace(' из ', ' из примерно ');
+  }
+  return pre;
+}
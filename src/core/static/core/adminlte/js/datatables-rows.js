@@ -0,0 +1,94 @@
+// Строки таблиц приходят от сервера компактными: id, коды статусов и флаги
+// вместо HTML. Шаблоны ссылок ("/adminlte/receipts/{id}/edit/") сервер
+// отдает один раз на ответ в json.urls, ссылки, кнопки и бейджи строк
+// собираются здесь.
+const DataTableRows = {
+  // ajax.dataSrc: собирает строки из колонок (json.columns, если сервер
+  // отдал ответ по колонкам) и дает каждой доступ к шаблонам ссылок ответа.
+  dataSrc(json) {
+    const rows = json.columns ? DataTableRows.fromColumns(json.columns) : json.data;
+    rows.forEach((row) => {
+      row.urls = json.urls;
+    });
+    return rows;
+  },
+
+  // ajax.data: возвращает серверу курсор последнего ответа (json.keyset),
+  // по нему соседние страницы читаются без OFFSET.
+  keyset(d, settings) {
+    const json = settings && settings.json;
+    if (json && json.keyset) {
+      d.keyset = JSON.stringify(json.keyset);
+    }
+    return d;
+  },
+
+  fromColumns(columns) {
+    const fields = Object.keys(columns);
+    const length = fields.length ? columns[fields[0]].length : 0;
+    return Array.from({ length }, (_, index) => Object.fromEntries(
+      fields.map((field) => [field, columns[field][index]])
+    ));
+  },
+
+  // Ссылка строки по ключу шаблона, по умолчанию на объект самой строки.
+  url(row, key, id) {
+    const template = row && row.urls && row.urls[key];
+    if (!template) return null;
+    return template.replace('{id}', encodeURIComponent(id === undefined ? row.id : id));
+  },
+
+  escape(value) {
+    return $('<div>').text(value === null || value === undefined ? '' : value).html();
+  },
+
+  // Ссылка внутри строки, клик по ней не открывает саму строку.
+  link(href, text) {
+    return `<a href="${DataTableRows.escape(href)}" onclick="event.stopPropagation();">` +
+      `${DataTableRows.escape(text)}</a>`;
+  },
+
+  // Кнопки действий строки. Ссылка: {href, className, icon, title};
+  // кнопка: {className, icon, title, data: {id: 1, name: '...'}}.
+  actions(items, wrapper = '<div class="text-end" style="white-space: nowrap;">') {
+    const buttons = items.map((item) => {
+      const icon = `<i class="bi ${item.icon}"></i>`;
+      const title = DataTableRows.escape(item.title);
+      if (item.href !== undefined) {
+        return `<a href="${DataTableRows.escape(item.href)}" class="btn ${item.className}" ` +
+          `title="${title}" onclick="event.stopPropagation();">${icon}</a>`;
+      }
+      const data = Object.entries(item.data || {})
+        .map(([name, value]) => ` data-${name}="${DataTableRows.escape(value)}"`)
+        .join('');
+      return `<button type="button" class="btn ${item.className}"${data} title="${title}">${icon}</button>`;
+    });
+    return `${wrapper}${buttons.join('')}</div>`;
+  },
+
+  // Подпись по коду: labels = {код: [подпись, класс]}, fallback для прочих.
+  label(labels, fallback = [null, '']) {
+    return (code) => {
+      const [text, textClass] = labels[code] || [fallback[0] === null ? code : fallback[0], fallback[1]];
+      return `<span class="${textClass}">${DataTableRows.escape(text)}</span>`;
+    };
+  },
+
+  badge(labels, fallback = [null, 'bg-secondary']) {
+    const badges = Object.fromEntries(
+      Object.entries(labels).map(([code, [text, badgeClass]]) => [code, [text, `badge ${badgeClass}`]])
+    );
+    return DataTableRows.label(badges, [fallback[0], `badge ${fallback[1]}`]);
+  },
+
+  // Сумма с двумя знаками ("-12.50"), выделенная цветом по знаку.
+  balance(value) {
+    const amount = parseFloat(value);
+    const amountClass = amount < 0 ? 'text-danger' : amount > 0 ? 'text-success' : '';
+    return `<span class="${amountClass} fw-bold">${DataTableRows.escape(value)}</span>`;
+  },
+
+  checkbox(className) {
+    return (data, type, row) => `<input type="checkbox" class="form-check-input ${className}" data-id="${row.id}">`;
+  },
+};
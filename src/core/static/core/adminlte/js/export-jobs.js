@@ -0,0 +1,40 @@
+// Фоновая выгрузка: ставит задачу, опрашивает прогресс и скачивает файл.
+function startExportJob(url, params, csrfToken, $button) {
+  const label = $button.html();
+  const restore = () => $button.html(label).removeClass('disabled');
+
+  $button.addClass('disabled').text('Выгрузка: в очереди...');
+
+  $.ajax({
+    url: url,
+    type: 'POST',
+    data: params,
+    headers: { 'X-CSRFToken': csrfToken },
+    success: function(job) {
+      const poll = () => {
+        $.getJSON(job.status_url)
+          .done(function(status) {
+            if (status.status === 'done') {
+              restore();
+              window.location.href = status.download_url;
+            } else if (status.status === 'failed') {
+              restore();
+              alert('Ошибка при выгрузке: ' + status.error);
+            } else {
+              $button.text('Выгрузка: ' + status.progress + '%');
+              setTimeout(poll, 1000);
+            }
+          })
+          .fail(function() {
+            restore();
+            alert('Не удалось получить статус выгрузки.');
+          });
+      };
+      poll();
+    },
+    error: function() {
+      restore();
+      alert('Не удалось запустить выгрузку.');
+    }
+  });
+}
@@ -0,0 +1,103 @@
+"""src/core/tasks.py."""
+
+import logging
+import tempfile
+
+from celery import shared_task
+from django.core.files import File
+from django.db.models import Q
+from django.utils import timezone
+
+from .exports import EXPORT_CHUNK_SIZE
+from .exports import EXPORT_TTL
+from .exports import get_exporter
+from .exports import write_csv
+from .exports import write_xlsx
+from .models import ExportJob
+
+logger = logging.getLogger(__name__)
+
+
+def _track_progress(job_id, rows):
+    """Pass the rows through, saving the progress after every chunk."""
+    processed = 0
+    for processed, row in enumerate(rows, 1):
+        yield row
+        if processed % EXPORT_CHUNK_SIZE == 0:
+            ExportJob.objects.filter(pk=job_id).update(processed_rows=processed)
+    ExportJob.objects.filter(pk=job_id).update(processed_rows=processed)
+
+
+@shared_task
+def run_export_job(job_id):
+    """Write the file of a queued export job to the media storage."""
+    updated = ExportJob.objects.filter(
+        pk=job_id, status=ExportJob.Status.PENDING
+    ).update(status=ExportJob.Status.RUNNING)
+    if not updated:
+        logger.warning("Export job %s is not pending, skipping.", job_id)
+        return "Skipped"
+
+    job = ExportJob.objects.get(pk=job_id)
+    try:
+        exporter = get_exporter(job.kind)
+        queryset = exporter.filter_queryset(job.params)
+        ExportJob.objects.filter(pk=job_id).update(total_rows=queryset.count())
+        rows = _track_progress(job_id, exporter.rows(queryset))
+
+        with tempfile.TemporaryFile() as file:
+            if job.file_format == ExportJob.Format.CSV:
+                write_csv(file, exporter.headers, rows)
+            else:
+                write_xlsx(
+                    file,
+                    exporter.sheet_title,
+                    exporter.headers,
+                    rows,
+                    exporter.column_widths,
+                )
+            file.seek(0)
+            job.file.save(
+                f"{exporter.export_filename}_{job.pk}.{job.file_format}",
+                File(file),
+                save=False,
+            )
+    except Exception as e:
+        logger.exception("Export job %s failed.", job_id)
+        ExportJob.objects.filter(pk=job_id).update(
+            status=ExportJob.Status.FAILED,
+            error=str(e),
+            finished_at=timezone.now(),
+            expires_at=timezone.now() + EXPORT_TTL,
+        )
+        return "Failed"
+
+    finished_at = timezone.now()
+    ExportJob.objects.filter(pk=job_id).update(
+        status=ExportJob.Status.DONE,
+        file=job.file.name,
+        finished_at=finished_at,
+        expires_at=finished_at + EXPORT_TTL,
+    )
+    return "Done"
+
+
+@shared_task
+def delete_expired_exports():
+    """Delete export jobs and their files once they have expired.
+
+    Jobs that never finished are dropped after the same period.
+    """
+    now = timezone.now()
+    expired = ExportJob.objects.filter(
+        Q(expires_at__lt=now)
+        | Q(expires_at__isnull=True, created_at__lt=now - EXPORT_TTL)
+    )
+    deleted = 0
+    for job in expired.iterator():
+        if job.file:
+            job.file.delete(save=False)
+        job.delete()
+        deleted += 1
+    logger.info("Deleted %s expired export jobs.", deleted)
+    return deleted
@@ -0,0 +1,44 @@
+"""src/core/testing.py."""
+
+from contextlib import contextmanager
+
+from django.db import DEFAULT_DB_ALIAS
+from django.db import connections
+from django.test.utils import CaptureQueriesContext
+from django.urls import resolve
+
+from .middleware import get_query_budget
+from .middleware import sql_fingerprint
+
+
+def _format_queries(queries):
+    return "\n".join(
+        f"{n}. {sql_fingerprint(query['sql'])}" for n, query in enumerate(queries, 1)
+    )
+
+
+@contextmanager
+def assert_max_queries(limit, using=DEFAULT_DB_ALIAS):
+    """Fail if the block executes more than ``limit`` queries."""
+    with CaptureQueriesContext(connections[using]) as context:
+        yield context
+    if len(context) > limit:
+        msg = (
+            f"{len(context)} queries executed, the budget is {limit}:\n"
+            f"{_format_queries(context.captured_queries)}"
+        )
+        raise AssertionError(msg)
+
+
+def assert_query_budget(client, path, method="get", data=None, **extra):
+    """Request ``path`` and check it stays within the budget of its view.
+
+    Return the response, so the caller can make further assertions.
+    """
+    view = resolve(path.split("?", 1)[0]).func
+    budget = get_query_budget(view)
+    if budget is None:
+        msg = f"The view of {path} does not declare a query_budget."
+        raise AssertionError(msg)
+    with assert_max_queries(budget):
+        return getattr(client, method)(path, data, **extra)
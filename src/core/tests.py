@@ -1 +1,163 @@
 """src/core/tests.py."""
+
+import datetime
+import gzip
+import itertools
+import json
+from decimal import Decimal
+
+import brotli
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from src.building.models import Apartment
+from src.building.models import House
+from src.building.models import PersonalAccount
+from src.core.models import SearchEntry
+from src.finance.models import Article
+from src.finance.models import CashBox
+from src.finance.models import Receipt
+from src.users.models import User
+
+
+@pytest.mark.django_db()
+def test_global_search_ranks_exact_identifiers_first(client):
+    """Saved objects are searchable at once, the exact number ranks first."""
+    admin = User.objects.create_superuser("admin", "admin@example.com", "admin")
+    owner = User.objects.create_user(
+        "owner",
+        "petrov@example.com",
+        first_name="Иван",
+        last_name="Петров",
+        phone="+38 (067) 123-45-67",
+        user_type=User.UserType.OWNER,
+    )
+    house = House.objects.create(title="Дом 1", address="ул. Тестовая, 1")
+    for number in ("1200", "120", "12"):
+        account = PersonalAccount.objects.create(number=f"00{number}")
+        apartment = Apartment.objects.create(
+            number=number, house=house, owner=owner, personal_account=account
+        )
+    Receipt.objects.create(number="R-0012", apartment=apartment)
+    url = reverse("api-1.0.0:global_search")
+
+    client.force_login(owner)
+    assert client.get(url, {"q": "12"}).status_code == 403  # noqa: PLR2004
+
+    client.force_login(admin)
+    results = client.get(url, {"q": "12"}).json()
+    assert [(r["kind"], r["title"]) for r in results] == [
+        ("apartment", "кв. 12"),
+        ("apartment", "кв. 120"),
+        ("apartment", "кв. 1200"),
+    ]
+
+    results = client.get(url, {"q": "0012"}).json()
+    assert results[0]["kind"] == "personal_account"
+    assert results[0]["subtitle"] == "кв. 12, Дом 1"
+    assert {r["kind"] for r in results} == {"personal_account", "receipt"}
+
+    results = client.get(url, {"q": "петров иван"}).json()
+    assert [r["object_id"] for r in results] == [owner.pk]
+    assert client.get(url, {"q": "0671234567"}).json()[0]["object_id"] == owner.pk
+
+
+@pytest.mark.django_db()
+@pytest.mark.parametrize(
+    ("accept_encoding", "content_encoding"),
+    [("gzip, deflate, br", "br"), ("gzip, br;q=0", "gzip"), ("identity", None)],
+)
+def test_json_responses_are_compressed(client, accept_encoding, content_encoding):
+    """API responses use brotli when accepted, gzip otherwise."""
+    admin = User.objects.create_superuser("admin", "admin@example.com", "admin")
+    house = House.objects.create(title="Дом 1", address="ул. Тестовая, 1")
+    for number in range(20):
+        Apartment.objects.create(number=f"1{number}", house=house)
+    client.force_login(admin)
+
+    response = client.get(
+        reverse("api-1.0.0:global_search"),
+        {"q": "дом 1"},
+        headers={"accept-encoding": accept_encoding},
+    )
+
+    assert response.get("Content-Encoding") == content_encoding
+    assert "Accept-Encoding" in response["Vary"]
+    content = response.content
+    if content_encoding == "br":
+        content = brotli.decompress(content)
+    elif content_encoding == "gzip":
+        content = gzip.decompress(content)
+    assert len(json.loads(content)) == 20  # noqa: PLR2004
+
+
+@pytest.mark.django_db()
+def test_keyset_pages_do_not_shift_when_rows_change(client):
+    """The next and previous pages are read from the rows the page shows."""
+    admin = User.objects.create_superuser("admin", "admin@example.com", "admin")
+    article = Article.objects.create(name="Оплата", type=Article.ArticleType.INCOME)
+    numbers = itertools.count(1)
+
+    def operation(day):
+        return CashBox.objects.create(
+            number=str(next(numbers)),
+            date=datetime.date(2026, 1, day),
+            amount=Decimal("10.00"),
+            article=article,
+        )
+
+    # Three operations a day, the ties are ordered by id.
+    operations = [operation(day) for day in range(1, 11) for _ in range(3)]
+    newest_first = [o.pk for o in sorted(operations, key=lambda o: (o.date, o.pk))]
+    newest_first.reverse()
+    client.force_login(admin)
+    url = reverse("finance:ajax_datatable_cashbox")
+
+    def draw(start, previous=None):
+        data = {
+            "draw": 1,
+            "start": start,
+            "length": 10,
+            "columns[0][data]": "date",
+            "columns[0][name]": "",
+            "order[0][column]": 0,
+            "order[0][dir]": "desc",
+        }
+        if previous is not None:
+            data["keyset"] = json.dumps(previous["keyset"])
+        return client.post(url, data).json()
+
+    first = draw(0)
+    assert first["columns"]["id"] == newest_first[:10]
+
+    operation(day=20)
+    CashBox.objects.filter(pk=newest_first[0]).delete()
+    second = draw(10, first)
+    assert second["columns"]["id"] == newest_first[10:20]
+
+    added = operation(day=15)
+    previous = draw(0, second)["columns"]["id"]
+    assert previous == [added.pk, *newest_first[1:10]]
+    third = draw(20, second)
+    assert third["columns"]["id"] == newest_first[20:]
+
+
+@pytest.mark.django_db()
+def test_personal_account_balance_saves_skip_the_search_index():
+    """Only a saved number reindexes the personal account."""
+    account = PersonalAccount.objects.create(number="0000000001")
+    table = SearchEntry._meta.db_table  # noqa: SLF001
+
+    account.balance = Decimal("-50.00")
+    with CaptureQueriesContext(connection) as queries:
+        account.save(update_fields=["balance"])
+    assert not [q for q in queries.captured_queries if table in q["sql"]]
+
+    account.number = "0000000002"
+    account.save()
+    entry = SearchEntry.objects.get(
+        kind=SearchEntry.Kind.PERSONAL_ACCOUNT, object_id=account.pk
+    )
+    assert entry.title == "0000000002"
@@ -1,37 +1,184 @@
 """src/core/utils.py."""
 
-from contextlib import suppress
+import hashlib
+import os
+import pickle
+from copy import copy
+from functools import lru_cache
 
 import openpyxl
 from django.utils import timezone
+from openpyxl.cell.cell import MergedCell
+from openpyxl.utils import get_column_letter
+from openpyxl.worksheet.merge import MergedCellRange
+from xlsx2html.core import HTML_TEMPLATE
+from xlsx2html.core import render_table
+from xlsx2html.core import worksheet_to_data
 
-from src.finance.models import PaymentDetails
+from src.finance.payment_details import get_payment_details
+
+ITEM_ROW_MARKERS = ("{{ item.name }}", "{{ item.number }}")
+
+
+class CompiledReceiptTemplate:
+    """A receipt template parsed once and reused for every receipt.
+
+    Keeps a pickled copy of the workbook, which loads several times faster
+    than the ``.xlsx`` file, together with the coordinates of the placeholder
+    cells, the item row, its merged ranges and its cell styles.
+    """
+
+    def __init__(self, template_path):
+        """Parse the template and locate everything a receipt fills in."""
+        with open(template_path, "rb") as template_file:  # noqa: PTH123
+            self.digest = hashlib.sha256(template_file.read()).hexdigest()
+        workbook = openpyxl.load_workbook(template_path)
+        sheet = workbook.active
+
+        self.placeholders = []
+        self.item_row = None
+        for row in sheet.iter_rows():
+            for cell in row:
+                if not isinstance(cell.value, str) or "{{" not in cell.value:
+                    continue
+                self.placeholders.append((cell.row, cell.column, cell.value))
+                if self.item_row is None and any(
+                    marker in cell.value for marker in ITEM_ROW_MARKERS
+                ):
+                    self.item_row = cell.row
+
+        self.item_merges = []
+        self.item_styles = []
+        if self.item_row:
+            self.item_merges = [
+                (merged_range.min_col, merged_range.max_col)
+                for merged_range in sheet.merged_cells.ranges
+                if merged_range.min_row <= self.item_row <= merged_range.max_row
+            ]
+            self.item_styles = [
+                (cell.column, cell._style)  # noqa: SLF001
+                for cell in sheet[self.item_row]
+                if cell.has_style
+            ]
+
+        self.snapshot = pickle.dumps(workbook, protocol=pickle.HIGHEST_PROTOCOL)
+
+    def new_workbook(self):
+        """Return a fresh copy of the template workbook."""
+        # The snapshot is created in this process from the template file.
+        workbook = pickle.loads(self.snapshot)  # noqa: S301
+        for sheet in workbook.worksheets:
+            # Unpickling loses the factories that create missing dimensions.
+            sheet.row_dimensions.default_factory = sheet._add_row  # noqa: SLF001
+            sheet.column_dimensions.default_factory = sheet._add_column  # noqa: SLF001
+        return workbook
+
+
+@lru_cache(maxsize=32)
+def _compile_receipt_template(template_path, mtime_ns):
+    return CompiledReceiptTemplate(template_path)
+
+
+def get_receipt_template(template_path):
+    """Return the compiled template, recompiled whenever the file changes."""
+    mtime_ns = os.stat(template_path).st_mtime_ns  # noqa: PTH116
+    return _compile_receipt_template(template_path, mtime_ns)
+
+
+def workbook_to_html(workbook):
+    """Render the active sheet of a populated workbook as an HTML page.
+
+    Gives the same markup as ``xlsx2html`` on the saved file, without
+    serializing the workbook and parsing it back.
+    """
+    sheet = workbook.active
+    for row in sheet.iter_rows():
+        for cell in row:
+            if cell.data_type == "f":
+                # openpyxl does not compute formulas, a saved file has no
+                # cached result for them.
+                cell.value = None
+            elif isinstance(cell.value, float) and cell.value.is_integer():
+                # A saved file stores 3.0 as 3 and reads it back as an int.
+                cell.value = int(cell.value)
+    data = worksheet_to_data(sheet, locale="en")
+    table = render_table(
+        data,
+        append_headers=lambda _data, _html: True,
+        append_lineno=lambda _row, _index: True,
+    )
+    return HTML_TEMPLATE % table
 
 
 class ReceiptExcelGenerator:
     """Receipt Excel Generator."""
 
-    def __init__(self, receipt, template_path):
-        """Init."""
+    def __init__(self, receipt, template_path, payment_details=None):
+        """Init.
+
+        ``payment_details`` can be passed in when many receipts are rendered
+        at once, otherwise the cached ones are used. Load receipts with
+        ``src.finance.receipts.receipts_for_rendering`` to render them
+        without further queries.
+        """
         self.receipt = receipt
         self.template_path = template_path
+        self.payment_details = payment_details
+        self._context = None
+        self._items = None
 
     def generate_workbook(self):
         """Generate the Excel workbook."""  # FIXED: D401 - Imperative mood
-        workbook = openpyxl.load_workbook(self.template_path)
+        template = get_receipt_template(self.template_path)
+        workbook = template.new_workbook()
         sheet = workbook.active
 
-        context = self._build_template_context()
-        self._replace_template_variables(sheet, context)
+        self._replace_template_variables(sheet, template, self._get_context())
 
-        items = self.receipt.receiptitem_set.select_related("service__unit").all()
-        template_row_idx = self._find_template_row(sheet)
-
-        if template_row_idx and items:
-            self._insert_receipt_items(sheet, template_row_idx, items)
+        items = self._get_items()
+        if template.item_row and items:
+            self._insert_receipt_items(sheet, template, items)
 
         return workbook
 
+    def generate_html(self):
+        """Generate the receipt as an HTML page."""
+        return workbook_to_html(self.generate_workbook())
+
+    def content_key(self):
+        """Return a hash of everything the rendered receipt depends on.
+
+        Covers the template file, the values of the placeholders it uses
+        (receipt totals and status, balance, payment details, ...) and the
+        receipt items, so the key changes whenever the output would.
+        """
+        template = get_receipt_template(self.template_path)
+        digest = hashlib.sha256(template.digest.encode())
+        for key, value in self._get_context().items():
+            if any(key in text for _row, _column, text in template.placeholders):
+                digest.update(f"{key}={value}\n".encode())
+        for item in self._get_items():
+            digest.update(
+                f"{item.service.name}|{item.consumption}|{item.service.unit.name}|"
+                f"{item.price_per_unit}|{item.amount}\n".encode()
+            )
+        return digest.hexdigest()
+
+    def _get_context(self):
+        if self._context is None:
+            self._context = self._build_template_context()
+        return self._context
+
+    def _get_items(self):
+        if self._items is None:
+            # Receipts from ``receipts_for_rendering`` come with their items.
+            self._items = getattr(self.receipt, "render_items", None)
+        if self._items is None:
+            self._items = list(
+                self.receipt.receiptitem_set.select_related("service__unit")
+            )
+        return self._items
+
     def _build_template_context(self):
         """Build context dictionary for template variable replacement."""
         receipt = self.receipt
@@ -48,11 +195,13 @@ class ReceiptExcelGenerator:
                 f"- {receipt.period_end.strftime('%d.%m.%Y')}"
             )
 
-        try:
-            payment_details = PaymentDetails.objects.get(pk=1)
+        payment_details = self.payment_details
+        if payment_details is None:
+            payment_details = get_payment_details()
+        if payment_details is not None:
             company_name = payment_details.company_name
             company_details = payment_details.info
-        except PaymentDetails.DoesNotExist:
+        else:
             company_name = "Название компании не задано"
             company_details = "Реквизиты не заданы"
 
@@ -60,6 +209,14 @@ class ReceiptExcelGenerator:
         if receipt.apartment and receipt.apartment.personal_account:
             account_balance = receipt.apartment.personal_account.balance
 
+        # The creation date, not today: the rendered receipt and its content
+        # key must not change from one day to the next.
+        created_date = (
+            timezone.localdate(receipt.created_at)
+            if receipt.created_at
+            else receipt.date
+        )
+
         total_to_pay = receipt.total_amount
         if account_balance < 0:
             total_to_pay += abs(account_balance)
@@ -99,79 +256,94 @@ class ReceiptExcelGenerator:
             "{{ pay_company.details }}": company_details,
             "{{ account.balance }}": f"{account_balance:.2f}",
             "{{ total_pay }}": f"{total_to_pay:.2f}",
-            "{{ receipt.created_date }}": timezone.now().strftime("%d.%m.%Y"),
+            "{{ receipt.created_date }}": created_date.strftime("%d.%m.%Y"),
         }
 
-    def _replace_template_variables(self, sheet, context):
-        for row in sheet.iter_rows():
-            for cell in row:
-                if isinstance(cell.value, str):
-                    for key, value in context.items():
-                        if key in cell.value:
-                            cell.value = cell.value.replace(key, str(value))
+    def _replace_template_variables(self, sheet, template, context):
+        for row, column, template_value in template.placeholders:
+            value = template_value
+            for key, replacement in context.items():
+                if key in value:
+                    value = value.replace(key, str(replacement))
+            sheet.cell(row=row, column=column).value = value
 
-    def _find_template_row(self, sheet):
-        for i, row in enumerate(sheet.iter_rows(), 1):
-            for cell in row:
-                if isinstance(cell.value, str) and (
-                    "{{ item.name }}" in cell.value or "{{ item.number }}" in cell.value
-                ):
-                    return i
-        return None
-
-    def _insert_receipt_items(self, sheet, template_row_idx, items):
-        template_row = sheet[template_row_idx]
-
-        # FIXED: PERF401 - Use list comprehension instead of loop with append
-        merged_ranges_to_copy = [
-            {
-                "min_col": merged_range.min_col,
-                "max_col": merged_range.max_col,
-            }
-            for merged_range in sheet.merged_cells.ranges
-            if merged_range.min_row <= template_row_idx <= merged_range.max_row
-        ]
+    def _insert_receipt_items(self, sheet, template, items):
+        """Expand the template item row into one row per item.
+
+        The rows below are shifted once for all items, and the new rows share
+        the styles, merged ranges and height of the template row.
+        """
+        row_idx = template.item_row
+        template_row = [(cell.column, cell.value) for cell in sheet[row_idx]]
+        if len(items) > 1:
+            self._shift_rows_below(sheet, row_idx, len(items) - 1)
+
+        height = None
+        if row_idx in sheet.row_dimensions:
+            height = sheet.row_dimensions[row_idx].height
 
         for i, item in enumerate(items, 1):
-            new_row_idx = template_row_idx + i
-            sheet.insert_rows(new_row_idx)
-            new_row = sheet[new_row_idx]
-
-            self._copy_row_style(template_row, new_row)
-            self._populate_item_row(new_row, template_row, item, i)
-
-            # FIXED: SIM105 - Use contextlib.suppress instead of try-except-pass
-            for merge_info in merged_ranges_to_copy:
-                with suppress(ValueError):
-                    sheet.merge_cells(
-                        start_row=new_row_idx,
-                        start_column=merge_info["min_col"],
-                        end_row=new_row_idx,
-                        end_column=merge_info["max_col"],
-                    )
-
-        sheet.delete_rows(template_row_idx)
-
-    def _copy_row_style(self, template_row, new_row):
-        for j, template_cell in enumerate(template_row, 1):
-            new_cell = new_row[j - 1]
-            if template_cell.has_style:
-                new_cell.font = template_cell.font.copy()
-                new_cell.border = template_cell.border.copy()
-                new_cell.fill = template_cell.fill.copy()
-                new_cell.number_format = template_cell.number_format
-                new_cell.protection = template_cell.protection.copy()
-                new_cell.alignment = template_cell.alignment.copy()
-
-    def _populate_item_row(self, new_row, template_row, item, item_number):
-        for j, template_cell in enumerate(template_row, 1):
-            new_cell = new_row[j - 1]
-            if not isinstance(template_cell.value, str):
-                continue
+            new_row_idx = row_idx + i - 1
+            if i > 1:
+                for min_col, max_col in template.item_merges:
+                    self._merge_item_cells(sheet, new_row_idx, min_col, max_col)
+                self._copy_row_style(template, new_row_idx, sheet)
+                if height is not None:
+                    sheet.row_dimensions[new_row_idx].height = height
+            self._populate_item_row(sheet, new_row_idx, template_row, item, i)
+
+    @staticmethod
+    def _shift_rows_below(sheet, row_idx, amount):
+        """Move everything below ``row_idx`` down by ``amount`` rows at once."""
+        sheet.insert_rows(row_idx + 1, amount)
+        # openpyxl only moves the cells, move merged ranges and heights too.
+        for merged_range in [
+            merged_range
+            for merged_range in sheet.merged_cells.ranges
+            if merged_range.min_row > row_idx
+        ]:
+            sheet.merged_cells.remove(merged_range)
+            merged_range.shift(row_shift=amount)
+            sheet.merged_cells.add(merged_range)
+        dimensions = sheet.row_dimensions
+        for index in sorted((i for i in dimensions if i > row_idx), reverse=True):
+            dimension = dimensions.pop(index)
+            dimension.index = index + amount
+            dimensions[index + amount] = dimension
+
+    @staticmethod
+    def _merge_item_cells(sheet, row_idx, min_col, max_col):
+        """Merge cells of an item row like ``sheet.merge_cells`` does.
 
-            val_str = self._replace_item_placeholders(
-                template_cell.value, item, item_number
+        The borders of the merged cells come with the styles copied from the
+        template row, so the slow border formatting of ``merge_cells`` and
+        its linear search through the merged ranges are skipped.
+        """
+        for column in range(min_col + 1, max_col + 1):
+            sheet._cells[row_idx, column] = MergedCell(sheet, row_idx, column)  # noqa: SLF001
+        sheet.merged_cells.ranges.add(
+            MergedCellRange(
+                sheet,
+                f"{get_column_letter(min_col)}{row_idx}:"
+                f"{get_column_letter(max_col)}{row_idx}",
             )
+        )
+
+    def _copy_row_style(self, template, row_idx, sheet):
+        for column, style in template.item_styles:
+            sheet.cell(row=row_idx, column=column)._style = copy(style)  # noqa: SLF001
+
+    def _populate_item_row(self, sheet, row_idx, template_row, item, item_number):  # noqa: PLR0913
+        for column, template_value in template_row:
+            if template_value is None:
+                continue
+            new_cell = sheet.cell(row=row_idx, column=column)
+            if not isinstance(template_value, str):
+                # Only the placeholders of the template row are repeated.
+                new_cell.value = None
+                continue
+
+            val_str = self._replace_item_placeholders(template_value, item, item_number)
             try:
                 numeric_placeholders = [
                     "{{ item.consumption }}",
@@ -179,7 +351,7 @@ class ReceiptExcelGenerator:
                     "{{ item.amount }}",
                     "{{ item.number }}",
                 ]
-                if any(p in template_cell.value for p in numeric_placeholders):
+                if any(p in template_value for p in numeric_placeholders):
                     new_cell.value = float(val_str.replace(",", "."))
                 else:
                     new_cell.value = val_str
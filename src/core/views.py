@@ -1,9 +1,14 @@
 """src/core/views.py."""
 
+from abc import ABC
+from abc import abstractmethod
+
 from django.contrib import messages
 from django.contrib.auth import authenticate
 from django.contrib.auth import login
 from django.contrib.auth import logout
+from django.db import transaction
+from django.http import JsonResponse
 from django.shortcuts import redirect
 from django.urls import NoReverseMatch
 from django.urls import reverse
@@ -11,8 +16,11 @@ from django.views import View
 from django.views.generic import FormView
 
 from Config import settings
+from src.core.exports import export_response
 from src.core.forms import CustomAuthenticationForm
 from src.core.forms import ResidentHCaptchaForm
+from src.core.models import ExportJob
+from src.core.tasks import run_export_job
 from src.users.models import User
 
 
@@ -188,3 +196,65 @@ class LogoutView(View):
     def post(self, request, *args, **kwargs):
         """Post."""
         return self.dispatch(request, *args, **kwargs)
+
+
+class ExportView(View, ABC):
+    """Export a filtered list as an Excel or CSV file.
+
+    ``GET`` streams the file within the request. ``POST`` queues an
+    ``ExportJob`` with the same filter parameters and returns the URL of its
+    progress endpoint. Subclasses set the export attributes and implement
+    ``filter_queryset(params)`` and ``rows(queryset)``.
+    """
+
+    export_kind = None
+    export_filename = "export"
+    sheet_title = "Export"
+    headers = ()
+    column_widths = ()
+
+    def get(self, request, *args, **kwargs):
+        """Return the export file."""
+        queryset = self.filter_queryset(request.GET)
+        return export_response(
+            request,
+            self.export_filename,
+            self.sheet_title,
+            self.headers,
+            self.rows(queryset),
+            self.column_widths,
+        )
+
+    def post(self, request, *args, **kwargs):
+        """Queue the export as a background job."""
+        params = request.POST.dict()
+        params.pop("csrfmiddlewaretoken", None)
+        try:
+            file_format = ExportJob.Format(params.pop("format", "xlsx"))
+        except ValueError:
+            file_format = ExportJob.Format.XLSX
+
+        job = ExportJob.objects.create(
+            user=request.user,
+            kind=self.export_kind,
+            file_format=file_format,
+            params=params,
+        )
+        transaction.on_commit(lambda: run_export_job.delay(job.pk))
+        return JsonResponse(
+            {
+                "id": job.pk,
+                "status_url": reverse(
+                    "api-1.0.0:export_job", kwargs={"job_id": job.pk}
+                ),
+            },
+            status=202,
+        )
+
+    @abstractmethod
+    def filter_queryset(self, params):
+        """Return the queryset filtered by the list filter parameters."""
+
+    @abstractmethod
+    def rows(self, queryset):
+        """Yield the rows of the file."""
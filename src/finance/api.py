@@ -3,25 +3,28 @@
 from django.db import DatabaseError
 from django.db import transaction
 from django.db.models import ProtectedError
-from django.db.models import Sum
 from django.http import HttpRequest
 from django.shortcuts import get_object_or_404
 from ninja import Router
 
-from src.building.models import PersonalAccount
-
 from .models import Article
 from .models import CashBox
 from .models import CounterReading
+from .models import PrintTemplate
 from .models import Receipt
+from .models import ReceiptMailing
 from .models import Service
 from .models import Tariff
 from .models import TariffService
 from .schemas import CounterReadingSchema
 from .schemas import DeleteItemsSchema
+from .schemas import ReceiptMailingCreateSchema
+from .schemas import ReceiptMailingSchema
 from .schemas import StatusResponse
 from .schemas import TariffServiceSchema
 from .schemas import UnitSchema
+from .summary import get_finance_totals
+from .tasks import queue_receipt_mailing
 
 router = Router(tags=["Finance"])
 
@@ -211,6 +214,87 @@ def bulk_delete_receipts(request: HttpRequest, payload: DeleteItemsSchema):
         }
 
 
+# Failures returned with the progress of a mailing.
+MAILING_FAILURES_LIMIT = 100
+
+
+def _receipt_mailing_data(mailing, failures_limit=MAILING_FAILURES_LIMIT):
+    failures = mailing.failures.select_related("receipt").order_by("pk")
+    return {
+        "id": mailing.pk,
+        "status": mailing.status,
+        "total": mailing.total,
+        "sent": mailing.sent,
+        "failed": mailing.failed,
+        "progress": mailing.progress,
+        "created_at": mailing.created_at,
+        "finished_at": mailing.finished_at,
+        "failures": [
+            {
+                "receipt_id": failure.receipt_id,
+                "receipt_number": failure.receipt.number,
+                "error": failure.error,
+            }
+            for failure in failures[:failures_limit]
+        ],
+    }
+
+
+@router.post(
+    "/receipts/mailings", response={202: ReceiptMailingSchema, 400: StatusResponse}
+)
+def create_receipt_mailing(request: HttpRequest, payload: ReceiptMailingCreateSchema):
+    """Queue the emailing of selected or filtered receipts to the owners.
+
+    Explicit ``ids`` take precedence; otherwise posted receipts are selected
+    by house, section and period.
+    """
+    if payload.ids:
+        receipts = Receipt.objects.filter(pk__in=payload.ids)
+    elif (
+        payload.house_id
+        or payload.section_id
+        or payload.period_start
+        or payload.period_end
+    ):
+        receipts = Receipt.objects.filter(is_posted=True)
+        if payload.house_id:
+            receipts = receipts.filter(apartment__house_id=payload.house_id)
+        if payload.section_id:
+            receipts = receipts.filter(apartment__section_id=payload.section_id)
+        if payload.period_start:
+            receipts = receipts.filter(period_start__gte=payload.period_start)
+        if payload.period_end:
+            receipts = receipts.filter(period_end__lte=payload.period_end)
+    else:
+        return 400, {
+            "status": "error",
+            "message": "Выберите квитанции, дом, секцию или период для рассылки.",
+        }
+
+    if payload.template_id:
+        get_object_or_404(PrintTemplate, pk=payload.template_id)
+
+    with transaction.atomic():
+        mailing = ReceiptMailing.objects.create(
+            created_by=request.user if request.user.is_authenticated else None,
+            template_id=payload.template_id,
+            filters=payload.model_dump(mode="json"),
+        )
+        queue_receipt_mailing(
+            mailing, receipts.order_by("pk").values_list("pk", flat=True)
+        )
+    mailing.refresh_from_db()
+    return 202, _receipt_mailing_data(mailing)
+
+
+@router.get("/receipts/mailings/{mailing_id}", response=ReceiptMailingSchema)
+def get_receipt_mailing(request, mailing_id: int):
+    """Return the progress of a receipt mailing with its failures."""
+    mailing = get_object_or_404(ReceiptMailing, pk=mailing_id)
+    return _receipt_mailing_data(mailing)
+
+
 @router.get(
     "/apartment/{apartment_id}/unread-readings", response=list[CounterReadingSchema]
 )
@@ -278,34 +362,12 @@ def delete_cashbox(request: HttpRequest, cashbox_id: int):
                     account.balance -= cashbox_to_delete.amount
                 elif cashbox_to_delete.article.type == Article.ArticleType.EXPENSE:
                     account.balance += cashbox_to_delete.amount
-                account.save()
+                account.save(update_fields=["balance"])
 
             cashbox_to_delete.delete()
 
-            income = (
-                CashBox.objects.filter(
-                    is_posted=True, article__type="income"
-                ).aggregate(s=Sum("amount"))["s"]
-                or 0
-            )
-            expense = (
-                CashBox.objects.filter(
-                    is_posted=True, article__type="expense"
-                ).aggregate(s=Sum("amount"))["s"]
-                or 0
-            )
-            total_cash = income - expense
-
-            total_balance = (
-                PersonalAccount.objects.aggregate(t=Sum("balance"))["t"] or 0
-            )
-
-            total_debt = (
-                PersonalAccount.objects.filter(balance__lt=0).aggregate(
-                    t=Sum("balance")
-                )["t"]
-                or 0
-            )
+        # The summary row already includes the deleted operation.
+        totals = get_finance_totals()
 
     # Fixed BLE001: Catch specific exceptions instead of bare Exception
     except (DatabaseError, ValueError, AttributeError, ProtectedError) as e:
@@ -315,8 +377,8 @@ def delete_cashbox(request: HttpRequest, cashbox_id: int):
             "status": "success",
             "message": "Запись удалена",
             "stats": {
-                "total_cash": float(total_cash),
-                "total_balance": float(total_balance),
-                "total_debt": float(total_debt),
+                "total_cash": float(totals["total_cash"]),
+                "total_balance": float(totals["total_balance"]),
+                "total_debt": float(totals["total_debt"]),
             },
         }
@@ -8,3 +8,7 @@ class FinanceConfig(AppConfig):
 
     default_auto_field = "django.db.models.BigAutoField"
     name = "src.finance"
+
+    def ready(self):
+        """Connect the handlers that keep the finance summary up to date."""
+        from . import signals  # noqa: F401
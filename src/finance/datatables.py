@@ -4,13 +4,14 @@ import datetime
 
 from ajax_datatable.views import AjaxDatatableView
 from django.db.models import IntegerField
-from django.db.models import OuterRef
 from django.db.models import Q
-from django.db.models import Subquery
 from django.db.models.functions import Cast
-from django.urls import reverse
 from django.utils import timezone
 
+from src.core.datatables import ColumnarResponseMixin
+from src.core.datatables import KeysetPaginationMixin
+from src.core.datatables import RowUrlsMixin
+
 from .models import Article
 from .models import CashBox
 from .models import Counter
@@ -19,10 +20,11 @@ from .models import Receipt
 from .models import Tariff
 
 
-class ArticleAjaxDatatableView(AjaxDatatableView):
+class ArticleAjaxDatatableView(RowUrlsMixin, AjaxDatatableView):
     """Provides server-side processing for the Article list DataTable."""
 
     model = Article
+    row_urls = {"edit": "finance:article_edit"}
     title = "Статьи"
     initial_order = [["name", "asc"]]
     show_search_form = False
@@ -43,50 +45,23 @@ class ArticleAjaxDatatableView(AjaxDatatableView):
             "orderable": True,
             "className": "text-start",
         },
-        {
-            "name": "actions",
-            "title": "",
-            "visible": True,
-            "orderable": False,
-            "searchable": False,
-            "className": "text-end",
-            "width": "80px",
-        },
     ]
 
     def customize_row(self, row, obj):
         """Customize each row of the DataTable."""
-        type_display = obj.get_type_display()
-        if obj.type == "income":
-            row["type"] = f'<span class="text-success">{type_display}</span>'
-        elif obj.type == "expense":
-            row["type"] = f'<span class="text-danger">{type_display}</span>'
-
-        edit_url = reverse("finance:article_edit", args=[obj.pk])
-
-        row["DT_RowAttr"] = {"data-detail-url": edit_url}
-
-        row["actions"] = f"""
-            <div class="text-end" style="white-space: nowrap;">
-                <a href="{edit_url}" class="btn btn-sm btn-primary"
-                    title="Редактировать" onclick="event.stopPropagation();">
-                    <i class="bi bi-pencil"></i>
-                </a>
-                <button type="button" class="btn btn-sm btn-danger delete-article-btn"
-                        data-id="{obj.pk}"
-                        data-name="{obj.name}"
-                        title="Удалить">
-                    <i class="bi bi-trash"></i>
-                </button>
-            </div>
-        """
+        row["id"] = obj.pk
+        row["type"] = obj.type
         return row
 
 
-class TariffAjaxDatatableView(AjaxDatatableView):
+class TariffAjaxDatatableView(RowUrlsMixin, AjaxDatatableView):
     """Provide server-side processing for the Tariff list DataTable."""
 
     model = Tariff
+    row_urls = {
+        "detail": "finance:tariff_detail",
+        "edit": "finance:tariff_edit",
+    }
     title = "Тарифы"
     initial_order = [["name", "asc"]]
     show_column_filters = False
@@ -117,14 +92,6 @@ class TariffAjaxDatatableView(AjaxDatatableView):
             "visible": True,
             "orderable": True,
         },
-        {
-            "name": "actions",
-            "title": "",
-            "visible": True,
-            "orderable": False,
-            "searchable": False,
-            "width": "120px",
-        },
     ]
 
     def get_initial_queryset(self, request=None):
@@ -154,27 +121,12 @@ class TariffAjaxDatatableView(AjaxDatatableView):
 
     def customize_row(self, row, obj):
         """Customize each row of the DataTable."""
+        row["id"] = obj.pk
         row["updated_at"] = obj.updated_at.strftime("%d.%m.%Y - %H:%M")
-        edit_url = reverse("finance:tariff_edit", args=[obj.pk])
-
-        row["actions"] = f"""
-            <div class="text-end" style="white-space: nowrap;">
-                <a href="{edit_url}" class="btn btn-sm btn-primary"
-                 title="Edit" onclick="event.stopPropagation();">
-                    <i class="bi bi-pencil"></i>
-                </a>
-                <button type="button" class="btn btn-sm btn-danger delete-tariff-btn"
-                        data-id="{obj.pk}"
-                        data-name="{obj.name}"
-                        title="Delete">
-                    <i class="bi bi-trash"></i>
-                </button>
-            </div>
-        """
         return row
 
 
-class CounterAjaxDatatableView(AjaxDatatableView):
+class CounterAjaxDatatableView(ColumnarResponseMixin, AjaxDatatableView):
     """Display a list of counters with the latest reading for each one."""
 
     model = Counter
@@ -209,7 +161,7 @@ class CounterAjaxDatatableView(AjaxDatatableView):
             "orderable": False,
         },
         {
-            "name": "latest_reading",
+            "name": "latest_reading_value",
             "title": "Текущие показания",
             "orderable": False,
             "searchable": False,
@@ -220,24 +172,11 @@ class CounterAjaxDatatableView(AjaxDatatableView):
             "foreign_field": "service__unit__name",
             "orderable": False,
         },
-        {
-            "name": "actions",
-            "title": "",
-            "orderable": False,
-            "searchable": False,
-            "width": "100px",
-        },
     ]
 
     def get_initial_queryset(self, request=None):
-        """Build initial queryset with latest reading annotation."""
-        latest_reading_subquery = (
-            CounterReading.objects.filter(counter=OuterRef("pk"))
-            .order_by("-date", "-id")
-            .values("value")[:1]
-        )
+        """Build initial queryset, the latest reading is stored on the counter."""
         queryset = Counter.objects.annotate(
-            latest_reading=Subquery(latest_reading_subquery),
             apartment_number_as_int=Cast("apartment__number", IntegerField()),
         ).select_related("apartment__house", "apartment__section", "service__unit")
         if not request:
@@ -261,50 +200,32 @@ class CounterAjaxDatatableView(AjaxDatatableView):
 
     def customize_row(self, row, obj):
         """Customize row data."""
-        from urllib.parse import urlencode
-
+        row["id"] = obj.pk
         row["house"] = obj.apartment.house.title
         row["section"] = obj.apartment.section.name if obj.apartment.section else "—"
         row["apartment_number"] = obj.apartment.number
         row["service"] = obj.service.name
-        row["latest_reading"] = (
-            f"{obj.latest_reading:.1f}" if obj.latest_reading is not None else "—"
+        row["latest_reading_value"] = (
+            f"{obj.latest_reading_value:.1f}"
+            if obj.latest_reading_value is not None
+            else "—"
         )
         row["unit"] = obj.service.unit.name
-        base_url = reverse("finance:counter_reading_list")
-        params = {
-            "house": obj.apartment.house_id,
-            "section": obj.apartment.section_id if obj.apartment.section else "",
-            "apartment_number": obj.apartment.number,
-            "service": obj.service_id,
-        }
-        history_url_with_filters = f"{base_url}?{urlencode(params)}"
-        add_reading_url = (
-            reverse("finance:counter_reading_add") + f"?apartment={obj.apartment.pk}"
-        )
-        row["DT_RowAttr"] = {
-            "data-href": history_url_with_filters,
-            "style": "cursor: pointer;",
-        }
-        row["actions"] = f"""
-            <div class="text-end" style="white-space: nowrap;">
-                <a href="{history_url_with_filters}" class="btn btn-sm btn-info"
-                 title="Открыть историю показаний" onclick="event.stopPropagation();">
-                    <i class="bi bi-eye"></i>
-                </a>
-                <a href="{add_reading_url}" class="btn btn-sm btn-success"
-                 title="Снять новое показание" onclick="event.stopPropagation();">
-                    <i class="bi bi-plus"></i>
-                </a>
-            </div>
-        """
+        # Filters of the reading history and the new reading form.
+        row["house_id"] = obj.apartment.house_id
+        row["section_id"] = obj.apartment.section_id
+        row["apartment_id"] = obj.apartment_id
+        row["service_id"] = obj.service_id
         return row
 
 
-class CounterReadingAjaxDatatableView(AjaxDatatableView):
+class CounterReadingAjaxDatatableView(
+    ColumnarResponseMixin, RowUrlsMixin, KeysetPaginationMixin, AjaxDatatableView
+):
     """Provide data for the GENERAL meter reading history table."""
 
     model = CounterReading
+    row_urls = {"edit": "finance:counter_reading_edit"}
     title = "Показания счетчиков"
     initial_order = [["date", "desc"], ["id", "desc"]]
     show_column_filters = False
@@ -345,13 +266,6 @@ class CounterReadingAjaxDatatableView(AjaxDatatableView):
             "foreign_field": "counter__service__unit__name",
             "orderable": False,
         },
-        {
-            "name": "actions",
-            "title": "",
-            "orderable": False,
-            "searchable": False,
-            "width": "100px",
-        },
     ]
 
     def get_initial_queryset(self, request=None):
@@ -397,16 +311,8 @@ class CounterReadingAjaxDatatableView(AjaxDatatableView):
 
     def customize_row(self, row, obj):
         """Customize row data."""
-        status_map = {
-            "new": ("Новое", "bg-warning"),
-            "considered": ("Учтено", "bg-info"),
-            "zero": ("Нулевое", "bg-secondary"),
-            "paid": ("Учтено и оплачено", "bg-success"),
-        }
-        status_text, badge_class = status_map.get(
-            obj.status, (obj.get_status_display(), "bg-light")
-        )
-        row["status"] = f'<span class="badge {badge_class}">{status_text}</span>'
+        row["id"] = obj.pk
+        row["status"] = obj.status
         row["number"] = obj.number or "—"
         row["date"] = obj.date.strftime("%d.%m.%Y")
         row["month"] = obj.date.strftime("%B %Y")
@@ -418,42 +324,24 @@ class CounterReadingAjaxDatatableView(AjaxDatatableView):
         row["service"] = obj.counter.service.name
         row["value"] = f"{obj.value:.3f}".rstrip("0").rstrip(".")
         row["unit"] = obj.counter.service.unit.name
-        edit_url = reverse("finance:counter_reading_edit", args=[obj.pk])
-        row["actions"] = f"""
-            <div class="text-end" style="white-space: nowrap;">
-                <a href="{edit_url}" class="btn btn-sm btn-primary"
-                   title="Редактировать">
-                    <i class="bi bi-pencil"></i>
-                </a>
-                <button type="button" class="btn btn-sm btn-danger delete-reading-btn"
-                        data-id="{obj.pk}" title="Удалить">
-                    <i class="bi bi-trash"></i>
-                </button>
-            </div>
-        """
         return row
 
 
-class ReceiptAjaxDatatableView(AjaxDatatableView):
+class ReceiptAjaxDatatableView(
+    ColumnarResponseMixin, RowUrlsMixin, KeysetPaginationMixin, AjaxDatatableView
+):
     """Provide data for the receipt table with consistent filtering."""
 
     model = Receipt
+    row_urls = {
+        "detail": "finance:receipt_detail",
+        "edit": "finance:receipt_edit",
+    }
     title = "Квитанции"
     initial_order = [["date", "desc"]]
     show_column_filters = False
 
     column_defs = [
-        {
-            "name": "checkbox",
-            "title": (
-                '<input type="checkbox" '
-                'class="form-check-input" id="select-all-receipts">'
-            ),
-            "orderable": False,
-            "searchable": False,
-            "width": "20px",
-            "className": "text-center",
-        },
         {"name": "number", "title": "№ квитанции", "orderable": True},
         {"name": "date", "title": "Дата", "orderable": True},
         {"name": "total_amount", "title": "Сумма (грн)", "orderable": True},
@@ -472,13 +360,6 @@ class ReceiptAjaxDatatableView(AjaxDatatableView):
             "orderable": False,
             "searchable": False,
         },
-        {
-            "name": "actions",
-            "title": "",
-            "orderable": False,
-            "searchable": False,
-            "width": "120px",
-        },
     ]
 
     def get_initial_queryset(self, request=None):
@@ -530,17 +411,8 @@ class ReceiptAjaxDatatableView(AjaxDatatableView):
 
     def customize_row(self, row, obj):
         """Customize row data."""
-        row["checkbox"] = (
-            f'<input type="checkbox" class="form-check-input receipt-checkbox" '
-            f'data-id="{obj.pk}">'
-        )
-        status_map = {
-            "paid": ("Оплачена", "bg-success"),
-            "partially_paid": ("Частично", "bg-warning"),
-            "unpaid": ("Неоплачена", "bg-danger"),
-        }
-        status_text, badge_class = status_map.get(obj.status)
-        row["status"] = f'<span class="badge {badge_class}">{status_text}</span>'
+        row["id"] = obj.pk
+        row["status"] = obj.status
         row["date"] = obj.date.strftime("%d.%m.%Y")
         months = [
             "",
@@ -565,36 +437,26 @@ class ReceiptAjaxDatatableView(AjaxDatatableView):
             )
         else:
             row["apartment"], row["owner"] = "—", "—"
-        row["is_posted"] = "Conducted" if obj.is_posted else "Not conducted"
+        row["is_posted"] = obj.is_posted
         row["total_amount"] = f"{obj.total_amount:.2f}"
-        detail_url = reverse("finance:receipt_detail", args=[obj.pk])
-        edit_url = reverse("finance:receipt_edit", args=[obj.pk])
-        row["DT_RowAttr"] = {"data-detail-url": detail_url}
-
-        row["actions"] = f"""
-            <div class="text-end" style="white-space: nowrap;">
-                <a href="{detail_url}" class="btn btn-sm btn-secondary"
-                title="Просмотр">
-                    <i class="bi bi-file-earmark-text"></i>
-                </a>
-                <a href="{edit_url}" class="btn btn-sm btn-primary"
-                title="Редактировать">
-                    <i class="bi bi-pencil"></i>
-                </a>
-                <button type="button" class="btn btn-sm btn-danger delete-receipt-btn"
-                        data-id="{obj.pk}" data-number="{obj.number}"
-                        title="Удалить">
-                    <i class="bi bi-trash"></i>
-                </button>
-            </div>
-        """
         return row
 
 
-class CashBoxAjaxDatatableView(AjaxDatatableView):
+class CashBoxAjaxDatatableView(
+    ColumnarResponseMixin, RowUrlsMixin, KeysetPaginationMixin, AjaxDatatableView
+):
     """Provide data for the CashBox transaction table."""
 
     model = CashBox
+    row_urls = {
+        "detail": "finance:cashbox_detail",
+        "edit": "finance:cashbox_update",
+    }
+    # Queries for a page of rows.
+    query_budget = 4
+    # only() on the listed columns would defer the related rows customize_row
+    # reads, one query per row and relation.
+    disable_queryset_optimization_only = True
     title = "Касса"  # noqa: RUF001
     initial_order = [["date", "desc"]]
     show_column_filters = False
@@ -611,18 +473,20 @@ class CashBoxAjaxDatatableView(AjaxDatatableView):
             "foreign_field": "personal_account__number",
         },
         {
-            "name": "type_display",
+            "name": "article_type",
             "title": "Приход/Расход",
+            "foreign_field": "article__type",
             "searchable": False,
             "orderable": False,
         },
         {"name": "amount", "title": "Сумма (грн)", "className": "text-end"},
-        {"name": "actions", "title": "", "searchable": False, "orderable": False},
     ]
 
     def get_initial_queryset(self, request=None):
         """Build initial queryset and apply filters."""
-        queryset = CashBox.objects.select_related("article", "personal_account")
+        queryset = CashBox.objects.select_related(
+            "article", "personal_account__apartment__owner"
+        )
 
         if not request:
             return queryset
@@ -665,12 +529,9 @@ class CashBoxAjaxDatatableView(AjaxDatatableView):
 
     def customize_row(self, row, obj):
         """Customize row rendering."""
+        row["id"] = obj.pk
         row["date"] = obj.date.strftime("%d.%m.%Y")
-
-        if obj.is_posted:
-            row["is_posted"] = '<span class="badge bg-success">Проведен</span>'
-        else:
-            row["is_posted"] = '<span class="badge bg-danger">Не проведен</span>'  # noqa: RUF001
+        row["is_posted"] = obj.is_posted
 
         owner_name = "-"
         if (
@@ -681,32 +542,6 @@ class CashBoxAjaxDatatableView(AjaxDatatableView):
         ):
             owner_name = obj.personal_account.apartment.owner.get_full_name()
         row["owner"] = owner_name
-
-        if obj.article.type == "income":
-            row["type_display"] = '<span class="text-success">Приход</span>'
-            row["amount"] = f'<span class="text-success">{obj.amount}</span>'
-        else:
-            row["type_display"] = '<span class="text-danger">Расход</span>'
-            row["amount"] = f'<span class="text-danger">-{obj.amount}</span>'
-
-        edit_url = reverse("finance:cashbox_update", args=[obj.pk])
-        detail_url = reverse("finance:cashbox_detail", args=[obj.pk])
-
-        row["DT_RowAttr"] = {
-            "data-detail-url": detail_url,
-            "style": "cursor: pointer;",
-        }
-
-        row["actions"] = f"""
-                    <div class="btn-group btn-group-sm">
-                        <a href="{edit_url}" class="btn btn-primary"
-                         title="Редактировать" onclick="event.stopPropagation();">
-                            <i class="bi bi-pencil"></i>
-                        </a>
-                        <button class="btn btn-danger delete-cashbox-btn"
-                                data-id="{obj.pk}" title="Удалить">
-                            <i class="bi bi-trash"></i>
-                        </button>
-                    </div>
-                """
+        row["article_type"] = obj.article.type
+        row["amount"] = str(obj.amount)
         return row
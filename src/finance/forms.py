@@ -360,7 +360,7 @@ class ReceiptForm(forms.ModelForm):
                     and old_personal_account != new_personal_account
                 ):
                     old_personal_account.status = "inactive"
-                    old_personal_account.save()
+                    old_personal_account.save(update_fields=["status"])
 
             if commit:
                 receipt.save()
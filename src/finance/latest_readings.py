@@ -0,0 +1,39 @@
+"""src/finance/latest_readings.py."""
+
+from django.db import transaction
+from django.db.models import OuterRef
+from django.db.models import Subquery
+
+from .models import Counter
+from .models import CounterReading
+
+REBUILD_BATCH_SIZE = 5000
+
+
+def refresh_latest_readings(counters):
+    """Store the newest reading of every counter of the ``counters`` queryset.
+
+    Runs a single UPDATE, the readings of each counter are looked up by the
+    ``(counter, -date, -id)`` index. Counters without readings are cleared.
+    Return the number of updated counters.
+    """
+    latest = CounterReading.objects.filter(counter=OuterRef("pk")).order_by(
+        "-date", "-id"
+    )
+    return counters.update(
+        latest_reading_id=Subquery(latest.values("pk")[:1]),
+        latest_reading_date=Subquery(latest.values("date")[:1]),
+        latest_reading_value=Subquery(latest.values("value")[:1]),
+    )
+
+
+def rebuild_latest_readings(batch_size=REBUILD_BATCH_SIZE):
+    """Recompute the latest reading of all counters, return their number."""
+    counter_ids = list(Counter.objects.order_by("pk").values_list("pk", flat=True))
+    with transaction.atomic():
+        for start in range(0, len(counter_ids), batch_size):
+            batch = counter_ids[start : start + batch_size]
+            refresh_latest_readings(
+                Counter.objects.filter(pk__gte=batch[0], pk__lte=batch[-1])
+            )
+    return len(counter_ids)
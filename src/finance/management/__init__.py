@@ -0,0 +1 @@
+"""src/finance/management/__init__.py."""
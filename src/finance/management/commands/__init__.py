@@ -0,0 +1 @@
+"""src/finance/management/commands/__init__.py."""
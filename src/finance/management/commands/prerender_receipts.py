@@ -0,0 +1,48 @@
+"""src/finance/management/commands/prerender_receipts.py."""
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from src.finance.models import Receipt
+from src.finance.tasks import prerender_receipt_task
+
+
+class Command(BaseCommand):
+    """Backfill the pre-rendered PDFs of posted receipts."""
+
+    help = (
+        "Queue the pre-rendering of the PDF and print HTML of posted receipts "
+        "on the bulk Celery queue. Receipts already rendered for their current "
+        "data are skipped by the task. Use --sync to render in this process."
+    )
+
+    def add_arguments(self, parser):
+        """Add command arguments."""
+        parser.add_argument(
+            "--sync",
+            action="store_true",
+            help="Render in this process instead of queueing Celery tasks.",
+        )
+        parser.add_argument(
+            "--limit", type=int, help="Only the most recent N posted receipts."
+        )
+
+    def handle(self, *args, **options):
+        """Handle the command."""
+        receipt_ids = Receipt.objects.filter(is_posted=True).order_by("-pk")
+        receipt_ids = receipt_ids.values_list("pk", flat=True)
+        if options["limit"]:
+            receipt_ids = receipt_ids[: options["limit"]]
+
+        count = 0
+        for receipt_id in receipt_ids.iterator():
+            if options["sync"]:
+                prerender_receipt_task(receipt_id)
+            else:
+                prerender_receipt_task.apply_async(
+                    (receipt_id,), queue=settings.CELERY_BULK_QUEUE
+                )
+            count += 1
+
+        action = "Rendered" if options["sync"] else "Queued"
+        self.stdout.write(self.style.SUCCESS(f"{action} {count} posted receipts."))
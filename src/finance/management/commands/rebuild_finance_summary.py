@@ -0,0 +1,43 @@
+"""src/finance/management/commands/rebuild_finance_summary.py."""
+
+from django.core.management.base import BaseCommand
+from django.core.management.base import CommandError
+
+from src.finance.summary import rebuild_summary
+from src.finance.summary import verify_summary
+
+
+class Command(BaseCommand):
+    """Rebuild or verify the dashboard finance summary."""
+
+    help = (
+        "Recalculate the FinanceSummary row from the raw tables. "
+        "With --check only compare the stored totals and report mismatches."
+    )
+
+    def add_arguments(self, parser):
+        """Add command arguments."""
+        parser.add_argument(
+            "--check",
+            action="store_true",
+            help="Do not rebuild, exit with an error if the totals have drifted.",
+        )
+
+    def handle(self, *args, **options):
+        """Handle the command."""
+        mismatches = verify_summary()
+
+        for field, (stored, actual) in mismatches.items():
+            self.stdout.write(f"{field}: stored={stored} actual={actual}")
+
+        if options["check"]:
+            if mismatches:
+                msg = f"Finance summary has drifted in {len(mismatches)} field(s)."
+                raise CommandError(msg)
+            self.stdout.write(self.style.SUCCESS("Finance summary is up to date."))
+            return
+
+        summary = rebuild_summary()
+        self.stdout.write(
+            self.style.SUCCESS(f"Finance summary rebuilt at {summary.rebuilt_at}.")
+        )
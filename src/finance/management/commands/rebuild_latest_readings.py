@@ -0,0 +1,32 @@
+"""src/finance/management/commands/rebuild_latest_readings.py."""
+
+from django.core.management.base import BaseCommand
+
+from src.finance.latest_readings import REBUILD_BATCH_SIZE
+from src.finance.latest_readings import rebuild_latest_readings
+
+
+class Command(BaseCommand):
+    """Backfill the latest reading stored on every counter."""
+
+    help = (
+        "Recalculate the latest reading shown by the counters list. Run it "
+        "once after deploying the latest reading fields and whenever readings "
+        "were changed without model signals (bulk updates, raw SQL)."
+    )
+
+    def add_arguments(self, parser):
+        """Add command arguments."""
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=REBUILD_BATCH_SIZE,
+            help="Number of counters recalculated per query.",
+        )
+
+    def handle(self, *args, **options):
+        """Handle the command."""
+        count = rebuild_latest_readings(batch_size=options["batch_size"])
+        self.stdout.write(
+            self.style.SUCCESS(f"Latest readings rebuilt: {count} counters.")
+        )
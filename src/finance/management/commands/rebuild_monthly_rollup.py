@@ -0,0 +1,29 @@
+"""src/finance/management/commands/rebuild_monthly_rollup.py."""
+
+from django.core.management.base import BaseCommand
+
+from src.finance.rollup import rebuild_rollup
+
+
+class Command(BaseCommand):
+    """Backfill the monthly rollup from posted receipts and cashbox operations."""
+
+    help = (
+        "Recalculate the MonthlyRollup table from posted receipts and cashbox "
+        "operations. Run it once after deploying the rollup and whenever data "
+        "was changed without model signals (bulk updates, raw SQL)."
+    )
+
+    def add_arguments(self, parser):
+        """Add command arguments."""
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=1000,
+            help="Number of rollup rows inserted per query.",
+        )
+
+    def handle(self, *args, **options):
+        """Handle the command."""
+        count = rebuild_rollup(batch_size=options["batch_size"])
+        self.stdout.write(self.style.SUCCESS(f"Monthly rollup rebuilt: {count} rows."))
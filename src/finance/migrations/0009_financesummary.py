@@ -0,0 +1,34 @@
+# Generated by Django 5.2.7 on 2026-10-18 11:02
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('finance', '0008_alter_cashbox_number'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='FinanceSummary',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('houses_count', models.IntegerField(default=0, verbose_name='Домов')),
+                ('apartments_count', models.IntegerField(default=0, verbose_name='Квартир')),
+                ('personal_accounts_count', models.IntegerField(default=0, verbose_name='Лицевых счетов')),
+                ('active_owners_count', models.IntegerField(default=0, verbose_name='Активных владельцев')),
+                ('tickets_new_count', models.IntegerField(default=0, verbose_name='Новых заявок')),
+                ('tickets_in_progress_count', models.IntegerField(default=0, verbose_name='Заявок в работе')),
+                ('total_balance', models.DecimalField(decimal_places=2, default=0, max_digits=14, verbose_name='Баланс по счетам')),
+                ('total_debt', models.DecimalField(decimal_places=2, default=0, max_digits=14, verbose_name='Задолженность по счетам')),
+                ('cashbox_income', models.DecimalField(decimal_places=2, default=0, max_digits=14, verbose_name='Приход по кассе')),
+                ('cashbox_expense', models.DecimalField(decimal_places=2, default=0, max_digits=14, verbose_name='Расход по кассе')),
+                ('rebuilt_at', models.DateTimeField(blank=True, null=True, verbose_name='Пересчитано')),
+            ],
+            options={
+                'verbose_name': 'Сводка по финансам',
+                'verbose_name_plural': 'Сводка по финансам',
+            },
+        ),
+    ]
@@ -0,0 +1,34 @@
+# Generated by Django 5.2.7 on 2026-10-18 11:08
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('building', '0002_initial'),
+        ('finance', '0009_financesummary'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MonthlyRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('month', models.DateField(verbose_name='Месяц')),
+                ('kind', models.CharField(choices=[('receipt', 'Начислено по квитанциям'), ('income', 'Приход'), ('expense', 'Расход')], max_length=10, verbose_name='Вид')),
+                ('amount', models.DecimalField(decimal_places=2, default=0, max_digits=14, verbose_name='Сумма')),
+                ('apartment', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='+', to='building.apartment', verbose_name='Квартира')),
+                ('article', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='+', to='finance.article', verbose_name='Статья')),
+                ('house', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='+', to='building.house', verbose_name='Дом')),
+                ('service', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='+', to='finance.service', verbose_name='Услуга')),
+            ],
+            options={
+                'verbose_name': 'Помесячный итог',
+                'verbose_name_plural': 'Помесячные итоги',
+                'indexes': [models.Index(fields=['apartment', 'month'], name='finance_mon_apartme_ec56e2_idx')],
+                'constraints': [models.UniqueConstraint(fields=('month', 'kind', 'house', 'apartment', 'article', 'service'), name='finance_monthly_rollup_bucket', nulls_distinct=False)],
+            },
+        ),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 5.2.7 on 2026-10-18 11:37
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('building', '0002_initial'),
+        ('finance', '0011_receiptmailing_receiptmailingfailure'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='cashbox',
+            index=models.Index(fields=['-date', '-id'], name='finance_cas_date_a23071_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='counterreading',
+            index=models.Index(fields=['-date', '-id'], name='finance_cou_date_190264_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='receipt',
+            index=models.Index(fields=['-date', '-id'], name='finance_rec_date_933de0_idx'),
+        ),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 5.2.7 on 2026-10-18 11:43
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('building', '0002_initial'),
+        ('finance', '0012_datatable_keyset_indexes'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='cashbox',
+            index=models.Index(fields=['is_posted', '-date', '-id'], name='finance_cas_is_post_92f130_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='counterreading',
+            index=models.Index(fields=['counter', '-date', '-id'], name='finance_cou_counter_6c53ef_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='receipt',
+            index=models.Index(fields=['apartment', '-date', '-id'], name='finance_rec_apartme_5421ac_idx'),
+        ),
+    ]
@@ -0,0 +1,32 @@
+# Generated by Django 5.2.7 on 2026-10-18 11:43
+
+import django.contrib.postgres.indexes
+import django.db.models.functions.text
+from django.contrib.postgres.operations import TrigramExtension
+from django.conf import settings
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('building', '0003_number_trigram_indexes'),
+        ('finance', '0013_datatable_filter_indexes'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        TrigramExtension(),
+        migrations.AddIndex(
+            model_name='cashbox',
+            index=django.contrib.postgres.indexes.GinIndex(django.contrib.postgres.indexes.OpClass(django.db.models.functions.text.Upper('number'), name='gin_trgm_ops'), name='finance_cashbox_number_trgm'),
+        ),
+        migrations.AddIndex(
+            model_name='counterreading',
+            index=django.contrib.postgres.indexes.GinIndex(django.contrib.postgres.indexes.OpClass(django.db.models.functions.text.Upper('number'), name='gin_trgm_ops'), name='finance_reading_number_trgm'),
+        ),
+        migrations.AddIndex(
+            model_name='receipt',
+            index=django.contrib.postgres.indexes.GinIndex(django.contrib.postgres.indexes.OpClass(django.db.models.functions.text.Upper('number'), name='gin_trgm_ops'), name='finance_receipt_number_trgm'),
+        ),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 5.2.7 on 2026-10-18 12:03
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('finance', '0014_number_trigram_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='counter',
+            name='latest_reading_date',
+            field=models.DateField(blank=True, editable=False, null=True, verbose_name='Дата текущих показаний'),
+        ),
+        migrations.AddField(
+            model_name='counter',
+            name='latest_reading_id',
+            field=models.BigIntegerField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='counter',
+            name='latest_reading_value',
+            field=models.DecimalField(blank=True, decimal_places=3, editable=False, max_digits=12, null=True, verbose_name='Текущие показания'),
+        ),
+    ]
@@ -1,7 +1,10 @@
 """src/finance/models.py."""
 
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.indexes import OpClass
 from django.core.validators import FileExtensionValidator
 from django.db import models
+from django.db.models.functions import Upper
 from django.utils import timezone
 
 
@@ -122,6 +125,21 @@ class Counter(models.Model):
         Service, on_delete=models.PROTECT, verbose_name="Услуга"
     )
     is_active = models.BooleanField(default=True, verbose_name="Активен")
+    # Newest reading by (date, id), kept up to date by the reading signals
+    # (see src/finance/latest_readings.py) so the counters list needs no
+    # subquery over the readings.
+    latest_reading_id = models.BigIntegerField(null=True, blank=True, editable=False)
+    latest_reading_date = models.DateField(
+        null=True, blank=True, editable=False, verbose_name="Дата текущих показаний"
+    )
+    latest_reading_value = models.DecimalField(
+        max_digits=12,
+        decimal_places=3,
+        null=True,
+        blank=True,
+        editable=False,
+        verbose_name="Текущие показания",
+    )
 
     class Meta:
         """Meta class."""
@@ -172,6 +190,17 @@ class CounterReading(models.Model):
         verbose_name = "Показание счетчика"
         verbose_name_plural = "Показания счетчиков"
         ordering = ["-date", "-id"]
+        indexes = [
+            # Keyset pagination of the datatables, see KeysetPaginationMixin.
+            models.Index(fields=["-date", "-id"]),
+            # Readings of a counter, newest first (latest reading lookups).
+            models.Index(fields=["counter", "-date", "-id"]),
+            # number__icontains, run by PostgreSQL as UPPER(number) LIKE '%...%'.
+            GinIndex(
+                OpClass(Upper("number"), name="gin_trgm_ops"),
+                name="finance_reading_number_trgm",
+            ),
+        ]
 
     def __str__(self):
         """Return string representation of the counter reading."""
@@ -242,6 +271,17 @@ class Receipt(models.Model):
         verbose_name = "Квитанция"
         verbose_name_plural = "Квитанции"
         ordering = ["-date", "-pk"]
+        indexes = [
+            # Keyset pagination of the datatables, see KeysetPaginationMixin.
+            models.Index(fields=["-date", "-id"]),
+            # Receipts of an apartment or owner, newest first.
+            models.Index(fields=["apartment", "-date", "-id"]),
+            # number__icontains, run by PostgreSQL as UPPER(number) LIKE '%...%'.
+            GinIndex(
+                OpClass(Upper("number"), name="gin_trgm_ops"),
+                name="finance_receipt_number_trgm",
+            ),
+        ]
 
     def __str__(self):
         """Return string representation of the receipt."""
@@ -356,6 +396,17 @@ class CashBox(models.Model):
         verbose_name = "Кассовая операция"
         verbose_name_plural = "Кассовые операции"
         ordering = ["-date", "-id"]
+        indexes = [
+            # Keyset pagination of the datatables, see KeysetPaginationMixin.
+            models.Index(fields=["-date", "-id"]),
+            # Posted / draft filter of the datatable and the cash totals.
+            models.Index(fields=["is_posted", "-date", "-id"]),
+            # number__icontains, run by PostgreSQL as UPPER(number) LIKE '%...%'.
+            GinIndex(
+                OpClass(Upper("number"), name="gin_trgm_ops"),
+                name="finance_cashbox_number_trgm",
+            ),
+        ]
 
     def __str__(self):
         """Str."""
@@ -384,6 +435,134 @@ class PaymentDetails(models.Model):
         return self.company_name
 
 
+class FinanceSummary(models.Model):
+    """A singleton row with the dashboard totals.
+
+    The row is kept up to date incrementally by the handlers in
+    ``src/finance/signals.py`` and can be rebuilt from the raw tables with
+    the ``rebuild_finance_summary`` management command.
+    """
+
+    houses_count = models.IntegerField(default=0, verbose_name="Домов")
+    apartments_count = models.IntegerField(default=0, verbose_name="Квартир")
+    personal_accounts_count = models.IntegerField(
+        default=0, verbose_name="Лицевых счетов"
+    )
+    active_owners_count = models.IntegerField(
+        default=0, verbose_name="Активных владельцев"
+    )
+    tickets_new_count = models.IntegerField(default=0, verbose_name="Новых заявок")
+    tickets_in_progress_count = models.IntegerField(
+        default=0, verbose_name="Заявок в работе"
+    )
+    total_balance = models.DecimalField(
+        max_digits=14, decimal_places=2, default=0, verbose_name="Баланс по счетам"
+    )
+    total_debt = models.DecimalField(
+        max_digits=14,
+        decimal_places=2,
+        default=0,
+        verbose_name="Задолженность по счетам",
+    )
+    cashbox_income = models.DecimalField(
+        max_digits=14, decimal_places=2, default=0, verbose_name="Приход по кассе"
+    )
+    cashbox_expense = models.DecimalField(
+        max_digits=14, decimal_places=2, default=0, verbose_name="Расход по кассе"
+    )
+    rebuilt_at = models.DateTimeField(null=True, blank=True, verbose_name="Пересчитано")
+
+    class Meta:
+        """Meta class."""
+
+        verbose_name = "Сводка по финансам"
+        verbose_name_plural = "Сводка по финансам"
+
+    def __str__(self):
+        """Return string representation of the summary."""
+        return f"Сводка на {self.rebuilt_at or '—'}"
+
+    @property
+    def cashbox_balance(self):
+        """Return the cashbox state (posted income minus posted expense)."""
+        return self.cashbox_income - self.cashbox_expense
+
+
+class MonthlyRollup(models.Model):
+    """Posted receipt and cashbox amounts pre-aggregated by month.
+
+    Detail rows are keyed by house, apartment and article (cashbox) or
+    service (receipts). Rows without article and service hold the month
+    total of their kind. Kept up to date by ``src/finance/signals.py`` and
+    rebuilt with the ``rebuild_monthly_rollup`` management command.
+    """
+
+    class Kind(models.TextChoices):
+        """Rollup kind."""
+
+        RECEIPT = "receipt", "Начислено по квитанциям"
+        INCOME = "income", "Приход"
+        EXPENSE = "expense", "Расход"
+
+    month = models.DateField(verbose_name="Месяц")
+    kind = models.CharField(max_length=10, choices=Kind.choices, verbose_name="Вид")
+    house = models.ForeignKey(
+        "building.House",
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+        related_name="+",
+        verbose_name="Дом",
+    )
+    apartment = models.ForeignKey(
+        "building.Apartment",
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+        related_name="+",
+        verbose_name="Квартира",
+    )
+    article = models.ForeignKey(
+        Article,
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+        related_name="+",
+        verbose_name="Статья",
+    )
+    service = models.ForeignKey(
+        Service,
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+        related_name="+",
+        verbose_name="Услуга",
+    )
+    amount = models.DecimalField(
+        max_digits=14, decimal_places=2, default=0, verbose_name="Сумма"
+    )
+
+    class Meta:
+        """Meta class."""
+
+        verbose_name = "Помесячный итог"
+        verbose_name_plural = "Помесячные итоги"
+        constraints = [
+            models.UniqueConstraint(
+                fields=["month", "kind", "house", "apartment", "article", "service"],
+                name="finance_monthly_rollup_bucket",
+                nulls_distinct=False,
+            ),
+        ]
+        indexes = [
+            models.Index(fields=["apartment", "month"]),
+        ]
+
+    def __str__(self):
+        """Return string representation of the rollup row."""
+        return f"{self.get_kind_display()} за {self.month:%m.%Y}: {self.amount}"
+
+
 class PrintTemplate(models.Model):
     """Model for storing templates of printed receipt forms."""
 
@@ -412,3 +591,90 @@ class PrintTemplate(models.Model):
                 is_default=False
             )
         super().save(*args, **kwargs)
+
+
+class ReceiptMailing(models.Model):
+    """A batch of receipts sent to the owners by email.
+
+    The receipts are split into chunks, each chunk is sent by one
+    ``send_receipt_batch_task`` over a single SMTP connection.
+    """
+
+    class MailingStatus(models.TextChoices):
+        """Mailing status."""
+
+        PENDING = "pending", "В очереди"  # noqa: RUF001
+        RUNNING = "running", "Отправляется"
+        DONE = "done", "Завершена"
+
+    created_by = models.ForeignKey(
+        "users.User",
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name="+",
+        verbose_name="Создал",
+    )
+    template = models.ForeignKey(
+        PrintTemplate,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        verbose_name="Шаблон",
+    )
+    filters = models.JSONField(default=dict, blank=True, verbose_name="Отбор")
+    status = models.CharField(
+        max_length=20,
+        choices=MailingStatus.choices,
+        default=MailingStatus.PENDING,
+        verbose_name="Статус",
+    )
+    total = models.PositiveIntegerField(default=0, verbose_name="Квитанций")
+    sent = models.PositiveIntegerField(default=0, verbose_name="Отправлено")
+    failed = models.PositiveIntegerField(default=0, verbose_name="С ошибкой")  # noqa: RUF001
+    created_at = models.DateTimeField(auto_now_add=True, verbose_name="Создана")
+    finished_at = models.DateTimeField(null=True, blank=True, verbose_name="Завершена")
+
+    class Meta:
+        """Meta class."""
+
+        verbose_name = "Рассылка квитанций"
+        verbose_name_plural = "Рассылки квитанций"
+        ordering = ["-created_at"]
+
+    def __str__(self):
+        """Return string representation of the mailing."""
+        return f"Рассылка #{self.pk} ({self.get_status_display()})"
+
+    @property
+    def progress(self):
+        """Return the processed share of receipts in percent."""
+        if not self.total:
+            return 100 if self.status == self.MailingStatus.DONE else 0
+        return (self.sent + self.failed) * 100 // self.total
+
+
+class ReceiptMailingFailure(models.Model):
+    """A receipt of a mailing that could not be sent."""
+
+    mailing = models.ForeignKey(
+        ReceiptMailing,
+        on_delete=models.CASCADE,
+        related_name="failures",
+        verbose_name="Рассылка",
+    )
+    receipt = models.ForeignKey(
+        Receipt, on_delete=models.CASCADE, related_name="+", verbose_name="Квитанция"
+    )
+    error = models.TextField(verbose_name="Ошибка")
+    created_at = models.DateTimeField(auto_now_add=True, verbose_name="Создана")
+
+    class Meta:
+        """Meta class."""
+
+        verbose_name = "Ошибка рассылки"
+        verbose_name_plural = "Ошибки рассылки"
+
+    def __str__(self):
+        """Return string representation of the failure."""
+        return f"{self.receipt_id}: {self.error}"
@@ -0,0 +1,48 @@
+"""src/finance/payment_details.py."""
+
+import logging
+
+from django.core.cache import cache
+from django.db import transaction
+from redis.exceptions import RedisError
+
+from .models import PaymentDetails
+
+logger = logging.getLogger(__name__)
+
+PAYMENT_DETAILS_KEY = "finance:payment_details"
+PAYMENT_DETAILS_TIMEOUT = 60 * 60 * 24
+
+
+def get_payment_details():
+    """Return the company payment details, or ``None`` if they are not set.
+
+    The row is cached for all processes until it is saved or deleted.
+    Falls back to the database if Redis is unavailable.
+    """
+    try:
+        details = cache.get(PAYMENT_DETAILS_KEY)
+    except RedisError:
+        logger.warning("Cache is unavailable, loading payment details directly.")
+        return PaymentDetails.objects.filter(pk=1).first()
+
+    if details is None:
+        # False caches the absence of the row as well.
+        details = PaymentDetails.objects.filter(pk=1).first() or False
+        try:
+            cache.set(PAYMENT_DETAILS_KEY, details, PAYMENT_DETAILS_TIMEOUT)
+        except RedisError:
+            logger.warning("Could not store payment details in the cache.")
+    return details or None
+
+
+def _delete_cached():
+    try:
+        cache.delete(PAYMENT_DETAILS_KEY)
+    except RedisError:
+        logger.exception("Could not invalidate cached payment details.")
+
+
+def invalidate_payment_details():
+    """Drop the cached payment details once the current transaction commits."""
+    transaction.on_commit(_delete_cached)
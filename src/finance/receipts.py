@@ -0,0 +1,171 @@
+"""src/finance/receipts.py."""
+
+import hashlib
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db.models import Prefetch
+
+from src.core.pdf import render_pdf
+from src.core.pdf import write_pdf
+from src.core.utils import ReceiptExcelGenerator
+
+from .models import PrintTemplate
+from .models import Receipt
+from .models import ReceiptItem
+
+# CSS для PDF
+RECEIPT_PDF_CSS = """
+        <style>
+            @page { size: 250mm 300mm; margin: 0; }
+            body {
+                margin: 10mm;
+                padding: 0;
+                overflow: hidden;
+                background-color: white;
+                font-family: sans-serif;
+            }
+            table { border-collapse: collapse; border-spacing: 0; width: 100%; }
+            tr[height="0"], tr[style*="height:0"], tr[style*="height: 0"] {
+                display: none !important;
+            }
+        </style>
+        """
+
+# Storage directories of the rendered receipts, one subdirectory per receipt.
+RECEIPT_PDF_DIR = "receipts/pdf"
+RECEIPT_HTML_DIR = "receipts/html"
+
+# Relations a print template reads from a receipt.
+RECEIPT_RENDER_RELATED = (
+    "apartment__owner",
+    "apartment__house",
+    "apartment__section",
+    "apartment__personal_account",
+    "tariff",
+)
+
+
+def receipts_for_rendering(queryset=None):
+    """Return receipts with everything a print template needs.
+
+    Any number of receipts is loaded in two queries: the receipts with their
+    apartment, owner, house, section, account and tariff, and their items
+    with services and units. The payment details come from the cache.
+    """
+    if queryset is None:
+        queryset = Receipt.objects.all()
+    return queryset.select_related(*RECEIPT_RENDER_RELATED).prefetch_related(
+        Prefetch(
+            "receiptitem_set",
+            queryset=ReceiptItem.objects.select_related("service__unit"),
+            to_attr="render_items",
+        )
+    )
+
+
+def get_print_template(template_id=None):
+    """Return the requested print template, or the default one."""
+    if template_id:
+        return PrintTemplate.objects.get(pk=template_id)
+    template = PrintTemplate.objects.filter(is_default=True).first()
+    return template or PrintTemplate.objects.first()
+
+
+def receipt_pdf_key(generator):
+    """Return the cache key of the PDF a receipt generator renders."""
+    return hashlib.sha256(
+        (generator.content_key() + RECEIPT_PDF_CSS).encode()
+    ).hexdigest()
+
+
+def get_receipt_html(receipt, template, payment_details=None):
+    """Return the storage name of the receipt HTML, rendering it if needed."""
+    return _store_receipt_html(
+        ReceiptExcelGenerator(receipt, template.template_file.path, payment_details)
+    )
+
+
+def get_receipt_pdf(receipt, template, payment_details=None, timeout=None):
+    """Return the storage name of the receipt PDF, rendering it if needed.
+
+    PDFs are stored under a hash of the receipt data, the template file and
+    the payment details. A receipt whose inputs have not changed is served
+    from storage, any change renders a new PDF and removes the stale one.
+    The HTML the PDF is made from is stored alongside it for printing.
+
+    With a ``timeout`` WeasyPrint runs in the render process pool, which
+    keeps web workers responsive, see ``src.core.pdf.render_pdf``.
+    """
+    return _store_receipt_pdf(
+        ReceiptExcelGenerator(receipt, template.template_file.path, payment_details),
+        timeout,
+    )
+
+
+def read_receipt_file(name):
+    """Return the contents of a stored receipt file."""
+    with default_storage.open(name) as receipt_file:
+        return receipt_file.read()
+
+
+def render_receipt_pdf(receipt, template, payment_details=None):
+    """Return the receipt PDF as bytes."""
+    return read_receipt_file(get_receipt_pdf(receipt, template, payment_details))
+
+
+def _store_receipt_html(generator):
+    directory = f"{RECEIPT_HTML_DIR}/{generator.receipt.pk}"
+    return _store(
+        directory,
+        f"{directory}/{generator.content_key()}.html",
+        lambda: generator.generate_html().encode(),
+    )
+
+
+def _store_receipt_pdf(generator, timeout=None):
+    def render():
+        html = (
+            RECEIPT_PDF_CSS + read_receipt_file(_store_receipt_html(generator)).decode()
+        )
+        base_url = getattr(settings, "SITE_URL", "http://localhost:8000")
+        if timeout is None:
+            return write_pdf(html, base_url)
+        # A render that outlives the timeout still stores its PDF.
+        return render_pdf(
+            html,
+            base_url,
+            timeout,
+            on_late_result=lambda content: _save(directory, name, content),
+        )
+
+    directory = f"{RECEIPT_PDF_DIR}/{generator.receipt.pk}"
+    name = f"{directory}/{receipt_pdf_key(generator)}.pdf"
+    return _store(directory, name, render)
+
+
+def _store(directory, name, render):
+    """Return ``name``, storing ``render()`` under it unless it exists."""
+    if default_storage.exists(name):
+        return name
+    _save(directory, name, render())
+    return name
+
+
+def _save(directory, name, content):
+    """Store ``content`` under ``name``, replacing the other files of ``directory``."""
+    _delete_stale_files(directory)
+    saved_name = default_storage.save(name, ContentFile(content))
+    if saved_name != name:
+        # Another worker stored the same file in the meantime.
+        default_storage.delete(saved_name)
+
+
+def _delete_stale_files(directory):
+    try:
+        _directories, files = default_storage.listdir(directory)
+    except FileNotFoundError:
+        return
+    for file_name in files:
+        default_storage.delete(f"{directory}/{file_name}")
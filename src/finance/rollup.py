@@ -0,0 +1,229 @@
+"""src/finance/rollup.py."""
+
+import datetime
+import logging
+from collections import defaultdict
+
+from django.db import IntegrityError
+from django.db import transaction
+from django.db.models import F
+from django.db.models import Sum
+from django.db.models.functions import TruncMonth
+from django.utils import timezone
+
+from src.building.models import Apartment
+
+from .models import CashBox
+from .models import MonthlyRollup
+from .models import ReceiptItem
+
+logger = logging.getLogger(__name__)
+
+
+def month_start(date):
+    """Return the first day of the month of ``date``."""
+    if isinstance(date, datetime.datetime):
+        date = timezone.localdate(date)
+    return date.replace(day=1)
+
+
+def personal_account_location(personal_account_id):
+    """Return ``(apartment_id, house_id)`` of the apartment of an account."""
+    if personal_account_id is None:
+        return None, None
+    location = (
+        Apartment.objects.filter(personal_account_id=personal_account_id)
+        .values_list("pk", "house_id")
+        .first()
+    )
+    return location or (None, None)
+
+
+def _add_to_bucket(amount, **bucket):
+    updated = MonthlyRollup.objects.filter(**bucket).update(amount=F("amount") + amount)
+    if updated:
+        return
+    try:
+        with transaction.atomic():
+            MonthlyRollup.objects.create(amount=amount, **bucket)
+    except IntegrityError:
+        # A concurrent transaction created the bucket first.
+        MonthlyRollup.objects.filter(**bucket).update(amount=F("amount") + amount)
+
+
+def apply_rollup_delta(  # noqa: PLR0913
+    month,
+    kind,
+    amount,
+    house_id=None,
+    apartment_id=None,
+    article_id=None,
+    service_id=None,
+):
+    """Add ``amount`` to a detail bucket and to the month total of its kind."""
+    if not amount:
+        return
+    month = month_start(month)
+    _add_to_bucket(
+        amount,
+        month=month,
+        kind=kind,
+        house_id=house_id,
+        apartment_id=apartment_id,
+        article_id=article_id,
+        service_id=service_id,
+    )
+    _add_to_bucket(
+        amount,
+        month=month,
+        kind=kind,
+        house_id=None,
+        apartment_id=None,
+        article_id=None,
+        service_id=None,
+    )
+
+
+def apply_receipt_items(receipt_id, month, apartment_id, house_id, sign):
+    """Add (``sign=1``) or remove (``sign=-1``) all items of a posted receipt."""
+    items = (
+        ReceiptItem.objects.filter(receipt_id=receipt_id)
+        .values("service_id")
+        .annotate(total=Sum("amount"))
+        .order_by()
+    )
+    for item in items:
+        apply_rollup_delta(
+            month,
+            MonthlyRollup.Kind.RECEIPT,
+            sign * (item["total"] or 0),
+            house_id=house_id,
+            apartment_id=apartment_id,
+            service_id=item["service_id"],
+        )
+
+
+def move_apartment_rows(apartment_id, house_id):
+    """File the rows of an apartment under the house it was moved to."""
+    MonthlyRollup.objects.filter(apartment_id=apartment_id).exclude(
+        house_id=house_id
+    ).update(house_id=house_id)
+
+
+def move_personal_account_rows(personal_account_id, old_location, new_location):
+    """Move the posted operations of an account to another apartment.
+
+    Locations are ``(apartment_id, house_id)`` pairs, ``(None, None)`` for an
+    account without apartment. ``old_location=None`` means the old rows are
+    already gone (deleted together with the apartment). Month totals do not
+    change.
+    """
+    if personal_account_id is None or old_location == new_location:
+        return
+    operations = (
+        CashBox.objects.filter(personal_account_id=personal_account_id, is_posted=True)
+        .annotate(month=TruncMonth("date"))
+        .values("month", "article_id", "article__type")
+        .annotate(total=Sum("amount"))
+        .order_by()
+    )
+    for row in operations:
+        bucket = {
+            "month": month_start(row["month"]),
+            "kind": row["article__type"],
+            "article_id": row["article_id"],
+            "service_id": None,
+        }
+        if old_location is not None:
+            apartment_id, house_id = old_location
+            _add_to_bucket(
+                -row["total"], apartment_id=apartment_id, house_id=house_id, **bucket
+            )
+        apartment_id, house_id = new_location
+        _add_to_bucket(
+            row["total"], apartment_id=apartment_id, house_id=house_id, **bucket
+        )
+
+
+def _collect_rows():
+    buckets = defaultdict(int)
+
+    receipt_items = (
+        ReceiptItem.objects.filter(receipt__is_posted=True)
+        .annotate(month=TruncMonth("receipt__date"))
+        .values(
+            "month",
+            "receipt__apartment_id",
+            "receipt__apartment__house_id",
+            "service_id",
+        )
+        .annotate(total=Sum("amount"))
+        .order_by()
+    )
+    for row in receipt_items:
+        detail = (
+            row["month"],
+            MonthlyRollup.Kind.RECEIPT,
+            row["receipt__apartment__house_id"],
+            row["receipt__apartment_id"],
+            None,
+            row["service_id"],
+        )
+        buckets[detail] += row["total"]
+
+    operations = (
+        CashBox.objects.filter(is_posted=True)
+        .annotate(month=TruncMonth("date"))
+        .values(
+            "month",
+            "article_id",
+            "article__type",
+            "personal_account__apartment",
+            "personal_account__apartment__house_id",
+        )
+        .annotate(total=Sum("amount"))
+        .order_by()
+    )
+    for row in operations:
+        detail = (
+            row["month"],
+            row["article__type"],
+            row["personal_account__apartment__house_id"],
+            row["personal_account__apartment"],
+            row["article_id"],
+            None,
+        )
+        buckets[detail] += row["total"]
+
+    for (month, kind, *_dimensions), total in list(buckets.items()):
+        buckets[(month, kind, None, None, None, None)] += total
+
+    return [
+        MonthlyRollup(
+            month=month,
+            kind=kind,
+            house_id=house_id,
+            apartment_id=apartment_id,
+            article_id=article_id,
+            service_id=service_id,
+            amount=total,
+        )
+        for (
+            month,
+            kind,
+            house_id,
+            apartment_id,
+            article_id,
+            service_id,
+        ), total in buckets.items()
+    ]
+
+
+def rebuild_rollup(batch_size=1000):
+    """Recalculate the whole rollup table from the raw tables."""
+    with transaction.atomic():
+        rows = _collect_rows()
+        MonthlyRollup.objects.all().delete()
+        MonthlyRollup.objects.bulk_create(rows, batch_size=batch_size)
+    logger.info("Monthly rollup rebuilt with %s rows.", len(rows))
+    return len(rows)
@@ -1,5 +1,6 @@
 """src/finance/schemas.py."""
 
+from datetime import date
 from datetime import datetime
 
 from ninja import Schema
@@ -81,3 +82,39 @@ class DeleteItemsSchema(Schema):
     """Схема для приема списка ID для удаления."""
 
     ids: list[int]
+
+
+class ReceiptMailingCreateSchema(Schema):
+    """Отбор квитанций для рассылки.
+
+    Either explicit receipt ``ids`` or a house, section and period filter.
+    """
+
+    template_id: int | None = None
+    ids: list[int] = []
+    house_id: int | None = None
+    section_id: int | None = None
+    period_start: date | None = None
+    period_end: date | None = None
+
+
+class ReceiptMailingFailureSchema(Schema):
+    """Квитанция, которую не удалось отправить."""
+
+    receipt_id: int
+    receipt_number: str
+    error: str
+
+
+class ReceiptMailingSchema(Schema):
+    """Ход рассылки квитанций."""
+
+    id: int
+    status: str
+    total: int
+    sent: int
+    failed: int
+    progress: int
+    created_at: datetime
+    finished_at: datetime | None
+    failures: list[ReceiptMailingFailureSchema]
@@ -0,0 +1,468 @@
+"""src/finance/signals.py."""
+
+from decimal import Decimal
+
+from django.db.models.signals import post_delete
+from django.db.models.signals import post_save
+from django.db.models.signals import pre_save
+from django.dispatch import receiver
+
+from src.building.models import Apartment
+from src.building.models import House
+from src.building.models import PersonalAccount
+from src.building.signals import previous_apartment_state
+from src.users.models import Ticket
+from src.users.models import User
+
+from .latest_readings import refresh_latest_readings
+from .models import Article
+from .models import CashBox
+from .models import Counter
+from .models import CounterReading
+from .models import MonthlyRollup
+from .models import PaymentDetails
+from .models import Receipt
+from .models import ReceiptItem
+from .payment_details import invalidate_payment_details
+from .rollup import apply_receipt_items
+from .rollup import apply_rollup_delta
+from .rollup import month_start
+from .rollup import move_apartment_rows
+from .rollup import move_personal_account_rows
+from .rollup import personal_account_location
+from .summary import apply_summary_delta
+
+PREVIOUS_STATE_ATTR = "_finance_previous_state"
+
+USER_TRACKED_FIELDS = ("user_type", "status")
+TICKET_TRACKED_FIELDS = ("status",)
+ACCOUNT_TRACKED_FIELDS = ("balance",)
+CASHBOX_TRACKED_FIELDS = (
+    "is_posted",
+    "amount",
+    "date",
+    "article",
+    "article__type",
+    "personal_account__apartment",
+    "personal_account__apartment__house",
+)
+RECEIPT_TRACKED_FIELDS = ("is_posted", "date", "apartment", "apartment__house")
+RECEIPT_ITEM_TRACKED_FIELDS = ("amount", "service")
+READING_TRACKED_FIELDS = ("counter", "date", "value")
+
+
+def _remember_previous_state(instance, fields, update_fields=None):
+    """Store the row as it is in the database before the save.
+
+    Nothing is queried for new objects or when ``update_fields`` does not
+    touch any tracked field (e.g. ``last_login`` updates on login).
+    """
+    setattr(instance, PREVIOUS_STATE_ATTR, None)
+    if instance.pk is None:
+        return
+    if update_fields is not None and not {f.split("__")[0] for f in fields} & set(
+        update_fields
+    ):
+        return
+    previous = type(instance).objects.filter(pk=instance.pk).values(*fields).first()
+    setattr(instance, PREVIOUS_STATE_ATTR, previous)
+
+
+def _previous_state(instance):
+    """Return the state stored by ``_remember_previous_state``."""
+    return getattr(instance, PREVIOUS_STATE_ATTR, None)
+
+
+def _is_active_owner(user_type, status):
+    return user_type == User.UserType.OWNER and status == User.UserStatus.ACTIVE
+
+
+def _ticket_status_deltas(status, sign):
+    return {
+        "tickets_new_count": sign if status == Ticket.TicketStatus.NEW else 0,
+        "tickets_in_progress_count": (
+            sign if status == Ticket.TicketStatus.IN_PROGRESS else 0
+        ),
+    }
+
+
+def _account_deltas(balance, sign):
+    balance = Decimal(balance or 0)
+    return {
+        "total_balance": sign * balance,
+        "total_debt": sign * min(balance, Decimal(0)),
+    }
+
+
+def _cashbox_deltas(is_posted, amount, article_type, sign):
+    amount = Decimal(amount or 0) if is_posted else Decimal(0)
+    return {
+        "cashbox_income": (
+            sign * amount if article_type == Article.ArticleType.INCOME else 0
+        ),
+        "cashbox_expense": (
+            sign * amount if article_type == Article.ArticleType.EXPENSE else 0
+        ),
+    }
+
+
+def _merge_deltas(*parts):
+    merged = {}
+    for part in parts:
+        for field, delta in part.items():
+            merged[field] = merged.get(field, 0) + delta
+    return merged
+
+
+@receiver(post_save, sender=House)
+def house_saved(sender, instance, created, **kwargs):
+    """Count a new house."""
+    if created:
+        apply_summary_delta(houses_count=1)
+
+
+@receiver(post_delete, sender=House)
+def house_deleted(sender, instance, **kwargs):
+    """Uncount a deleted house."""
+    apply_summary_delta(houses_count=-1)
+
+
+@receiver(post_save, sender=Apartment)
+def apartment_saved(sender, instance, created, **kwargs):
+    """Count a new apartment."""
+    if created:
+        apply_summary_delta(apartments_count=1)
+
+
+@receiver(post_delete, sender=Apartment)
+def apartment_deleted(sender, instance, **kwargs):
+    """Uncount a deleted apartment."""
+    apply_summary_delta(apartments_count=-1)
+
+
+@receiver(pre_save, sender=PersonalAccount)
+def personal_account_pre_save(sender, instance, update_fields=None, **kwargs):
+    """Remember the balance before it changes."""
+    _remember_previous_state(instance, ACCOUNT_TRACKED_FIELDS, update_fields)
+
+
+@receiver(post_save, sender=PersonalAccount)
+def personal_account_saved(sender, instance, created, **kwargs):
+    """Apply the balance change of a personal account to the summary."""
+    previous = _previous_state(instance)
+    if created:
+        apply_summary_delta(
+            personal_accounts_count=1, **_account_deltas(instance.balance, 1)
+        )
+    elif previous is not None:
+        apply_summary_delta(
+            **_merge_deltas(
+                _account_deltas(instance.balance, 1),
+                _account_deltas(previous["balance"], -1),
+            )
+        )
+
+
+@receiver(post_delete, sender=PersonalAccount)
+def personal_account_deleted(sender, instance, **kwargs):
+    """Remove a deleted personal account from the summary."""
+    apply_summary_delta(
+        personal_accounts_count=-1, **_account_deltas(instance.balance, -1)
+    )
+
+
+@receiver(pre_save, sender=User)
+def user_pre_save(sender, instance, update_fields=None, **kwargs):
+    """Remember the type and status of a user before they change."""
+    _remember_previous_state(instance, USER_TRACKED_FIELDS, update_fields)
+
+
+@receiver(post_save, sender=User)
+def user_saved(sender, instance, created, **kwargs):
+    """Update the active owners counter."""
+    previous = _previous_state(instance)
+    was_active = bool(previous) and _is_active_owner(
+        previous["user_type"], previous["status"]
+    )
+    if created or previous is not None:
+        is_active = _is_active_owner(instance.user_type, instance.status)
+        apply_summary_delta(active_owners_count=int(is_active) - int(was_active))
+
+
+@receiver(post_delete, sender=User)
+def user_deleted(sender, instance, **kwargs):
+    """Uncount a deleted active owner."""
+    if _is_active_owner(instance.user_type, instance.status):
+        apply_summary_delta(active_owners_count=-1)
+
+
+@receiver(pre_save, sender=Ticket)
+def ticket_pre_save(sender, instance, update_fields=None, **kwargs):
+    """Remember the ticket status before it changes."""
+    _remember_previous_state(instance, TICKET_TRACKED_FIELDS, update_fields)
+
+
+@receiver(post_save, sender=Ticket)
+def ticket_saved(sender, instance, created, **kwargs):
+    """Update the new / in progress ticket counters."""
+    previous = _previous_state(instance)
+    if not created and previous is None:
+        return
+    deltas = _ticket_status_deltas(instance.status, 1)
+    if previous is not None:
+        deltas = _merge_deltas(deltas, _ticket_status_deltas(previous["status"], -1))
+    apply_summary_delta(**deltas)
+
+
+@receiver(post_delete, sender=Ticket)
+def ticket_deleted(sender, instance, **kwargs):
+    """Uncount a deleted ticket."""
+    apply_summary_delta(**_ticket_status_deltas(instance.status, -1))
+
+
+@receiver(pre_save, sender=CashBox)
+def cashbox_pre_save(sender, instance, update_fields=None, **kwargs):
+    """Remember the posted amount of a cashbox operation before it changes."""
+    _remember_previous_state(instance, CASHBOX_TRACKED_FIELDS, update_fields)
+
+
+@receiver(post_save, sender=CashBox)
+def cashbox_saved(sender, instance, created, **kwargs):
+    """Apply a posted cashbox operation to the income / expense totals."""
+    previous = _previous_state(instance)
+    if not created and previous is None:
+        return
+    deltas = _cashbox_deltas(
+        instance.is_posted, instance.amount, instance.article.type, 1
+    )
+    if previous is not None:
+        deltas = _merge_deltas(
+            deltas,
+            _cashbox_deltas(
+                previous["is_posted"],
+                previous["amount"],
+                previous["article__type"],
+                -1,
+            ),
+        )
+    apply_summary_delta(**deltas)
+
+
+@receiver(post_delete, sender=CashBox)
+def cashbox_deleted(sender, instance, **kwargs):
+    """Remove a deleted cashbox operation from the totals."""
+    apply_summary_delta(
+        **_cashbox_deltas(
+            instance.is_posted, instance.amount, instance.article.type, -1
+        )
+    )
+
+
+def _cashbox_bucket(is_posted, date, article_type, article_id, personal_account_id):
+    if not is_posted:
+        return None
+    apartment_id, house_id = personal_account_location(personal_account_id)
+    return (month_start(date), article_type, house_id, apartment_id, article_id)
+
+
+def _apply_cashbox_bucket(bucket, amount):
+    if bucket is None:
+        return
+    month, kind, house_id, apartment_id, article_id = bucket
+    apply_rollup_delta(
+        month,
+        kind,
+        amount,
+        house_id=house_id,
+        apartment_id=apartment_id,
+        article_id=article_id,
+    )
+
+
+@receiver(post_save, sender=CashBox)
+def cashbox_rollup_saved(sender, instance, created, **kwargs):
+    """Move a cashbox operation between monthly rollup buckets."""
+    previous = _previous_state(instance)
+    if not created and previous is None:
+        return
+    new_bucket = _cashbox_bucket(
+        instance.is_posted,
+        instance.date,
+        instance.article.type,
+        instance.article_id,
+        instance.personal_account_id,
+    )
+    old_bucket = None
+    if previous is not None and previous["is_posted"]:
+        old_bucket = (
+            month_start(previous["date"]),
+            previous["article__type"],
+            previous["personal_account__apartment__house"],
+            previous["personal_account__apartment"],
+            previous["article"],
+        )
+        if old_bucket == new_bucket and previous["amount"] == instance.amount:
+            return
+    _apply_cashbox_bucket(old_bucket, -previous["amount"] if old_bucket else 0)
+    _apply_cashbox_bucket(new_bucket, instance.amount)
+
+
+@receiver(post_delete, sender=CashBox)
+def cashbox_rollup_deleted(sender, instance, **kwargs):
+    """Remove a deleted cashbox operation from the monthly rollup."""
+    bucket = _cashbox_bucket(
+        instance.is_posted,
+        instance.date,
+        instance.article.type,
+        instance.article_id,
+        instance.personal_account_id,
+    )
+    _apply_cashbox_bucket(bucket, -instance.amount)
+
+
+@receiver(post_save, sender=Apartment)
+def apartment_rollup_saved(sender, instance, **kwargs):
+    """Move the rollup rows of an apartment that changed house or account."""
+    previous = previous_apartment_state(instance) or {
+        "house_id": instance.house_id,
+        "personal_account_id": None,
+    }
+    if previous["house_id"] != instance.house_id:
+        move_apartment_rows(instance.pk, instance.house_id)
+    if previous["personal_account_id"] != instance.personal_account_id:
+        location = (instance.pk, instance.house_id)
+        move_personal_account_rows(
+            previous["personal_account_id"], location, (None, None)
+        )
+        move_personal_account_rows(instance.personal_account_id, (None, None), location)
+
+
+@receiver(post_delete, sender=Apartment)
+def apartment_rollup_deleted(sender, instance, **kwargs):
+    """File the operations of the account of a deleted apartment without it.
+
+    The rows of the apartment itself are deleted with it.
+    """
+    move_personal_account_rows(instance.personal_account_id, None, (None, None))
+
+
+@receiver(pre_save, sender=Receipt)
+def receipt_pre_save(sender, instance, update_fields=None, **kwargs):
+    """Remember where a receipt is counted in the rollup before it changes."""
+    _remember_previous_state(instance, RECEIPT_TRACKED_FIELDS, update_fields)
+
+
+@receiver(post_save, sender=Receipt)
+def receipt_rollup_saved(sender, instance, created, **kwargs):
+    """Move the saved items of a receipt when it is (un)posted or re-dated.
+
+    Items saved afterwards are handled by the receipt item handlers against
+    the new state of the receipt.
+    """
+    previous = _previous_state(instance)
+    if previous is None:
+        return
+    old_key = previous["is_posted"] and (
+        month_start(previous["date"]),
+        previous["apartment"],
+        previous["apartment__house"],
+    )
+    new_key = instance.is_posted and (
+        month_start(instance.date),
+        instance.apartment_id,
+        instance.apartment.house_id,
+    )
+    if old_key == new_key:
+        return
+    if old_key:
+        apply_receipt_items(instance.pk, *old_key, sign=-1)
+    if new_key:
+        apply_receipt_items(instance.pk, *new_key, sign=1)
+
+
+def _apply_receipt_item(receipt, service_id, amount):
+    if not receipt.is_posted:
+        return
+    apply_rollup_delta(
+        receipt.date,
+        MonthlyRollup.Kind.RECEIPT,
+        amount,
+        house_id=receipt.apartment.house_id,
+        apartment_id=receipt.apartment_id,
+        service_id=service_id,
+    )
+
+
+@receiver(pre_save, sender=ReceiptItem)
+def receipt_item_pre_save(sender, instance, update_fields=None, **kwargs):
+    """Remember the amount and service of a receipt item before they change."""
+    _remember_previous_state(instance, RECEIPT_ITEM_TRACKED_FIELDS, update_fields)
+
+
+@receiver(post_save, sender=ReceiptItem)
+def receipt_item_rollup_saved(sender, instance, created, **kwargs):
+    """Apply a changed item of a posted receipt to the monthly rollup."""
+    previous = _previous_state(instance)
+    if not created and previous is None:
+        return
+    if (
+        previous is not None
+        and previous["service"] == instance.service_id
+        and previous["amount"] == instance.amount
+    ):
+        return
+    receipt = instance.receipt
+    if previous is not None:
+        _apply_receipt_item(receipt, previous["service"], -previous["amount"])
+    _apply_receipt_item(receipt, instance.service_id, instance.amount)
+
+
+@receiver(post_delete, sender=ReceiptItem)
+def receipt_item_rollup_deleted(sender, instance, **kwargs):
+    """Remove a deleted item of a posted receipt from the monthly rollup."""
+    receipt = (
+        Receipt.objects.filter(pk=instance.receipt_id)
+        .select_related("apartment")
+        .first()
+    )
+    if receipt is not None:
+        _apply_receipt_item(receipt, instance.service_id, -instance.amount)
+
+
+@receiver(pre_save, sender=CounterReading)
+def counter_reading_pre_save(sender, instance, update_fields=None, **kwargs):
+    """Remember the counter, date and value of a reading before they change."""
+    _remember_previous_state(instance, READING_TRACKED_FIELDS, update_fields)
+
+
+@receiver(post_save, sender=CounterReading)
+def counter_reading_saved(sender, instance, created, **kwargs):
+    """Refresh the latest reading of the counter (and of the previous one)."""
+    previous = _previous_state(instance)
+    if not created and previous is None:
+        return
+    if previous is not None and (
+        previous["counter"],
+        previous["date"],
+        previous["value"],
+    ) == (instance.counter_id, instance.date, instance.value):
+        return
+    counter_ids = {instance.counter_id}
+    if previous is not None:
+        counter_ids.add(previous["counter"])
+    refresh_latest_readings(Counter.objects.filter(pk__in=counter_ids))
+
+
+@receiver(post_delete, sender=CounterReading)
+def counter_reading_deleted(sender, instance, **kwargs):
+    """Fall back to the previous reading when the latest one is deleted."""
+    refresh_latest_readings(
+        Counter.objects.filter(pk=instance.counter_id, latest_reading_id=instance.pk)
+    )
+
+
+@receiver(post_save, sender=PaymentDetails)
+@receiver(post_delete, sender=PaymentDetails)
+def payment_details_changed(sender, **kwargs):
+    """Invalidate the cached payment details."""
+    invalidate_payment_details()
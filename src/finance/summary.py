@@ -0,0 +1,131 @@
+"""src/finance/summary.py."""
+
+import logging
+
+from django.db import transaction
+from django.db.models import Count
+from django.db.models import F
+from django.db.models import Q
+from django.db.models import Sum
+from django.utils import timezone
+
+from src.building.models import Apartment
+from src.building.models import House
+from src.building.models import PersonalAccount
+from src.users.models import Ticket
+from src.users.models import User
+
+from .models import Article
+from .models import CashBox
+from .models import FinanceSummary
+
+logger = logging.getLogger(__name__)
+
+SUMMARY_PK = 1
+
+SUMMARY_FIELDS = (
+    "houses_count",
+    "apartments_count",
+    "personal_accounts_count",
+    "active_owners_count",
+    "tickets_new_count",
+    "tickets_in_progress_count",
+    "total_balance",
+    "total_debt",
+    "cashbox_income",
+    "cashbox_expense",
+)
+
+
+def compute_summary_totals():
+    """Aggregate the dashboard totals directly from the raw tables."""
+    accounts = PersonalAccount.objects.aggregate(
+        accounts_count=Count("pk"),
+        balance_sum=Sum("balance"),
+        debt_sum=Sum("balance", filter=Q(balance__lt=0)),
+    )
+    tickets = Ticket.objects.aggregate(
+        new=Count("pk", filter=Q(status=Ticket.TicketStatus.NEW)),
+        in_progress=Count("pk", filter=Q(status=Ticket.TicketStatus.IN_PROGRESS)),
+    )
+    cashbox = CashBox.objects.filter(is_posted=True).aggregate(
+        income=Sum("amount", filter=Q(article__type=Article.ArticleType.INCOME)),
+        expense=Sum("amount", filter=Q(article__type=Article.ArticleType.EXPENSE)),
+    )
+
+    return {
+        "houses_count": House.objects.count(),
+        "apartments_count": Apartment.objects.count(),
+        "personal_accounts_count": accounts["accounts_count"],
+        "active_owners_count": User.objects.filter(
+            user_type=User.UserType.OWNER, status=User.UserStatus.ACTIVE
+        ).count(),
+        "tickets_new_count": tickets["new"],
+        "tickets_in_progress_count": tickets["in_progress"],
+        "total_balance": accounts["balance_sum"] or 0,
+        "total_debt": accounts["debt_sum"] or 0,
+        "cashbox_income": cashbox["income"] or 0,
+        "cashbox_expense": cashbox["expense"] or 0,
+    }
+
+
+def rebuild_summary():
+    """Recalculate the summary row from the raw tables and save it."""
+    with transaction.atomic():
+        totals = compute_summary_totals()
+        summary, _created = FinanceSummary.objects.update_or_create(
+            pk=SUMMARY_PK, defaults={**totals, "rebuilt_at": timezone.now()}
+        )
+    return summary
+
+
+def get_summary():
+    """Return the summary row, building it on first access."""
+    summary = FinanceSummary.objects.filter(pk=SUMMARY_PK).first()
+    if summary is None:
+        summary = rebuild_summary()
+    return summary
+
+
+def get_finance_totals():
+    """Return the cash, balance and debt totals shown by the list pages."""
+    summary = get_summary()
+    return {
+        "total_cash": summary.cashbox_income - summary.cashbox_expense,
+        "total_balance": summary.total_balance,
+        "total_debt": summary.total_debt,
+    }
+
+
+def verify_summary():
+    """Compare the stored summary with the raw tables.
+
+    Returns a dict ``{field: (stored, actual)}`` for every mismatched total.
+    """
+    summary = get_summary()
+    actual = compute_summary_totals()
+    return {
+        field: (getattr(summary, field), actual[field])
+        for field in SUMMARY_FIELDS
+        if getattr(summary, field) != actual[field]
+    }
+
+
+def apply_summary_delta(**deltas):
+    """Shift the stored totals by the given deltas in a single UPDATE.
+
+    The update runs in the caller's transaction, so a rolled back write also
+    rolls back its contribution to the summary.
+    """
+    deltas = {field: delta for field, delta in deltas.items() if delta}
+    if not deltas:
+        return
+
+    updated = FinanceSummary.objects.filter(pk=SUMMARY_PK).update(
+        **{field: F(field) + delta for field, delta in deltas.items()}
+    )
+    if not updated:
+        # The row does not exist yet: the raw tables already contain the
+        # current write, so a full rebuild yields the correct totals.
+        logger.info("Finance summary row is missing, rebuilding it.")
+        rebuild_summary()
@@ -1,28 +1,61 @@
 """src/finance/tasks.py."""
 
-import io
 import logging
+import smtplib
 
+from celery import group
 from celery import shared_task
 from django.conf import settings
 from django.core.mail import EmailMessage
-from weasyprint import HTML
-from xlsx2html import xlsx2html
+from django.core.mail import get_connection
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
 
-from src.core.utils import ReceiptExcelGenerator
 from src.finance.models import PrintTemplate
 from src.finance.models import Receipt
+from src.finance.models import ReceiptMailing
+from src.finance.models import ReceiptMailingFailure
+from src.finance.payment_details import get_payment_details
+from src.finance.receipts import get_print_template
+from src.finance.receipts import get_receipt_pdf
+from src.finance.receipts import receipts_for_rendering
+from src.finance.receipts import render_receipt_pdf
 
 logger = logging.getLogger(__name__)
 
+# Receipts sent by one batch task over one SMTP connection.
+RECEIPT_MAILING_CHUNK_SIZE = 100
+
+
+def build_receipt_email(receipt, pdf_file, connection=None):
+    """Build the email with the receipt PDF for the apartment owner."""
+    owner = receipt.apartment.owner
+    subject = f"Квитанция на оплату №{receipt.number}"
+    body = (
+        f"Здравствуйте, {owner.get_full_name()}!\n\n"
+        f"Направляем вам квитанцию на оплату коммунальных услуг.\n"
+        f"Квартира: {receipt.apartment.number}, "
+        f"Дом: {receipt.apartment.house.title}.\n\n"
+        f"С уважением,\nАдминистрация."  # noqa: RUF001
+    )
+
+    email = EmailMessage(
+        subject=subject,
+        body=body,
+        from_email=settings.EMAIL_HOST_USER,
+        to=[owner.email],
+        connection=connection,
+    )
+    email.attach(f"receipt_{receipt.number}.pdf", pdf_file, "application/pdf")
+    return email
+
 
 @shared_task
 def send_receipt_email_task(receipt_id, template_id=None):
     """Generate PDF receipts and sends them to the owner's email address."""
     try:
-        receipt = Receipt.objects.select_related(
-            "apartment__owner", "apartment__house"
-        ).get(pk=receipt_id)
+        receipt = receipts_for_rendering().get(pk=receipt_id)
 
         owner = receipt.apartment.owner
         if not owner or not owner.email:
@@ -32,63 +65,13 @@ def send_receipt_email_task(receipt_id, template_id=None):
             )
             return "Email not set for owner"
 
-        if template_id:
-            template = PrintTemplate.objects.get(pk=template_id)
-        else:
-            template = PrintTemplate.objects.filter(is_default=True).first()
-            if not template:
-                template = PrintTemplate.objects.first()
-
+        template = get_print_template(template_id)
         if not template:
             logger.error("Не найден шаблон для печати квитанции.")  # noqa: RUF001
             return "Template not found"
 
-        generator = ReceiptExcelGenerator(receipt, template.template_file.path)
-        workbook = generator.generate_workbook()
-
-        excel_buffer = io.BytesIO()
-        workbook.save(excel_buffer)
-        excel_buffer.seek(0)
-
-        html_buffer = io.StringIO()
-        xlsx2html(excel_buffer, html_buffer)
-        raw_html = html_buffer.getvalue()
-
-        # CSS для PDF
-        custom_css = """
-        <style>
-            @page { size: 250mm 300mm; margin: 0; }
-            body { margin: 10mm; padding: 0; font-family: sans-serif; }
-            table { border-collapse: collapse; border-spacing: 0; width: 100%; }
-            tr[height="0"], tr[style*="height:0"] { display: none !important; }
-        </style>
-        """
-        final_html_content = custom_css + raw_html
-
-        base_url = getattr(settings, "SITE_URL", "http://localhost:8000")
-
-        pdf_file = HTML(string=final_html_content, base_url=base_url).write_pdf()
-
-        subject = f"Квитанция на оплату №{receipt.number}"
-        body = (
-            f"Здравствуйте, {owner.get_full_name()}!\n\n"
-            f"Направляем вам квитанцию на оплату коммунальных услуг.\n"
-            f"Квартира: {receipt.apartment.number}, "
-            f"Дом: {receipt.apartment.house.title}.\n\n"
-            f"С уважением,\nАдминистрация."  # noqa: RUF001
-        )
-
-        email = EmailMessage(
-            subject=subject,
-            body=body,
-            from_email=settings.EMAIL_HOST_USER,
-            to=[owner.email],
-        )
-
-        filename = f"receipt_{receipt.number}.pdf"
-        email.attach(filename, pdf_file, "application/pdf")
-
-        email.send(fail_silently=False)
+        pdf_file = render_receipt_pdf(receipt, template)
+        build_receipt_email(receipt, pdf_file).send(fail_silently=False)
         logger.info(
             "Квитанция %s успешно отправлена на %s", receipt.number, owner.email
         )
@@ -101,3 +84,130 @@ def send_receipt_email_task(receipt_id, template_id=None):
         return f"Error: {e}"
     else:
         return "Sent"
+
+
+def _send_mailing_receipt(receipt, template, payment_details, connection):
+    """Send one receipt of a mailing and return the error text, if any.
+
+    Errors of the connection itself are raised, the rest of the chunk
+    cannot be sent over it.
+    """
+    owner = receipt.apartment.owner
+    if not owner or not owner.email:
+        return "У владельца квартиры нет Email."  # noqa: RUF001
+    if template is None:
+        return "Не найден шаблон для печати квитанции."  # noqa: RUF001
+    try:
+        pdf_file = render_receipt_pdf(receipt, template, payment_details)
+    except Exception as e:  # noqa: BLE001
+        logger.warning("Квитанция %s не сформирована: %s", receipt.number, e)
+        return str(e)
+    try:
+        build_receipt_email(receipt, pdf_file, connection).send()
+    except (smtplib.SMTPRecipientsRefused, smtplib.SMTPResponseException) as e:
+        # The server refused this message, the connection is still usable.
+        logger.warning("Квитанция %s не отправлена: %s", receipt.number, e)
+        return str(e)
+    return None
+
+
+def _finish_mailing_if_complete(mailing_id):
+    ReceiptMailing.objects.filter(
+        pk=mailing_id,
+        status=ReceiptMailing.MailingStatus.RUNNING,
+        total__lte=F("sent") + F("failed"),
+    ).update(status=ReceiptMailing.MailingStatus.DONE, finished_at=timezone.now())
+
+
+@shared_task
+def send_receipt_batch_task(mailing_id, receipt_ids):
+    """Send a chunk of a mailing over one SMTP connection.
+
+    The template and the company details are loaded once for the chunk.
+    Receipts that cannot be rendered or sent are recorded as failures.
+    """
+    mailing = ReceiptMailing.objects.select_related("template").get(pk=mailing_id)
+    ReceiptMailing.objects.filter(
+        pk=mailing_id, status=ReceiptMailing.MailingStatus.PENDING
+    ).update(status=ReceiptMailing.MailingStatus.RUNNING)
+
+    template = mailing.template or get_print_template()
+    payment_details = get_payment_details()
+    receipts = receipts_for_rendering(Receipt.objects.filter(pk__in=receipt_ids))
+
+    sent = 0
+    failures = []
+    pending = list(receipts)
+    try:
+        with get_connection(fail_silently=False) as connection:
+            while pending:
+                error = _send_mailing_receipt(
+                    pending[0], template, payment_details, connection
+                )
+                receipt = pending.pop(0)
+                if error:
+                    failures.append((receipt, error))
+                else:
+                    sent += 1
+    except (OSError, smtplib.SMTPException) as e:
+        logger.exception("Рассылка %s: ошибка SMTP-соединения.", mailing_id)
+        failures.extend(
+            (receipt, f"Ошибка SMTP-соединения: {e}") for receipt in pending
+        )
+
+    # Receipts deleted after the mailing was queued count as failures too.
+    failed = len(receipt_ids) - sent
+    ReceiptMailingFailure.objects.bulk_create(
+        ReceiptMailingFailure(mailing_id=mailing_id, receipt=receipt, error=error)
+        for receipt, error in failures
+    )
+    ReceiptMailing.objects.filter(pk=mailing_id).update(
+        sent=F("sent") + sent, failed=F("failed") + failed
+    )
+    _finish_mailing_if_complete(mailing_id)
+    logger.info(
+        "Рассылка %s: отправлено %s, с ошибкой %s.",  # noqa: RUF001
+        mailing_id,
+        sent,
+        failed,
+    )
+    return {"sent": sent, "failed": failed}
+
+
+def queue_receipt_mailing(mailing, receipt_ids):
+    """Split the receipts of a mailing into chunks and queue them."""
+    receipt_ids = list(receipt_ids)
+    ReceiptMailing.objects.filter(pk=mailing.pk).update(total=len(receipt_ids))
+    if not receipt_ids:
+        ReceiptMailing.objects.filter(pk=mailing.pk).update(
+            status=ReceiptMailing.MailingStatus.DONE, finished_at=timezone.now()
+        )
+        return
+    chunks = group(
+        send_receipt_batch_task.s(
+            mailing.pk, receipt_ids[start : start + RECEIPT_MAILING_CHUNK_SIZE]
+        )
+        for start in range(0, len(receipt_ids), RECEIPT_MAILING_CHUNK_SIZE)
+    )
+    transaction.on_commit(chunks.apply_async)
+
+
+@shared_task
+def prerender_receipt_task(receipt_id):
+    """Render the PDF and the print HTML of a receipt ahead of time.
+
+    Any receipt passed is rendered, a view that timed out queues unposted
+    ones too. Only posted receipts are queued automatically, see
+    ``queue_receipt_prerender``.
+    """
+    receipt = receipts_for_rendering(Receipt.objects.filter(pk=receipt_id)).first()
+    template = get_print_template()
+    if receipt is None or template is None:
+        return None
+    return get_receipt_pdf(receipt, template)
+
+
+def queue_receipt_prerender(receipt):
+    """Pre-render a posted receipt once the current transaction commits."""
+    if receipt.is_posted:
+        transaction.on_commit(lambda: prerender_receipt_task.delay(receipt.pk))
@@ -1 +1,376 @@
 """src/finance/tests.py."""
+
+import datetime
+import smtplib
+from decimal import Decimal
+
+import pytest
+from django.core import mail
+from django.core.mail.backends.locmem import EmailBackend
+from django.urls import reverse
+
+from src.building.models import Apartment
+from src.building.models import House
+from src.building.models import PersonalAccount
+from src.building.models import Section
+from src.core.testing import assert_query_budget
+from src.finance.latest_readings import rebuild_latest_readings
+from src.finance.models import Article
+from src.finance.models import CashBox
+from src.finance.models import Counter
+from src.finance.models import CounterReading
+from src.finance.models import MonthlyRollup
+from src.finance.models import PrintTemplate
+from src.finance.models import Receipt
+from src.finance.models import ReceiptItem
+from src.finance.models import ReceiptMailing
+from src.finance.models import Service
+from src.finance.models import Unit
+from src.finance.rollup import _collect_rows
+from src.finance.summary import get_finance_totals
+from src.finance.summary import rebuild_summary
+from src.finance.summary import verify_summary
+from src.finance.tasks import prerender_receipt_task
+from src.finance.tasks import send_receipt_batch_task
+from src.users.models import Ticket
+from src.users.models import User
+
+
+class DroppedConnectionBackend(EmailBackend):
+    """Loses the SMTP connection after the first message."""
+
+    def send_messages(self, messages):
+        """Send the first message, then fail like a dropped connection."""
+        if mail.outbox:
+            msg = "Connection unexpectedly closed"
+            raise smtplib.SMTPServerDisconnected(msg)
+        return super().send_messages(messages)
+
+
+def _latest(counter):
+    counter.refresh_from_db()
+    return (
+        counter.latest_reading_id,
+        counter.latest_reading_date,
+        counter.latest_reading_value,
+    )
+
+
+@pytest.mark.django_db()
+def test_counter_latest_reading_follows_reading_changes(client):
+    """The latest reading stored on a counter is kept up to date."""
+    house = House.objects.create(title="Дом 1", address="ул. Тестовая, 1")
+    apartment = Apartment.objects.create(number="1", house=house)
+    service = Service.objects.create(name="Вода", unit=Unit.objects.create(name="м³"))
+    counter = Counter.objects.create(
+        serial_number="A-1", apartment=apartment, service=service
+    )
+    other = Counter.objects.create(
+        serial_number="A-2", apartment=apartment, service=service
+    )
+
+    def reading(number, day, value, target=counter):
+        return CounterReading.objects.create(
+            number=number,
+            counter=target,
+            date=datetime.date(2026, 1, day),
+            value=Decimal(value),
+        )
+
+    newest = reading("1", 20, "30")
+    older = reading("2", 10, "10")
+    assert _latest(counter) == (newest.pk, newest.date, Decimal("30.000"))
+
+    older.date = datetime.date(2026, 1, 25)
+    older.save()
+    assert _latest(counter)[0] == older.pk
+
+    older.counter = other
+    older.save()
+    assert _latest(counter)[0] == newest.pk
+    assert _latest(other)[0] == older.pk
+
+    admin = User.objects.create_superuser("admin", "admin@example.com", "admin")
+    client.force_login(admin)
+    url = reverse("api-1.0.0:delete_counter_reading", args=[newest.pk])
+    assert client.delete(url).status_code == 200  # noqa: PLR2004
+    assert _latest(counter) == (None, None, None)
+
+    Counter.objects.update(latest_reading_id=None, latest_reading_value=None)
+    assert rebuild_latest_readings(batch_size=1) == 2  # noqa: PLR2004
+    assert _latest(other)[0] == older.pk
+
+
+def _rollup_buckets(rows):
+    return {
+        (
+            row.month,
+            row.kind,
+            row.house_id,
+            row.apartment_id,
+            row.article_id,
+            row.service_id,
+        ): row.amount
+        for row in rows
+        if row.amount
+    }
+
+
+def _assert_rollup_is_current():
+    assert _rollup_buckets(MonthlyRollup.objects.all()) == _rollup_buckets(
+        _collect_rows()
+    )
+
+
+@pytest.mark.django_db()
+def test_monthly_rollup_follows_cashbox_receipt_and_apartment_changes():
+    """The rollup kept by the signals matches a rebuild from the raw tables."""
+    first = House.objects.create(title="Дом 1", address="ул. Тестовая, 1")
+    second = House.objects.create(title="Дом 2", address="ул. Тестовая, 2")
+    account = PersonalAccount.objects.create(number="0000000001")
+    apartment = Apartment.objects.create(
+        number="1", house=first, personal_account=account
+    )
+    service = Service.objects.create(name="Вода", unit=Unit.objects.create(name="м³"))
+    income = Article.objects.create(name="Оплата", type=Article.ArticleType.INCOME)
+    expense = Article.objects.create(name="Ремонт", type=Article.ArticleType.EXPENSE)
+
+    operation = CashBox.objects.create(
+        number="1",
+        date=datetime.date(2026, 1, 15),
+        amount=Decimal("100.00"),
+        article=income,
+        personal_account=account,
+    )
+    CashBox.objects.create(
+        number="2",
+        date=datetime.date(2026, 1, 20),
+        amount=Decimal("40.00"),
+        article=expense,
+    )
+    receipt = Receipt.objects.create(
+        number="R-1", date=datetime.date(2026, 1, 31), apartment=apartment
+    )
+    item = ReceiptItem.objects.create(
+        receipt=receipt, service=service, amount=Decimal("75.00")
+    )
+    _assert_rollup_is_current()
+
+    receipt.is_posted = True
+    receipt.save()
+    item.amount = Decimal("80.00")
+    item.save()
+    operation.amount = Decimal("120.00")
+    operation.date = datetime.date(2026, 2, 1)
+    operation.save()
+    _assert_rollup_is_current()
+
+    operation.is_posted = False
+    operation.save()
+    _assert_rollup_is_current()
+    operation.is_posted = True
+    operation.save()
+
+    apartment.house = second
+    apartment.save()
+    _assert_rollup_is_current()
+
+    apartment.personal_account = PersonalAccount.objects.create(number="0000000002")
+    apartment.save()
+    _assert_rollup_is_current()
+    apartment.personal_account = account
+    apartment.save()
+    _assert_rollup_is_current()
+
+    item.delete()
+    operation.delete()
+    _assert_rollup_is_current()
+    receipt.delete()
+    CashBox.objects.create(
+        number="3", amount=Decimal("10.00"), article=income, personal_account=account
+    )
+    apartment.delete()
+    _assert_rollup_is_current()
+
+
+@pytest.mark.django_db()
+def test_receipt_mailing_filtered_by_section_only(client):
+    """A section is enough to select the receipts of a mailing."""
+    house = House.objects.create(title="Дом 1", address="ул. Тестовая, 1")
+    section = Section.objects.create(name="Секция 1", house=house)
+    inside = Apartment.objects.create(number="1", house=house, section=section)
+    outside = Apartment.objects.create(number="2", house=house)
+    for number, apartment in (("R-1", inside), ("R-2", inside), ("R-3", outside)):
+        Receipt.objects.create(number=number, apartment=apartment, is_posted=True)
+    admin = User.objects.create_superuser("admin", "admin@example.com", "admin")
+    client.force_login(admin)
+
+    response = client.post(
+        reverse("api-1.0.0:create_receipt_mailing"),
+        {"section_id": section.pk},
+        content_type="application/json",
+    )
+
+    assert response.status_code == 202  # noqa: PLR2004
+    assert response.json()["total"] == 2  # noqa: PLR2004
+
+
+@pytest.mark.django_db()
+def test_cashbox_table_stays_within_its_query_budget(client):
+    """The owner of every operation comes with the page query."""
+    house = House.objects.create(title="Дом 1", address="ул. Тестовая, 1")
+    article = Article.objects.create(name="Оплата", type=Article.ArticleType.INCOME)
+    for number in range(10):
+        owner = User.objects.create_user(f"owner{number}", last_name="Петров")
+        account = PersonalAccount.objects.create(number=f"{number:010d}")
+        Apartment.objects.create(
+            number=str(number), house=house, owner=owner, personal_account=account
+        )
+        CashBox.objects.create(
+            number=str(number),
+            amount=Decimal("10.00"),
+            article=article,
+            personal_account=account,
+        )
+    admin = User.objects.create_superuser("admin", "admin@example.com", "admin")
+    client.force_login(admin)
+    columns = [
+        "number",
+        "date",
+        "is_posted",
+        "article",
+        "owner",
+        "personal_account",
+        "article_type",
+        "amount",
+    ]
+    data = {"draw": 1, "start": 0, "length": 10}
+    for index, name in enumerate(columns):
+        data[f"columns[{index}][data]"] = name
+        data[f"columns[{index}][name]"] = ""
+
+    response = assert_query_budget(
+        client, reverse("finance:ajax_datatable_cashbox"), method="post", data=data
+    )
+
+    assert response.json()["columns"]["owner"][0] == "Петров"
+
+
+@pytest.mark.django_db()
+def test_finance_summary_follows_signal_deltas():
+    """The totals shifted by the signals match the raw tables."""
+    rebuild_summary()
+    house = House.objects.create(title="Дом 1", address="ул. Тестовая, 1")
+    account = PersonalAccount.objects.create(number="0000000001")
+    apartment = Apartment.objects.create(
+        number="1", house=house, personal_account=account
+    )
+    owner = User.objects.create_user(
+        "owner", user_type=User.UserType.OWNER, status=User.UserStatus.ACTIVE
+    )
+    income = Article.objects.create(name="Оплата", type=Article.ArticleType.INCOME)
+    expense = Article.objects.create(name="Ремонт", type=Article.ArticleType.EXPENSE)
+    operation = CashBox.objects.create(
+        number="1", amount=Decimal("100.00"), article=income, personal_account=account
+    )
+    ticket = Ticket.objects.create(
+        apartment=apartment,
+        user=owner,
+        description="Течет кран",
+        date=datetime.date(2026, 1, 15),
+        time=datetime.time(10),
+    )
+    assert verify_summary() == {}
+
+    account.balance = Decimal("-50.00")
+    account.save()
+    operation.amount = Decimal("120.00")
+    operation.article = expense
+    operation.save()
+    ticket.status = Ticket.TicketStatus.IN_PROGRESS
+    ticket.save()
+    owner.status = User.UserStatus.INACTIVE
+    owner.save()
+    owner.save(update_fields=["last_login"])
+    assert verify_summary() == {}
+    assert get_finance_totals() == {
+        "total_cash": Decimal("-120.00"),
+        "total_balance": Decimal("-50.00"),
+        "total_debt": Decimal("-50.00"),
+    }
+
+    operation.is_posted = False
+    operation.save()
+    assert verify_summary() == {}
+    operation.is_posted = True
+    operation.save()
+    owner.status = User.UserStatus.ACTIVE
+    owner.save()
+    assert verify_summary() == {}
+
+    operation.delete()
+    ticket.delete()
+    owner.delete()
+    apartment.delete()
+    account.delete()
+    house.delete()
+    assert verify_summary() == {}
+
+
+@pytest.mark.django_db()
+def test_receipt_mailing_stops_rendering_when_the_connection_drops(
+    monkeypatch, settings
+):
+    """Receipts left when the connection drops fail without being rendered."""
+    settings.EMAIL_BACKEND = "src.finance.tests.DroppedConnectionBackend"
+    rendered = []
+
+    def render(receipt, template, payment_details=None):
+        rendered.append(receipt.pk)
+        return b"%PDF-1.7"
+
+    monkeypatch.setattr("src.finance.tasks.render_receipt_pdf", render)
+    house = House.objects.create(title="Дом 1", address="ул. Тестовая, 1")
+    owner = User.objects.create_user("owner", "owner@example.com")
+    receipt_ids = []
+    for number in range(4):
+        apartment = Apartment.objects.create(
+            number=str(number), house=house, owner=owner
+        )
+        receipt = Receipt.objects.create(number=f"R-{number}", apartment=apartment)
+        receipt_ids.append(receipt.pk)
+    template = PrintTemplate.objects.create(
+        name="Квитанция", template_file="receipt_templates/receipt.xlsx"
+    )
+    mailing = ReceiptMailing.objects.create(template=template, total=4)
+
+    assert send_receipt_batch_task(mailing.pk, receipt_ids) == {
+        "sent": 1,
+        "failed": 3,
+    }
+
+    # The second receipt was rendered before its send found the dead connection.
+    assert len(rendered) == 2  # noqa: PLR2004
+    assert len(mail.outbox) == 1
+    mailing.refresh_from_db()
+    assert mailing.status == ReceiptMailing.MailingStatus.DONE
+    failures = {f.receipt_id: f.error for f in mailing.failures.all()}
+    assert set(failures) == set(receipt_ids) - {rendered[0]}
+    assert all("SMTP" in error for error in failures.values())
+
+
+@pytest.mark.django_db()
+def test_prerender_task_renders_the_receipt_it_is_given(monkeypatch):
+    """An unposted receipt queued by a timed out view is rendered too."""
+    monkeypatch.setattr(
+        "src.finance.tasks.get_receipt_pdf",
+        lambda receipt, template: f"receipts/{receipt.number}.pdf",
+    )
+    house = House.objects.create(title="Дом 1", address="ул. Тестовая, 1")
+    apartment = Apartment.objects.create(number="1", house=house)
+    receipt = Receipt.objects.create(number="R-1", apartment=apartment)
+    PrintTemplate.objects.create(
+        name="Квитанция", template_file="receipt_templates/receipt.xlsx"
+    )
+
+    assert prerender_receipt_task(receipt.pk) == "receipts/R-1.pdf"
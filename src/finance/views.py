@@ -3,8 +3,8 @@
 import datetime
 import io
 import logging
+from collections import defaultdict
 
-import openpyxl
 from django.contrib import messages
 from django.contrib.auth.mixins import LoginRequiredMixin
 from django.core.exceptions import ValidationError
@@ -16,7 +16,6 @@ from django.db.models import ProtectedError
 from django.db.models import Q
 from django.db.models import Sum
 from django.db.models.functions import Cast
-from django.db.models.functions import TruncMonth
 from django.http import HttpResponse
 from django.shortcuts import get_object_or_404
 from django.shortcuts import redirect
@@ -29,13 +28,13 @@ from django.views.generic import DetailView
 from django.views.generic import ListView
 from django.views.generic import TemplateView
 from django.views.generic import UpdateView
-from openpyxl.styles import Font
-from openpyxl.utils import get_column_letter
 
 from src.building.models import Apartment
 from src.building.models import House
-from src.building.models import PersonalAccount
+from src.core.exports import EXPORT_CHUNK_SIZE
+from src.core.models import ExportJob
 from src.core.utils import ReceiptExcelGenerator
+from src.core.views import ExportView
 from src.finance.forms import ArticleForm
 from src.finance.forms import CashBoxExpenseForm
 from src.finance.forms import CashBoxIncomeForm
@@ -52,133 +51,130 @@ from src.finance.models import Article
 from src.finance.models import CashBox
 from src.finance.models import Counter
 from src.finance.models import CounterReading
+from src.finance.models import MonthlyRollup
 from src.finance.models import PaymentDetails
 from src.finance.models import PrintTemplate
 from src.finance.models import Receipt
 from src.finance.models import Service
 from src.finance.models import Tariff
 from src.finance.models import Unit
-from src.users.models import Ticket
+from src.finance.summary import get_finance_totals
+from src.finance.summary import get_summary
 from src.users.models import User
 from src.users.permissions import RoleRequiredMixin
 
+from .receipts import receipts_for_rendering
+from .tasks import queue_receipt_prerender
 from .tasks import send_receipt_email_task
 
 logger = logging.getLogger(__name__)
 
+CHART_MAX_MONTHS = 60
+
 
 class AdminStatsView(LoginRequiredMixin, RoleRequiredMixin, TemplateView):
     """Display the main admin panel dashboard."""
 
     template_name = "core/adminlte/admin_stats.html"
     permission_required = "has_statistics"
+    query_budget = 10
 
     def get_context_data(self, **kwargs):
         """Get context data."""
         context = super().get_context_data(**kwargs)
 
-        context["houses_count"] = House.objects.count()
-        context["active_owners_count"] = User.objects.filter(
-            user_type=User.UserType.OWNER, status=User.UserStatus.ACTIVE
-        ).count()
-        context["tickets_in_progress_count"] = Ticket.objects.filter(
-            status=Ticket.TicketStatus.IN_PROGRESS
-        ).count()
-        context["apartments_count"] = Apartment.objects.count()
-        context["personal_accounts_count"] = PersonalAccount.objects.count()
-        context["tickets_new_count"] = Ticket.objects.filter(
-            status=Ticket.TicketStatus.NEW
-        ).count()
-
-        context["total_debt_accounts"] = (
-            PersonalAccount.objects.filter(balance__lt=0).aggregate(s=Sum("balance"))[
-                "s"
-            ]
-            or 0
-        )
-        context["total_balance_accounts"] = (
-            PersonalAccount.objects.aggregate(s=Sum("balance"))["s"] or 0
-        )
-
-        income_total = (
-            CashBox.objects.filter(
-                is_posted=True, article__type=Article.ArticleType.INCOME
-            ).aggregate(s=Sum("amount"))["s"]
-            or 0
-        )
-        expense_total = (
-            CashBox.objects.filter(
-                is_posted=True, article__type=Article.ArticleType.EXPENSE
-            ).aggregate(s=Sum("amount"))["s"]
-            or 0
-        )
-        context["cashbox_balance"] = income_total - expense_total
-
-        today = timezone.now()
-        current_year = today.year
-
-        months_labels = []
-        for month in range(1, 13):
-            date_obj = datetime.date(current_year, month, 1)
-            months_labels.append(date_obj.strftime("%b., %Y"))
-
-        context["chart_labels"] = months_labels
-
-        receipts_data = (
-            Receipt.objects.filter(date__year=current_year, is_posted=True)
-            .annotate(month=TruncMonth("date"))
-            .values("month")
-            .annotate(total=Sum("total_amount"))
-            .order_by("month")
-        )
+        summary = get_summary()
+        context["houses_count"] = summary.houses_count
+        context["active_owners_count"] = summary.active_owners_count
+        context["tickets_in_progress_count"] = summary.tickets_in_progress_count
+        context["apartments_count"] = summary.apartments_count
+        context["personal_accounts_count"] = summary.personal_accounts_count
+        context["tickets_new_count"] = summary.tickets_new_count
+        context["total_debt_accounts"] = summary.total_debt
+        context["total_balance_accounts"] = summary.total_balance
+        context["cashbox_balance"] = summary.cashbox_balance
+
+        start, end = self._get_chart_period()
+        months = self._month_range(start, end)
+        series = self._get_monthly_series(start, end)
+
+        context["chart_labels"] = [month.strftime("%b., %Y") for month in months]
+        context["chart_receipts_debt"] = [series[m]["receipts"] for m in months]
+        context["chart_receipts_paid"] = [series[m]["income"] for m in months]
+        context["chart_cashbox_income"] = context["chart_receipts_paid"]
+        context["chart_cashbox_expense"] = [series[m]["expense"] for m in months]
+
+        current_year = timezone.now().year
+        context["chart_years"] = range(current_year, current_year - 6, -1)
+        context["chart_year"] = self.request.GET.get("year", "")
+        context["chart_from"] = start.strftime("%Y-%m")
+        context["chart_to"] = self._add_months(end, -1).strftime("%Y-%m")
 
-        payments_data = (
-            CashBox.objects.filter(
-                date__year=current_year,
-                is_posted=True,
-                article__type=Article.ArticleType.INCOME,
-            )
-            .annotate(month=TruncMonth("date"))
-            .values("month")
-            .annotate(total=Sum("amount"))
-            .order_by("month")
-        )
-
-        context["chart_receipts_debt"] = self._fill_monthly_data(receipts_data)
-        context["chart_receipts_paid"] = self._fill_monthly_data(payments_data)
+        return context
 
-        cashbox_income_data = payments_data
+    def _get_chart_period(self):
+        """Return the ``[start, end)`` month range requested for the charts.
 
-        cashbox_expense_data = (
-            CashBox.objects.filter(
-                date__year=current_year,
-                is_posted=True,
-                article__type=Article.ArticleType.EXPENSE,
-            )
-            .annotate(month=TruncMonth("date"))
-            .values("month")
-            .annotate(total=Sum("amount"))
-            .order_by("month")
-        )
-
-        context["chart_cashbox_income"] = self._fill_monthly_data(cashbox_income_data)
-        context["chart_cashbox_expense"] = self._fill_monthly_data(cashbox_expense_data)
+        ``?from=YYYY-MM&to=YYYY-MM`` takes precedence over ``?year=``; anything
+        invalid falls back to the current year.
+        """
+        params = self.request.GET
+        try:
+            start = self._parse_month(params["from"])
+            end = self._add_months(self._parse_month(params["to"]), 1)
+            if start < end:
+                return max(start, self._add_months(end, -CHART_MAX_MONTHS)), end
+        except (KeyError, ValueError):
+            pass
 
-        return context
+        try:
+            start = datetime.date(int(params.get("year", "")), 1, 1)
+            return start, self._add_months(start, 12)
+        except ValueError:
+            pass
 
-    def _fill_monthly_data(self, queryset_data):
-        """Map DB aggregation result to a list of 12 months."""
-        data_map = {
-            entry["month"].strftime("%m"): float(entry["total"])
-            for entry in queryset_data
-            if entry["month"]
+        start = datetime.date(timezone.now().year, 1, 1)
+        return start, self._add_months(start, 12)
+
+    @staticmethod
+    def _parse_month(value):
+        """Parse a ``YYYY-MM`` value into the first day of that month."""
+        year, month = value.split("-")
+        return datetime.date(int(year), int(month), 1)
+
+    @staticmethod
+    def _add_months(date, months):
+        """Shift the first day of a month by a number of months."""
+        index = date.year * 12 + date.month - 1 + months
+        return datetime.date(index // 12, index % 12 + 1, 1)
+
+    def _month_range(self, start, end):
+        """List the first days of all months in ``[start, end)``."""
+        months = []
+        month = start
+        while month < end:
+            months.append(month)
+            month = self._add_months(month, 1)
+        return months
+
+    def _get_monthly_series(self, start, end):
+        """Load all monthly chart series from the month totals of the rollup."""
+        rows = MonthlyRollup.objects.filter(
+            month__gte=start,
+            month__lt=end,
+            article__isnull=True,
+            service__isnull=True,
+        ).values_list("month", "kind", "amount")
+
+        series = defaultdict(lambda: {"receipts": 0.0, "income": 0.0, "expense": 0.0})
+        kinds = {
+            MonthlyRollup.Kind.RECEIPT: "receipts",
+            MonthlyRollup.Kind.INCOME: "income",
+            MonthlyRollup.Kind.EXPENSE: "expense",
         }
-
-        result = []
-        for i in range(1, 13):
-            key = f"{i:02d}"
-            result.append(data_map.get(key, 0.0))
-        return result
+        for month, kind, amount in rows:
+            series[month][kinds[kind]] += float(amount)
+        return series
 
 
 class ManageServicesView(LoginRequiredMixin, RoleRequiredMixin, View):
@@ -600,30 +596,10 @@ class ReceiptListView(LoginRequiredMixin, RoleRequiredMixin, ListView):
         """Add statistics and filter data to the context."""
         context = super().get_context_data(**kwargs)
 
-        income = (
-            CashBox.objects.filter(is_posted=True, article__type="income").aggregate(
-                s=Sum("amount")
-            )["s"]
-            or 0
-        )
-        expense = (
-            CashBox.objects.filter(is_posted=True, article__type="expense").aggregate(
-                s=Sum("amount")
-            )["s"]
-            or 0
-        )
-        context["total_cash"] = income - expense
-
-        context["total_balance_accounts"] = (
-            Apartment.objects.aggregate(total=Sum("personal_account__balance"))["total"]
-            or 0
-        )
-        context["total_debt"] = (
-            Apartment.objects.filter(personal_account__balance__lt=0).aggregate(
-                total=Sum("personal_account__balance")
-            )["total"]
-            or 0
-        )
+        totals = get_finance_totals()
+        context["total_cash"] = totals["total_cash"]
+        context["total_balance_accounts"] = totals["total_balance"]
+        context["total_debt"] = totals["total_debt"]
         context["owners"] = User.objects.filter(user_type="owner")
         context["statuses"] = Receipt.ReceiptStatus.choices
         return context
@@ -728,6 +704,7 @@ class ReceiptCreateView(LoginRequiredMixin, RoleRequiredMixin, CreateView):
                     )
                     self.object.total_amount = total
                     self.object.save()
+                    queue_receipt_prerender(self.object)
 
                     service_ids = self.object.receiptitem_set.values_list(
                         "service_id", flat=True
@@ -818,6 +795,7 @@ class ReceiptUpdateView(LoginRequiredMixin, RoleRequiredMixin, UpdateView):
                     )
                     self.object.total_amount = total
                     self.object.save()
+                    queue_receipt_prerender(self.object)
 
                     if self.object.apartment:
                         added_services = new_service_ids - old_service_ids
@@ -868,16 +846,7 @@ class ReceiptPrintFormView(LoginRequiredMixin, RoleRequiredMixin, View):
 
     def post(self, request, *args, **kwargs):
         """Process the download or upload of the generated Excel file."""
-        receipt = get_object_or_404(
-            Receipt.objects.select_related(
-                "apartment__house",
-                "apartment__section",
-                "apartment__owner",
-                "apartment__personal_account",
-                "tariff",
-            ),
-            pk=kwargs["pk"],
-        )
+        receipt = get_object_or_404(receipts_for_rendering(), pk=kwargs["pk"])
         template_id = request.POST.get("template_id")
 
         if not template_id:
@@ -993,30 +962,10 @@ class CashBoxListView(LoginRequiredMixin, RoleRequiredMixin, ListView):
     def get_context_data(self, **kwargs):
         """Get the context data for the template."""
         context = super().get_context_data(**kwargs)
-        income = (
-            CashBox.objects.filter(is_posted=True, article__type="income").aggregate(
-                s=Sum("amount")
-            )["s"]
-            or 0
-        )
-        expense = (
-            CashBox.objects.filter(is_posted=True, article__type="expense").aggregate(
-                s=Sum("amount")
-            )["s"]
-            or 0
-        )
-        context["total_cash"] = income - expense
-
-        context["total_balance_accounts"] = (
-            Apartment.objects.aggregate(total=Sum("personal_account__balance"))["total"]
-            or 0
-        )
-        context["total_debt"] = (
-            Apartment.objects.filter(personal_account__balance__lt=0).aggregate(
-                total=Sum("personal_account__balance")
-            )["total"]
-            or 0
-        )
+        totals = get_finance_totals()
+        context["total_cash"] = totals["total_cash"]
+        context["total_balance_accounts"] = totals["total_balance"]
+        context["total_debt"] = totals["total_debt"]
         context["articles"] = Article.objects.all()
         context["owners"] = User.objects.filter(user_type=User.UserType.OWNER)
         return context
@@ -1062,7 +1011,7 @@ class CashBoxIncomeCreateView(LoginRequiredMixin, RoleRequiredMixin, CreateView)
             response = super().form_valid(form)
             if self.object.is_posted and self.object.personal_account:
                 self.object.personal_account.balance += self.object.amount
-                self.object.personal_account.save()
+                self.object.personal_account.save(update_fields=["balance"])
             return response
 
 
@@ -1118,36 +1067,30 @@ class CashBoxDetailView(LoginRequiredMixin, RoleRequiredMixin, DetailView):
     context_object_name = "cashbox"
 
 
-class ExportCashBoxExcelView(LoginRequiredMixin, RoleRequiredMixin, View):
+class ExportCashBoxExcelView(LoginRequiredMixin, RoleRequiredMixin, ExportView):
     """Export filtered CashBox transactions to Excel."""
 
     permission_required = "has_cashbox"
 
-    def get(self, request, *args, **kwargs):
-        """Get."""
-        queryset = self.filter_queryset(request)
-
-        workbook = openpyxl.Workbook()
-        sheet = workbook.active
-        sheet.title = "Касса"  # noqa: RUF001
-
-        headers = [
-            "№",
-            "Дата",
-            "Статус",
-            "Тип платежа",
-            "Владелец",
-            "Лицевой счет",
-            "Приход/Расход",
-            "Сумма (грн)",
-            "Комментарий",
-        ]
-        sheet.append(headers)
-
-        for cell in sheet[1]:
-            cell.font = Font(bold=True)
-
-        for item in queryset:
+    export_kind = ExportJob.Kind.CASHBOX
+    export_filename = "cashbox_export"
+    sheet_title = "Касса"  # noqa: RUF001
+    headers = (
+        "№",
+        "Дата",
+        "Статус",
+        "Тип платежа",
+        "Владелец",
+        "Лицевой счет",
+        "Приход/Расход",
+        "Сумма (грн)",
+        "Комментарий",
+    )
+    column_widths = (15, 12, 12, 25, 30, 20, 15, 15, 40)
+
+    def rows(self, queryset):
+        """Yield the export rows, fetching the operations in chunks."""
+        for item in queryset.iterator(chunk_size=EXPORT_CHUNK_SIZE):
             owner_name = "-"
             if (
                 item.personal_account
@@ -1168,7 +1111,7 @@ class ExportCashBoxExcelView(LoginRequiredMixin, RoleRequiredMixin, View):
             if item.article.type == Article.ArticleType.EXPENSE:
                 amount = -amount
 
-            row = [
+            yield [
                 item.number,
                 item.date.strftime("%d.%m.%Y"),
                 status,
@@ -1179,33 +1122,20 @@ class ExportCashBoxExcelView(LoginRequiredMixin, RoleRequiredMixin, View):
                 amount,
                 item.comment,
             ]
-            sheet.append(row)
-
-        column_widths = [15, 12, 12, 25, 30, 20, 15, 15, 40]
-        for i, width in enumerate(column_widths, 1):
-            sheet.column_dimensions[get_column_letter(i)].width = width
-
-        response = HttpResponse(
-            content_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
-        )
-        response["Content-Disposition"] = 'attachment; filename="cashbox_export.xlsx"'
-
-        workbook.save(response)
-        return response
 
-    def filter_queryset(self, request):
+    def filter_queryset(self, params):
         """Replicate the filtering logic from Datatables."""
         queryset = CashBox.objects.select_related(
             "article", "personal_account", "personal_account__apartment__owner"
         ).order_by("-date", "-id")
 
-        number = request.GET.get("number", "").strip()
-        date = request.GET.get("date", "").strip()
-        is_posted = request.GET.get("is_posted", "").strip()
-        article = request.GET.get("article", "").strip()
-        owner = request.GET.get("owner", "").strip()
-        account = request.GET.get("personal_account", "").strip()
-        type_op = request.GET.get("type", "").strip()
+        number = params.get("number", "").strip()
+        date = params.get("date", "").strip()
+        is_posted = params.get("is_posted", "").strip()
+        article = params.get("article", "").strip()
+        owner = params.get("owner", "").strip()
+        account = params.get("personal_account", "").strip()
+        type_op = params.get("type", "").strip()
 
         q = Q()
 
@@ -8,3 +8,7 @@ class UsersConfig(AppConfig):
 
     default_auto_field = "django.db.models.BigAutoField"
     name = "src.users"
+
+    def ready(self):
+        """Connect the handlers that keep the owner listings up to date."""
+        from . import signals  # noqa: F401
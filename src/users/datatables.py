@@ -4,13 +4,12 @@ import re
 
 from ajax_datatable.views import AjaxDatatableView
 from django.contrib.auth.mixins import LoginRequiredMixin
-from django.db.models import DecimalField
 from django.db.models import Q
-from django.db.models import Sum
-from django.db.models.functions import Coalesce
-from django.urls import reverse
 from django.utils.html import escape
 
+from src.core.datatables import ColumnarResponseMixin
+from src.core.datatables import RowUrlsMixin
+
 from .models import Message
 from .models import Ticket
 from .models import User
@@ -23,10 +22,14 @@ RECIPIENT_DISPLAY_LIMIT = 2
 DESCRIPTION_TRUNCATE_LEN = 50
 
 
-class UserAjaxDatatableView(LoginRequiredMixin, AjaxDatatableView):
+class UserAjaxDatatableView(LoginRequiredMixin, RowUrlsMixin, AjaxDatatableView):
     """Provide server-side processing for the User (employee) list DataTable."""
 
     model = User
+    row_urls = {
+        "detail": "users:user_detail",
+        "edit": "users:user_edit",
+    }
     title = "Пользователи"
     show_column_filters = False
 
@@ -71,13 +74,6 @@ class UserAjaxDatatableView(LoginRequiredMixin, AjaxDatatableView):
             "orderable": False,
             "width": "100px",
         },
-        {
-            "name": "actions",
-            "title": "",
-            "searchable": False,
-            "orderable": False,
-            "width": "120px",
-        },
     ]
 
     def get_initial_queryset(self, request=None):
@@ -125,50 +121,30 @@ class UserAjaxDatatableView(LoginRequiredMixin, AjaxDatatableView):
 
     def customize_row(self, row, obj):
         """Customize each row of the DataTable."""
-        full_name = obj.get_full_name() or "—"
-
-        row["full_name"] = f"""
-            <div style="white-space: nowrap; overflow: hidden;
-             text-overflow: ellipsis; max-width: 250px;">
-                {full_name}
-            </div>
-        """
-
-        status_display = obj.get_status_display()
-        badge_class = "bg-secondary"
-        if obj.status == "active":
-            badge_class = "bg-success"
-        elif obj.status == "new":
-            badge_class = "bg-warning"
-        elif obj.status == "inactive":
-            badge_class = "bg-danger"
-        row["status"] = f'<span class="badge {badge_class}">{status_display}</span>'
-
-        edit_url = reverse("users:user_edit", args=[obj.pk])
-        row["actions"] = f"""
-            <div class="text-end" style="white-space: nowrap;">
-                <a href="#" class="btn btn-sm btn-secondary" title="Send Invitation">
-                    <i class="bi bi-arrow-repeat"></i>
-                </a>
-                <a href="{edit_url}" class="btn btn-sm btn-primary"
-                title="Edit" onclick="event.stopPropagation();">
-                    <i class="bi bi-pencil"></i>
-                </a>
-                <button class="btn btn-sm btn-danger delete-user"
-                        data-id="{obj.pk}"
-                        data-name="{full_name}"
-                        title="Delete">
-                    <i class="bi bi-trash"></i>
-                </button>
-            </div>
-        """
+        row["id"] = obj.pk
+        row["full_name"] = obj.get_full_name() or "—"
+        row["status"] = obj.status
         return row
 
 
-class OwnerAjaxDatatableView(LoginRequiredMixin, AjaxDatatableView):
+class OwnerAjaxDatatableView(
+    LoginRequiredMixin, ColumnarResponseMixin, RowUrlsMixin, AjaxDatatableView
+):
     """Provide server-side processing for the Owner list DataTable."""
 
     model = User
+    row_urls = {
+        "detail": "users:owner_detail",
+        "edit": "users:owner_edit",
+        "message": "users:message_to_owner",
+        "house": "building:house_detail",
+        "apartment": "building:apartment_detail",
+    }
+    # Queries for a page of 10 rows.
+    query_budget = 5
+    # only() on the user columns would defer the listing and every field
+    # customize_row reads, one query per row and field.
+    disable_queryset_optimization_only = True
     title = "Владельцы квартир"
     show_column_filters = False
     show_date_filters = None
@@ -191,13 +167,6 @@ class OwnerAjaxDatatableView(LoginRequiredMixin, AjaxDatatableView):
         {"name": "full_name", "title": "ФИО", "searchable": False, "orderable": False},
         {"name": "phone", "title": "Телефон", "searchable": False, "orderable": False},
         {"name": "email", "title": "Email", "searchable": False, "orderable": False},
-        {"name": "house", "title": "Дом", "searchable": False, "orderable": False},
-        {
-            "name": "apartment",
-            "title": "Квартира",
-            "searchable": False,
-            "orderable": False,
-        },
         {
             "name": "date_joined",
             "title": "Добавлен",
@@ -218,35 +187,23 @@ class OwnerAjaxDatatableView(LoginRequiredMixin, AjaxDatatableView):
             "orderable": False,
             "width": "100px",
         },
-        {
-            "name": "actions",
-            "title": "",
-            "searchable": False,
-            "orderable": False,
-            "width": "140px",
-        },
     ]
 
     def get_initial_queryset(self, request=None):
-        """Build the initial queryset with filtering for owners."""
+        """Build the initial queryset with filtering for owners.
+
+        Balances, houses and apartments come from the ``OwnerListing`` row of
+        every owner, so the page is one joined scan without aggregation.
+        """
         self.request = request
         queryset = (
             User.objects.filter(user_type="owner")
-            .prefetch_related("apartments__house", "apartments__personal_account")
-            .annotate(
-                total_balance=Sum(
-                    Coalesce(
-                        "apartments__personal_account__balance",
-                        0.0,
-                        output_field=DecimalField(),
-                    )
-                )
-            )
+            .select_related("listing")
             .order_by("pk")
         )
 
         if not request:
-            return queryset.distinct()
+            return queryset
 
         filters = {
             "user_id": request.POST.get("user_id"),
@@ -260,7 +217,7 @@ class OwnerAjaxDatatableView(LoginRequiredMixin, AjaxDatatableView):
             "has_debt": request.POST.get("has_debt"),
         }
 
-        return self.apply_filters(queryset, filters).distinct()
+        return self.apply_filters(queryset, filters)
 
     def _filter_by_date(self, queryset, value):
         """Apply date-based filters to the queryset."""
@@ -286,6 +243,12 @@ class OwnerAjaxDatatableView(LoginRequiredMixin, AjaxDatatableView):
             pass
         return queryset
 
+    def _filter_by_house(self, queryset, value):
+        """Keep owners with an apartment in the house, by the GIN-indexed ids."""
+        if not value.isdigit():
+            return queryset
+        return queryset.filter(listing__house_ids__contains=[int(value)])
+
     def apply_filters(self, queryset, filters):
         """Apply a dictionary of filters to the queryset."""
         for key, value in filters.items():
@@ -305,11 +268,13 @@ class OwnerAjaxDatatableView(LoginRequiredMixin, AjaxDatatableView):
                 queryset = self._filter_by_date(queryset, cleaned_value)
             elif key == "has_debt":
                 if cleaned_value == "yes":
-                    queryset = queryset.filter(total_balance__lt=0)
+                    queryset = queryset.filter(listing__has_debt=True)
             elif key == "house":
-                queryset = queryset.filter(apartments__house_id=cleaned_value)
+                queryset = self._filter_by_house(queryset, cleaned_value)
             elif key == "apartment":
-                queryset = queryset.filter(apartments__number__icontains=cleaned_value)
+                queryset = queryset.filter(
+                    listing__apartment_numbers__icontains=cleaned_value
+                )
             else:
                 lookup = (
                     f"{key}__icontains" if key in ["user_id", "phone", "email"] else key
@@ -323,10 +288,7 @@ class OwnerAjaxDatatableView(LoginRequiredMixin, AjaxDatatableView):
         custom_columns = [
             "owner_id_display",
             "full_name",
-            "house",
-            "apartment",
             "status",
-            "actions",
             "has_debt",
         ]
         if column in custom_columns:
@@ -344,127 +306,48 @@ class OwnerAjaxDatatableView(LoginRequiredMixin, AjaxDatatableView):
 
     def customize_row(self, row, obj):
         """Customize the data for each row in the DataTable."""
-        row["pk"] = obj.pk
+        row["id"] = obj.pk
         row["owner_id_display"] = obj.user_id or "—"
-        full_name = obj.get_full_name() or "—"
-        row["full_name"] = full_name
+        row["full_name"] = obj.get_full_name() or "—"
         row["phone"] = obj.phone or "—"
         row["email"] = obj.email or "—"
         row["date_joined"] = obj.date_joined.strftime("%d.%m.%Y")
 
-        status_display = obj.get_status_display()
-        status_colors = {
-            "active": "bg-success",
-            "new": "bg-warning",
-            "inactive": "bg-danger",
-        }
-        badge_class = status_colors.get(obj.status, "bg-secondary")
-        row["status"] = f'<span class="badge {badge_class}">{status_display}</span>'
+        row["status"] = obj.status
 
         house_filter_id = (
             self.request.POST.get("house", "").strip()
             if hasattr(self, "request")
             else None
         )
-        all_apartments = list(obj.apartments.all())
-
-        apartments_to_display = (
-            [
-                apt
-                for apt in all_apartments
-                if apt.house and str(apt.house.id) == house_filter_id
-            ]
+        listing = getattr(obj, "listing", None)
+        apartments = listing.apartments if listing else []
+        row["apartments"] = (
+            [apt for apt in apartments if str(apt["house_id"]) == house_filter_id]
             if house_filter_id
-            else all_apartments
+            else apartments
         )
-
-        if apartments_to_display:
-            houses_apartments = {}
-            for apt in apartments_to_display:
-                if apt.house and apt.house not in houses_apartments:
-                    houses_apartments[apt.house] = []
-                if apt.house:
-                    houses_apartments[apt.house].append(apt)
-
-            house_html_parts = []
-            apartment_html_parts = []
-            for house, apt_list in houses_apartments.items():
-                house_url = reverse("building:house_detail", args=[house.pk])
-                house_link = (
-                    f'<a href="{house_url}" '
-                    f'onclick="event.stopPropagation();">{house.title}</a>'
-                )
-                house_html_parts.append(house_link)
-                apt_links = [
-                    (
-                        f'<a href="{reverse("building:apartment_detail",args=[apt.pk])}'
-                        f'" onclick="event.stopPropagation();">№ {apt.number}</a>'
-                    )
-                    for apt in apt_list
-                ]
-                apartment_html_parts.append(", ".join(apt_links))
-            row["house"] = "<br>".join(house_html_parts)
-            row["apartment"] = "<br>".join(apartment_html_parts)
-        else:
-            row["house"] = "—"
-            row["apartment"] = "—"
-
-        total_balance = obj.total_balance or 0
-        row["has_debt"] = (
-            '<span class="text-danger fw-bold">Да</span>' if total_balance < 0 else ""
-        )
-        detail_url = reverse("users:owner_detail", args=[obj.pk])
-        row["DT_RowAttr"] = {"data-detail-url": detail_url}
-        edit_url = reverse("users:owner_edit", args=[obj.pk])
-        send_msg_url = reverse("users:message_to_owner", args=[obj.pk])
-        row["actions"] = f"""
-            <div class="text-end" style="white-space: nowrap;">
-                <a href="{send_msg_url}" class="btn btn-sm btn-default text-secondary"
-                 title="Отправить сообщение" onclick="event.stopPropagation();">
-                    <i class="bi bi-envelope"></i>
-                </a>
-                <a href="{edit_url}" class="btn btn-sm btn-primary"
-                 title="Edit" onclick="event.stopPropagation();">
-                    <i class="bi bi-pencil"></i>
-                </a>
-                <button type="button" class="btn btn-sm btn-danger delete-owner-btn"
-                        data-id="{obj.pk}" data-name="{full_name}" title="Delete">
-                    <i class="bi bi-trash"></i>
-                </button>
-            </div>
-        """
+        row["has_debt"] = bool(listing and listing.has_debt)
         return row
 
 
-class MessageAjaxDatatableView(LoginRequiredMixin, AjaxDatatableView):
+class MessageAjaxDatatableView(
+    LoginRequiredMixin, ColumnarResponseMixin, RowUrlsMixin, AjaxDatatableView
+):
     """Provide data for the sent messages table (admin panel).
 
     Brought to a uniform structure.
     """
 
     model = Message
+    row_urls = {"detail": "users:message_detail"}
     title = "Сообщения"
     initial_order = [["date", "desc"]]
 
     column_defs = [
-        {
-            "name": "checkbox",
-            "title": "",
-            "orderable": False,
-            "searchable": False,
-            "width": "20px",
-            "className": "text-center",
-        },
         {"name": "recipients", "title": "Получатели", "orderable": False},
         {"name": "text", "title": "Текст", "orderable": False},
         {"name": "date", "title": "Дата", "orderable": True},
-        {
-            "name": "actions",
-            "title": "",
-            "orderable": False,
-            "searchable": False,
-            "width": "50px",
-        },
     ]
 
     def get_initial_queryset(self, request=None):
@@ -487,10 +370,7 @@ class MessageAjaxDatatableView(LoginRequiredMixin, AjaxDatatableView):
 
     def customize_row(self, row, obj):
         """Fully generates data for a table row."""
-        row["checkbox"] = (
-            f'<input type="checkbox" '
-            f'class="form-check-input message-checkbox" data-id="{obj.pk}">'
-        )
+        row["id"] = obj.pk
         recipients = obj.recipients.all()
         if recipients.count() > RECIPIENT_DISPLAY_LIMIT:
             recipients_str = ", ".join(
@@ -506,19 +386,22 @@ class MessageAjaxDatatableView(LoginRequiredMixin, AjaxDatatableView):
             if len(obj.text) > SNIPPET_LENGTH
             else obj.text
         )
-        row["text"] = f"<strong>{escape(obj.title)}</strong> - {escape(text_snippet)}"
+        row["title"] = obj.title
+        row["text"] = text_snippet
         row["date"] = obj.date.strftime("%d.%m.%Y - %H:%M")
-        row["actions"] = ""
-        row["DT_RowAttr"] = {
-            "data-detail-url": reverse("users:message_detail", args=[obj.pk])
-        }
         return row
 
 
-class TicketAjaxDatatableView(LoginRequiredMixin, AjaxDatatableView):
+class TicketAjaxDatatableView(
+    LoginRequiredMixin, ColumnarResponseMixin, RowUrlsMixin, AjaxDatatableView
+):
     """Server-side processing for Ticket list DataTable."""
 
     model = Ticket
+    row_urls = {
+        "detail": "users:ticket_detail",
+        "edit": "users:ticket_edit",
+    }
     title = "Заявки"
     initial_order = [["pk", "desc"]]
     show_column_filters = False
@@ -579,14 +462,6 @@ class TicketAjaxDatatableView(LoginRequiredMixin, AjaxDatatableView):
             "searchable": False,
             "width": "100px",
         },
-        {
-            "name": "actions",
-            "title": "",
-            "orderable": False,
-            "searchable": False,
-            "width": "80px",
-            "className": "text-end",
-        },
     ]
 
     def get_initial_queryset(self, request=None):
@@ -692,6 +567,7 @@ class TicketAjaxDatatableView(LoginRequiredMixin, AjaxDatatableView):
 
         Called for each object in the current page.
         """
+        row["id"] = obj.pk
         row["pk"] = obj.pk
         row["date"] = f"{obj.date.strftime('%d.%m.%Y')} - {obj.time.strftime('%H:%M')}"
         row["role"] = obj.role.name if obj.role else "—"
@@ -712,30 +588,5 @@ class TicketAjaxDatatableView(LoginRequiredMixin, AjaxDatatableView):
         row["user"] = obj.user.get_full_name() if obj.user else "—"
         row["phone"] = obj.phone or (obj.user.phone if obj.user else None) or "—"
         row["master"] = obj.master.get_full_name() if obj.master else "—"
-        status_map = {
-            "new": ("Новое", "bg-primary"),
-            "in_progress": ("В работе", "bg-warning"),  # noqa: RUF001
-            "done": ("Выполнено", "bg-success"),
-        }
-        status_label, badge_class = status_map.get(
-            obj.status, (obj.get_status_display(), "bg-secondary")
-        )
-        row["status"] = f'<span class="badge {badge_class}">{status_label}</span>'
-        edit_url = reverse("users:ticket_edit", args=[obj.pk])
-        row["actions"] = f"""
-            <div class="btn-group btn-group-sm" role="group">
-                <a href="{edit_url}" class="btn btn-primary"
-                   title="Редактировать" onclick="event.stopPropagation();">
-                    <i class="bi bi-pencil"></i>
-                </a>
-                <button type="button" class="btn btn-danger delete-ticket-btn"
-                        data-id="{obj.pk}" title="Удалить"
-                        onclick="event.stopPropagation();">
-                    <i class="bi bi-trash"></i>
-                </button>
-            </div>
-        """
-        detail_url = reverse("users:ticket_detail", args=[obj.pk])
-        row["DT_RowAttr"] = {"data-detail-url": detail_url}
-
+        row["status"] = obj.status
         return row
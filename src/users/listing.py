@@ -0,0 +1,109 @@
+"""src/users/listing.py."""
+
+from decimal import Decimal
+
+from django.db import transaction
+
+from src.building.models import Apartment
+
+from .models import OwnerListing
+from .models import User
+
+REBUILD_BATCH_SIZE = 1000
+
+# Apartment columns the listing is built from.
+APARTMENT_FIELDS = (
+    "pk",
+    "number",
+    "owner_id",
+    "house_id",
+    "house__title",
+    "personal_account__balance",
+)
+LISTING_FIELDS = (
+    "total_balance",
+    "has_debt",
+    "house_ids",
+    "apartment_numbers",
+    "apartments",
+)
+
+
+def build_owner_listings(owner_ids, apartment_rows):
+    """Return the listing field values of every owner by owner id.
+
+    ``apartment_rows`` are dicts with ``APARTMENT_FIELDS`` of the apartments
+    of these owners, in display order.
+    """
+    listings = {
+        owner_id: {
+            "total_balance": Decimal(0),
+            "house_ids": [],
+            "apartments": [],
+        }
+        for owner_id in owner_ids
+    }
+    for row in apartment_rows:
+        listing = listings[row["owner_id"]]
+        listing["total_balance"] += row["personal_account__balance"] or 0
+        if row["house_id"] not in listing["house_ids"]:
+            listing["house_ids"].append(row["house_id"])
+        listing["apartments"].append(
+            {
+                "id": row["pk"],
+                "number": row["number"],
+                "house_id": row["house_id"],
+                "house_title": row["house__title"],
+            }
+        )
+    for listing in listings.values():
+        listing["has_debt"] = listing["total_balance"] < 0
+        listing["apartment_numbers"] = " ".join(
+            apartment["number"] for apartment in listing["apartments"]
+        )
+    return listings
+
+
+def refresh_owner_listings(owner_ids):
+    """Recompute the listings of the given users.
+
+    Users that are not owners (anymore) lose their listing.
+    """
+    owner_ids = {pk for pk in owner_ids if pk is not None}
+    if not owner_ids:
+        return
+    owners = set(
+        User.objects.filter(
+            pk__in=owner_ids, user_type=User.UserType.OWNER
+        ).values_list("pk", flat=True)
+    )
+    rows = (
+        Apartment.objects.filter(owner_id__in=owners)
+        .order_by("pk")
+        .values(*APARTMENT_FIELDS)
+    )
+    listings = build_owner_listings(owners, rows)
+    OwnerListing.objects.bulk_create(
+        [
+            OwnerListing(owner_id=owner_id, **fields)
+            for owner_id, fields in listings.items()
+        ],
+        update_conflicts=True,
+        unique_fields=["owner"],
+        update_fields=LISTING_FIELDS,
+    )
+    OwnerListing.objects.filter(owner_id__in=owner_ids - owners).delete()
+
+
+def rebuild_owner_listings(batch_size=REBUILD_BATCH_SIZE):
+    """Recompute the listings of all owners, return their number."""
+    owner_ids = list(
+        User.objects.filter(user_type=User.UserType.OWNER)
+        .order_by("pk")
+        .values_list("pk", flat=True)
+    )
+    with transaction.atomic():
+        OwnerListing.objects.exclude(owner__user_type=User.UserType.OWNER).delete()
+        for start in range(0, len(owner_ids), batch_size):
+            refresh_owner_listings(owner_ids[start : start + batch_size])
+    return len(owner_ids)
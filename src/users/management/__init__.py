@@ -0,0 +1 @@
+"""src/users/management/__init__.py."""
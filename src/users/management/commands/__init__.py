@@ -0,0 +1 @@
+"""src/users/management/commands/__init__.py."""
@@ -0,0 +1,32 @@
+"""src/users/management/commands/rebuild_owner_listings.py."""
+
+from django.core.management.base import BaseCommand
+
+from src.users.listing import REBUILD_BATCH_SIZE
+from src.users.listing import rebuild_owner_listings
+
+
+class Command(BaseCommand):
+    """Backfill the owner listings from apartments and personal accounts."""
+
+    help = (
+        "Recalculate the OwnerListing table shown by the owners list. Run it "
+        "once after deploying the listings and whenever apartments or accounts "
+        "were changed without model signals (bulk updates, raw SQL)."
+    )
+
+    def add_arguments(self, parser):
+        """Add command arguments."""
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=REBUILD_BATCH_SIZE,
+            help="Number of owners recalculated per query.",
+        )
+
+    def handle(self, *args, **options):
+        """Handle the command."""
+        count = rebuild_owner_listings(batch_size=options["batch_size"])
+        self.stdout.write(
+            self.style.SUCCESS(f"Owner listings rebuilt: {count} owners.")
+        )
@@ -0,0 +1,33 @@
+# Generated by Django 5.2.7 on 2026-10-18 11:49
+
+import django.contrib.postgres.fields
+import django.contrib.postgres.indexes
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0006_invitation'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='OwnerListing',
+            fields=[
+                ('owner', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='listing', serialize=False, to=settings.AUTH_USER_MODEL, verbose_name='Владелец')),
+                ('total_balance', models.DecimalField(decimal_places=2, default=0, max_digits=12, verbose_name='Общий баланс')),
+                ('has_debt', models.BooleanField(default=False, verbose_name='Есть долг')),
+                ('house_ids', django.contrib.postgres.fields.ArrayField(base_field=models.PositiveBigIntegerField(), blank=True, default=list, size=None, verbose_name='Дома')),
+                ('apartment_numbers', models.TextField(blank=True, verbose_name='Номера квартир')),
+                ('apartments', models.JSONField(blank=True, default=list, verbose_name='Квартиры')),
+            ],
+            options={
+                'verbose_name': 'Строка списка владельцев',
+                'verbose_name_plural': 'Строки списка владельцев',
+                'indexes': [django.contrib.postgres.indexes.GinIndex(fields=['house_ids'], name='users_listing_house_ids'), models.Index(condition=models.Q(('has_debt', True)), fields=['owner'], name='users_listing_debtors')],
+            },
+        ),
+    ]
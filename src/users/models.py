@@ -5,6 +5,8 @@ import uuid
 
 from django.contrib.auth.models import AbstractUser
 from django.contrib.auth.models import Group
+from django.contrib.postgres.fields import ArrayField
+from django.contrib.postgres.indexes import GinIndex
 from django.db import DatabaseError
 from django.db import IntegrityError
 from django.db import models
@@ -173,6 +175,52 @@ class Owner(User):
         verbose_name_plural = "Владельцы"
 
 
+class OwnerListing(models.Model):
+    """What the owners list shows about the apartments of an owner.
+
+    Kept up to date by ``src.users.signals`` when apartments, personal
+    accounts or houses change, so the list does not join and aggregate them
+    for every page. Rebuilt by the ``rebuild_owner_listings`` command.
+    """
+
+    owner = models.OneToOneField(
+        User,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name="listing",
+        verbose_name="Владелец",
+    )
+    total_balance = models.DecimalField(
+        max_digits=12, decimal_places=2, default=0, verbose_name="Общий баланс"
+    )
+    has_debt = models.BooleanField(default=False, verbose_name="Есть долг")
+    house_ids = ArrayField(
+        models.PositiveBigIntegerField(), default=list, blank=True, verbose_name="Дома"
+    )
+    # Space separated, for the apartment number filter.
+    apartment_numbers = models.TextField(blank=True, verbose_name="Номера квартир")
+    # [{"id", "number", "house_id", "house_title"}, ...] in apartment order.
+    apartments = models.JSONField(default=list, blank=True, verbose_name="Квартиры")
+
+    class Meta:
+        """Meta class."""
+
+        verbose_name = "Строка списка владельцев"
+        verbose_name_plural = "Строки списка владельцев"
+        indexes = [
+            GinIndex(fields=["house_ids"], name="users_listing_house_ids"),
+            models.Index(
+                fields=["owner"],
+                condition=models.Q(has_debt=True),
+                name="users_listing_debtors",
+            ),
+        ]
+
+    def __str__(self):
+        """__str__."""
+        return f"{self.owner}: {self.total_balance}"
+
+
 class Ticket(models.Model):
     """A ticket for a master call."""
 
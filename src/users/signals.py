@@ -0,0 +1,63 @@
+"""src/users/signals.py."""
+
+from django.db.models.signals import post_delete
+from django.db.models.signals import post_save
+from django.dispatch import receiver
+
+from src.building.models import Apartment
+from src.building.models import House
+from src.building.models import PersonalAccount
+from src.building.signals import apartment_changed
+from src.building.signals import previous_apartment_state
+
+from .listing import refresh_owner_listings
+from .models import User
+
+# Apartment columns the listing shows, the balance comes with the account.
+APARTMENT_LISTING_FIELDS = ("number", "house_id", "owner_id", "personal_account_id")
+
+
+def _touches(update_fields, fields):
+    return update_fields is None or bool(set(update_fields) & fields)
+
+
+@receiver(post_save, sender=User)
+def user_listing_saved(sender, instance, created, update_fields=None, **kwargs):
+    """Add the listing of a new owner, drop it when the user type changes."""
+    if created or _touches(update_fields, {"user_type"}):
+        refresh_owner_listings([instance.pk])
+
+
+@receiver(post_save, sender=House)
+def house_listing_saved(sender, instance, created, **kwargs):
+    """Refresh the owners that show the house title."""
+    if not created:
+        refresh_owner_listings(
+            Apartment.objects.filter(house=instance).values_list("owner_id", flat=True)
+        )
+
+
+@receiver(post_save, sender=Apartment)
+def apartment_listing_saved(sender, instance, **kwargs):
+    """Refresh the current and the previous owner of the apartment."""
+    if not apartment_changed(instance, APARTMENT_LISTING_FIELDS):
+        return
+    previous = previous_apartment_state(instance) or {}
+    refresh_owner_listings([instance.owner_id, previous.get("owner_id")])
+
+
+@receiver(post_delete, sender=Apartment)
+def apartment_listing_deleted(sender, instance, **kwargs):
+    """Refresh the owner of a deleted apartment."""
+    refresh_owner_listings([instance.owner_id])
+
+
+@receiver(post_save, sender=PersonalAccount)
+def personal_account_listing_saved(sender, instance, update_fields=None, **kwargs):
+    """Refresh the balance of the owner of the account."""
+    if _touches(update_fields, {"balance"}):
+        refresh_owner_listings(
+            Apartment.objects.filter(personal_account=instance).values_list(
+                "owner_id", flat=True
+            )
+        )
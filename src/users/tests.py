@@ -1 +1,47 @@
 """src/users/tests.py."""
+
+from decimal import Decimal
+
+import pytest
+
+from src.building.models import Apartment
+from src.building.models import House
+from src.building.models import PersonalAccount
+from src.users.models import OwnerListing
+from src.users.models import User
+
+
+def _listing(owner):
+    return OwnerListing.objects.get(owner=owner)
+
+
+@pytest.mark.django_db()
+def test_owner_listing_follows_apartment_and_account_changes():
+    """The owners list projection is refreshed by the model signals."""
+    first = User.objects.create_user("first", user_type=User.UserType.OWNER)
+    second = User.objects.create_user("second", user_type=User.UserType.OWNER)
+    house = House.objects.create(title="Дом 1", address="ул. Тестовая, 1")
+    account = PersonalAccount.objects.create(number="0000000001")
+    apartment = Apartment.objects.create(
+        number="12", house=house, owner=first, personal_account=account
+    )
+    assert _listing(first).apartment_numbers == "12"
+    assert _listing(first).house_ids == [house.pk]
+
+    account.balance = Decimal("-150.00")
+    account.save()
+    assert _listing(first).has_debt
+
+    house.title = "Дом 2"
+    house.save()
+    assert _listing(first).apartments[0]["house_title"] == "Дом 2"
+
+    apartment.owner = second
+    apartment.save()
+    assert _listing(first).apartments == []
+    assert not _listing(first).has_debt
+    assert _listing(second).total_balance == Decimal("-150.00")
+
+    second.user_type = User.UserType.EMPLOYEE
+    second.save()
+    assert not OwnerListing.objects.filter(owner=second).exists()